@@ -0,0 +1,95 @@
+#!/usr/bin/env python2
+# Copyright (c) 2015 SONATA-NFV and Paderborn University
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Measures the time needed to set up and remove a bidirectional chain
+between two VNFs depending on the length of the path between them.
+
+dc1 -- s1 -- ... -- sN -- dc2
+
+Each path length is measured with ovs-ofctl (default controller)
+and with the Ryu REST API (remote controller).
+"""
+import csv
+import time
+
+from mininet.clean import cleanup
+from mininet.log import setLogLevel
+from mininet.node import Controller, RemoteController
+
+from emuvim.dcemulator.net import DCNetwork
+
+MAX_SWITCHES = 10
+REPETITIONS = 5
+
+
+def measure(controller, n_switches):
+    net = DCNetwork(controller=controller, monitor=False,
+                    enable_learning=False)
+    try:
+        dc1 = net.addDatacenter("dc1")
+        dc2 = net.addDatacenter("dc2")
+        switches = [net.addSwitch("s%d" % (i + 1))
+                    for i in range(n_switches)]
+        path = [dc1] + switches + [dc2]
+        for i in range(len(path) - 1):
+            net.addLink(path[i], path[i + 1])
+        net.start()
+        dc1.startCompute("vnf1", network=[{"id": "intf1",
+                                           "ip": "10.0.10.1/24"}])
+        dc2.startCompute("vnf2", network=[{"id": "intf2",
+                                           "ip": "10.0.10.2/24"}])
+        results = []
+        for r in range(REPETITIONS):
+            t_start = time.time()
+            net.setChain("vnf1", "vnf2", "intf1", "intf2",
+                         bidirectional=True, cmd="add-flow",
+                         cookie=r + 1)
+            t_add = time.time()
+            net.setChain("vnf1", "vnf2", "intf1", "intf2",
+                         bidirectional=True, cmd="del-flows",
+                         cookie=r + 1)
+            t_del = time.time()
+            results.append((t_add - t_start, t_del - t_add))
+        return results
+    finally:
+        net.stop()
+        cleanup()
+
+
+def main():
+    setLogLevel("warning")
+    with open("chain_setup_%d.csv" % time.time(), "w") as csvfile:
+        fieldnames = ["controller", "path_length", "run",
+                      "chain_add", "chain_delete"]
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
+        for controller in [Controller, RemoteController]:
+            for n in range(0, MAX_SWITCHES + 1):
+                results = measure(controller, n)
+                for r, (t_add, t_del) in enumerate(results):
+                    writer.writerow({
+                        "controller": controller.__name__,
+                        # number of switches on the path incl. the DC switches
+                        "path_length": n + 2,
+                        "run": r,
+                        "chain_add": t_add,
+                        "chain_delete": t_del
+                    })
+                csvfile.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -25,12 +25,11 @@
 # partner consortium (www.sonata-nfv.eu).
 import json
 import logging
-import copy
+from collections import OrderedDict
 
 # from gevent import monkey
 from gevent.pywsgi import WSGIServer
 
-from mininet.node import OVSSwitch
 
 from flask import Flask
 from flask import Response, request
@@ -868,58 +867,65 @@ class QueryTopology(Resource):
         """
         try:
             logging.debug("Querying topology")
-            graph = self.api.manage.net.DCNetwork_graph
-            net = self.api.manage.net
-            # root node is nodes
-            topology = {"nodes": list()}
-
-            for n in graph:
-                # remove root node as well as the floating switch fs1
-                if n != "root" and n != "fs1":
-                    # we only want to return switches!
-                    if not isinstance(net[n], OVSSwitch):
-                        continue
-                    node = dict()
-
-                    # get real datacenter label
-                    for dc in self.api.manage.net.dcs.values():
-                        if str(dc.switch) == str(n):
-                            node["name"] = str(n)
-                            node["type"] = "Datacenter"
-                            node["label"] = str(dc.label)
-                            break
-
-                    # node is not a datacenter. It has to be a switch
-                    if node.get("type", "") != "Datacenter":
-                        node["name"] = str(n)
-                        node["type"] = "Switch"
-
-                    node["links"] = list()
-                    # add links to the topology
-                    for graph_node, data in graph[n].items():
-                        # only add links to the topology that connect switches
-                        if isinstance(net[graph_node], OVSSwitch):
-                            # we allow multiple edges between switches, so add them all
-                            # with their unique keys
-                            link = copy.copy(data)
-                            for edge in link:
-                                # do not add any links to the floating switch
-                                # to the topology!
-                                if graph_node == "fs1":
-                                    continue
-                                # the translator wants everything as a string!
-                                for key, value in link[edge].items():
-                                    link[edge][key] = str(value)
-                                # name of the destination
-                                link[edge]["name"] = graph_node
-                                node["links"].append(link)
-
-                    topology["nodes"].append(node)
-
-            return Response(json.dumps(topology),
+            # computed once per topology version
+            topology = self.api.manage.net.getTopologySnapshot().render(
+                "openstack_topology", self._render)
+            return Response(topology,
                             status=200, mimetype="application/json")
         except Exception as e:
             logging.exception(u"%s: Error querying topology.\n %s" %
                               (__name__, e))
             return Response(u"%s: Error querying topology.\n %s" %
                             (__name__, e), status=500, mimetype="application/json")
+
+    @staticmethod
+    def _render(snapshot):
+        """
+        Render the topology JSON document from a topology snapshot.
+        """
+        # datacenter switch -> datacenter label
+        dc_switches = dict((status["switch"], label)
+                           for label, status in snapshot.datacenters.items())
+        # links between switches grouped by source and destination with
+        # their unique keys, we allow multiple edges between switches
+        # and do not add any links to the floating switch
+        switch_links = dict()
+        for src, dst, key, data in snapshot.edges:
+            if dst not in snapshot.switches or dst == "fs1":
+                continue
+            # the translator wants everything as a string!
+            edge = dict((k, str(v)) for k, v in data.items())
+            # name of the destination
+            edge["name"] = dst
+            switch_links.setdefault(src, OrderedDict()).setdefault(
+                dst, dict())[key] = edge
+        # root node is nodes
+        topology = {"nodes": list()}
+
+        for n in snapshot.nodes:
+            # remove root node as well as the floating switch fs1
+            if n != "root" and n != "fs1":
+                # we only want to return switches!
+                if n not in snapshot.switches:
+                    continue
+                node = dict()
+
+                # get real datacenter label
+                if n in dc_switches:
+                    node["name"] = str(n)
+                    node["type"] = "Datacenter"
+                    node["label"] = str(dc_switches[n])
+                else:
+                    # node is not a datacenter. It has to be a switch
+                    node["name"] = str(n)
+                    node["type"] = "Switch"
+
+                node["links"] = list()
+                # add links to the topology
+                for link in switch_links.get(n, dict()).values():
+                    # one entry per edge (as before)
+                    for _ in link:
+                        node["links"].append(link)
+
+                topology["nodes"].append(node)
+        return json.dumps(topology)
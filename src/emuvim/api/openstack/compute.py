@@ -34,6 +34,9 @@ from emuvim.api.openstack.resources.flow_classifier import FlowClassifier
 from emuvim.api.openstack.resources.port_chain import PortChain
 from emuvim.api.openstack.resources.server import Server
 from emuvim.api.openstack.resources.image import Image
+from emuvim.api.openstack.resources.name_index import NameIndexedDict
+from emuvim.api.openstack.stack_executor import StackOperationExecutor
+from emuvim.dcemulator.concurrency import run_parallel
 
 from docker import DockerClient
 import logging
@@ -46,6 +49,9 @@ import hashlib
 
 LOG = logging.getLogger("api.openstack.compute")
 
+# seconds the image catalog of the Docker daemon is cached
+IMAGE_CACHE_TTL = 10.0
+
 
 class HeatApiStackInvalidException(Exception):
     """
@@ -71,34 +77,71 @@ class OpenstackCompute(object):
     def __init__(self):
         self.dc = None
         self.stacks = dict()
-        self.computeUnits = dict()
+        self.computeUnits = NameIndexedDict(
+            ("name", "template_name", "full_name"))
         self.routers = dict()
         self.flavors = dict()
         self._images = dict()
-        self.nets = dict()
-        self.ports = dict()
-        self.port_pairs = dict()
-        self.port_pair_groups = dict()
-        self.flow_classifiers = dict()
-        self.port_chains = dict()
+        self._image_ids = dict()
+        self._images_updated = 0
+        self._images_lock = threading.Lock()
+        self.nets = NameIndexedDict()
+        self.ports = NameIndexedDict(("name", "template_name"))
+        self.port_pairs = NameIndexedDict()
+        self.port_pair_groups = NameIndexedDict()
+        self.flow_classifiers = NameIndexedDict()
+        self.port_chains = NameIndexedDict()
         self.compute_nets = dict()
+        self.stack_executor = StackOperationExecutor()
         self.dcli = DockerClient(base_url='unix://var/run/docker.sock')
 
     @property
     def images(self):
         """
-        Updates the known images. Asks the docker daemon for a list of all known images and returns
-        the new dictionary.
+        Returns the known images. The image catalog of the docker daemon is cached and only
+        requested again if it is older than IMAGE_CACHE_TTL seconds.
 
-        :return: Returns the new image dictionary.
+        :return: Returns the image dictionary (name -> image).
         :rtype: ``dict``
         """
-        for image in self.dcli.images.list():
-            if len(image.tags) > 0:
+        self.update_images()
+        return self._images
+
+    def update_images(self, force=False):
+        """
+        Asks the docker daemon for a list of all known images and adds new images to the catalog.
+
+        :param force: Update the catalog even if the cached one is still valid.
+        :type force: ``bool``
+        """
+        with self._images_lock:
+            if not force and time.time() - self._images_updated < IMAGE_CACHE_TTL:
+                return
+            for image in self.dcli.images.list():
                 for t in image.tags:
                     if t not in self._images:
-                        self._images[t] = Image(t)
-        return self._images
+                        img = Image(t)
+                        self._images[t] = img
+                        self._image_ids[img.id] = img
+            self._images_updated = time.time()
+
+    def find_image_by_name_or_id(self, name_or_id):
+        """
+        Tries to find the image by name or ID. If it is unknown, the image catalog is updated
+        once, the image might have been pulled after the last update.
+
+        :param name_or_id: Docker image name (with tag) or UUID of the image.
+        :type name_or_id: ``str``
+        :return: Returns the image reference if it was found or None
+        :rtype: :class:`openstack.resources.image`
+        """
+        images = self.images
+        image = images.get(name_or_id, self._image_ids.get(name_or_id))
+        if image is None:
+            self.update_images(force=True)
+            image = self._images.get(
+                name_or_id, self._image_ids.get(name_or_id))
+        return image
 
     def add_stack(self, stack):
         """
@@ -194,12 +237,16 @@ class OpenstackCompute(object):
         self.flavors[flavor.name] = flavor
         return flavor
 
-    def deploy_stack(self, stackid):
+    def deploy_stack(self, stackid, wait=True):
         """
         Deploys the stack and starts the emulation.
+        The servers of the stack are started concurrently.
 
         :param stackid: An UUID str of the stack
         :type stackid: ``str``
+        :param wait: If False, the stack is deployed by the stack executor and its status is
+            CREATE_IN_PROGRESS until all servers are started.
+        :type wait: ``bool``
         :return: * *False*: If the Datacenter is None
             * *True*: Else
         :rtype: ``bool``
@@ -210,17 +257,61 @@ class OpenstackCompute(object):
         stack = self.stacks[stackid]
         self.update_compute_dicts(stack)
 
-        # Create the networks first
-        for server in stack.servers.values():
-            self._start_compute(server)
+        def deploy():
+            self._start_computes(list(stack.servers.values()))
+            return True
+
+        return self._run_stack_operation([stack], "CREATE", deploy, wait)
+
+    def _run_stack_operation(self, stacks, action, function, wait):
+        """
+        Runs a stack operation and updates the status of the stacks: <action>_IN_PROGRESS while the
+        operation runs, then <action>_COMPLETE or <action>_FAILED.
+
+        :param stacks: The stacks affected by the operation, the first one identifies the operation.
+        :type stacks: ``list``
+        :param action: CREATE, UPDATE or DELETE
+        :type action: ``str``
+        :param function: The operation, returns False if it failed.
+        :type function: ``function``
+        :param wait: If False, the operation is executed by the stack executor.
+        :type wait: ``bool``
+        :return: The result of the operation or True if it was scheduled.
+        """
+        for stack in stacks:
+            stack.set_status(action + "_IN_PROGRESS",
+                             "Stack %s started" % action)
+
+        def run():
+            try:
+                result = function()
+            except Exception as ex:
+                for stack in stacks:
+                    stack.set_status(action + "_FAILED", str(ex))
+                raise
+            for stack in stacks:
+                if result is False:
+                    stack.set_status(action + "_FAILED",
+                                     "Stack %s failed" % action)
+                else:
+                    stack.set_status(action + "_COMPLETE",
+                                     "Stack %s completed successfully" % action)
+            return result
+
+        if wait:
+            return run()
+        self.stack_executor.submit(stacks[0].id, run)
         return True
 
-    def delete_stack(self, stack_id):
+    def delete_stack(self, stack_id, wait=True):
         """
         Delete a stack and all its components.
 
         :param stack_id: An UUID str of the stack
         :type stack_id: ``str``
+        :param wait: If False, the stack is deleted by the stack executor and its status is
+            DELETE_IN_PROGRESS until it is removed.
+        :type wait: ``bool``
         :return: * *False*: If the Datacenter is None
             * *True*: Else
         :rtype: ``bool``
@@ -228,6 +319,11 @@ class OpenstackCompute(object):
         if self.dc is None:
             return False
 
+        return self._run_stack_operation(
+            [self.stacks[stack_id]], "DELETE",
+            lambda: self._delete_stack(stack_id), wait)
+
+    def _delete_stack(self, stack_id):
         # Stop all servers and their links of this stack
         for server in self.stacks[stack_id].servers.values():
             self.stop_compute(server)
@@ -244,7 +340,7 @@ class OpenstackCompute(object):
         del self.stacks[stack_id]
         return True
 
-    def update_stack(self, old_stack_id, new_stack):
+    def update_stack(self, old_stack_id, new_stack, wait=True):
         """
         Determines differences within the old and the new stack and deletes, create or changes only parts that
         differ between the two stacks.
@@ -253,10 +349,20 @@ class OpenstackCompute(object):
         :type old_stack_id: ``str``
         :param new_stack: A reference of the new stack.
         :type new_stack: :class:`heat.resources.stack`
+        :param wait: If False, the stack is updated by the stack executor and its status is
+            UPDATE_IN_PROGRESS until the update is done.
+        :type wait: ``bool``
         :return: * *True*: if the old stack could be updated to the new stack without any error.
             * *False*: else
         :rtype: ``bool``
         """
+        if old_stack_id not in self.stacks:
+            return False
+        return self._run_stack_operation(
+            [self.stacks[old_stack_id], new_stack], "UPDATE",
+            lambda: self._update_stack(old_stack_id, new_stack), wait)
+
+    def _update_stack(self, old_stack_id, new_stack):
         LOG.debug("updating stack {} with new_stack {}".format(
             old_stack_id, new_stack))
         if old_stack_id not in self.stacks:
@@ -310,7 +416,7 @@ class OpenstackCompute(object):
                         if port_name in old_stack.ports and port_name in new_stack.ports:
                             if not old_stack.ports.get(
                                     port_name) == new_stack.ports.get(port_name):
-                                my_links = self.dc.net.links
+                                my_links = list(self.dc.net.links)
                                 for link in my_links:
                                     if str(link.intf1) == old_stack.ports[port_name].intf_name and \
                                             str(link.intf1.ip) == \
@@ -324,7 +430,7 @@ class OpenstackCompute(object):
                                                        new_stack.ports[port_name].net_name)
                                         break
                         else:
-                            my_links = self.dc.net.links
+                            my_links = list(self.dc.net.links)
                             for link in my_links:
                                 if str(link.intf1) == old_stack.ports[port_name].intf_name and \
                                    str(link.intf1.ip) == old_stack.ports[port_name].ip_address.split('/')[0]:
@@ -342,11 +448,14 @@ class OpenstackCompute(object):
                 self.stop_compute(server)
 
         # Start all new servers
+        new_servers = list()
         for server in new_stack.servers.values():
-            if server.name not in self.dc.containers:
-                self._start_compute(server)
+            if self.dc.net.getDatacenterOfContainer(server.name) is not self.dc:
+                new_servers.append(server)
             else:
-                server.emulator_compute = self.dc.containers.get(server.name)
+                server.emulator_compute = self.dc.net.getContainerByName(
+                    server.name)
+        self._start_computes(new_servers)
 
         del self.stacks[old_stack_id]
         self.stacks[new_stack.id] = new_stack
@@ -391,11 +500,21 @@ class OpenstackCompute(object):
                                 port.ip_address = net.get_new_ip_address(
                                     port.name)
 
-        for port in new_stack.ports.values():
-            for net in new_stack.nets.values():
-                if port.net_name == net.name and not net.is_my_ip(
-                        port.ip_address, port.name):
-                    port.ip_address = net.get_new_ip_address(port.name)
+        # issue the addresses of all new or changed ports of a net at once
+        for net in new_stack.nets.values():
+            ports = [port for port in new_stack.ports.values()
+                     if port.net_name == net.name and
+                     not net.is_my_ip(port.ip_address, port.name)]
+            if len(ports) < 1:
+                continue
+            ip_addresses = net.get_new_ip_addresses(
+                [port.name for port in ports])
+            if ip_addresses is None:
+                # not enough addresses left for all of them
+                ip_addresses = [net.get_new_ip_address(port.name)
+                                for port in ports]
+            for port, ip_address in zip(ports, ip_addresses):
+                port.ip_address = ip_address
 
     def update_subnet_cidr(self, old_stack, new_stack):
         """
@@ -456,6 +575,46 @@ class OpenstackCompute(object):
         :type server: :class:`heat.resources.server`
         """
         LOG.debug("Starting new compute resources %s" % server.name)
+        c = self.dc.startCompute(**self._prepare_compute(server))
+        self._setup_compute(server, c)
+
+    def _start_computes(self, servers):
+        """
+        Starts the compute objects of multiple servers, e.g. of a stack, concurrently.
+        All networks and ports are resolved before the containers are created. Raises an
+        exception if a server could not be started.
+
+        :param servers: Specifies the compute resources.
+        :type servers: ``list``
+        """
+        if len(servers) < 1:
+            return
+        LOG.debug("Starting new compute resources %s" %
+                  [server.name for server in servers])
+        results = self.dc.startComputeBatch(
+            [self._prepare_compute(server) for server in servers])
+        started = list()
+        errors = list()
+        for server, r in zip(servers, results):
+            if r["container"] is None:
+                errors.append("%s: %s" % (server.name, r["error"]))
+            else:
+                started.append((server, r["container"]))
+        for r in run_parallel(self._setup_compute, started):
+            if r.error is not None:
+                errors.append(str(r.error))
+        if len(errors) > 0:
+            raise Exception("Could not start servers: %s" % ", ".join(errors))
+
+    def _prepare_compute(self, server):
+        """
+        Resolves the ports and networks of the server.
+
+        :param server: Specifies the compute resource.
+        :type server: :class:`heat.resources.server`
+        :return: Arguments for :meth:`Datacenter.startCompute`
+        :rtype: ``dict``
+        """
         network = list()
         network_dict = dict()
 
@@ -476,23 +635,42 @@ class OpenstackCompute(object):
 
         self.compute_nets[server.name] = network
         LOG.debug("Network dict: {}".format(network))
-        c = self.dc.startCompute(server.name, image=server.image, command=server.command,
-                                 network=network, flavor_name=server.flavor,
-                                 properties=server.properties)
+        return dict(name=server.name, image=server.image, command=server.command,
+                    network=network, flavor_name=server.flavor,
+                    properties=server.properties)
+
+    def _setup_compute(self, server, c):
+        """
+        Configures the interfaces of a started compute object and runs its start command.
+
+        :param server: Specifies the compute resource.
+        :type server: :class:`heat.resources.server`
+        :param c: The started container.
+        :type c: :class:`emuvim.dcemulator.node.EmulatorCompute`
+        """
         server.emulator_compute = c
 
-        for intf in c.intfs.values():
-            for port_name in server.port_names:
-                port = self.find_port_by_name_or_id(port_name)
-                if port is not None:
-                    if intf.name == port.intf_name:
-                        # wait up to one second for the intf to come up
-                        self.timeout_sleep(intf.isUp, 1)
-                        if port.mac_address is not None:
-                            intf.setMAC(port.mac_address)
-                        else:
-                            port.mac_address = intf.MAC()
-                        port.assigned_container = c
+        ports = dict()
+        for port_name in server.port_names:
+            port = self.find_port_by_name_or_id(port_name)
+            if port is not None:
+                ports[port.intf_name] = port
+        intfs = [intf for intf in c.intfs.values() if intf.name in ports]
+        # wait up to one second for all intfs to come up
+        pending = list(intfs)
+
+        def intfs_up():
+            pending[:] = [intf for intf in pending if not intf.isUp()]
+            return len(pending) == 0
+
+        self.timeout_sleep(intfs_up, 1)
+        for intf in intfs:
+            port = ports[intf.name]
+            if port.mac_address is not None:
+                intf.setMAC(port.mac_address)
+            else:
+                port.mac_address = intf.MAC()
+            port.assigned_container = c
 
         # Start the real emulator command now as specified in the dockerfile
         config = c.dcinfo.get("Config", dict())
@@ -527,7 +705,7 @@ class OpenstackCompute(object):
             prt = self.find_port_by_name_or_id(port_name)
             if prt is not None:
                 link_names.append(prt.intf_name)
-        my_links = self.dc.net.links
+        my_links = list(self.dc.net.links)
         for link in my_links:
             if str(link.intf1) in link_names:
                 # Remove all self created links that connect the server to the
@@ -556,15 +734,13 @@ class OpenstackCompute(object):
         if self._shorten_server_name(name_or_id) in self.computeUnits:
             return self.computeUnits[name_or_id]
 
-        for server in self.computeUnits.values():
-            if (server.name == name_or_id or
-                    server.template_name == name_or_id or
-                    server.full_name == name_or_id):
-                return server
-            if (server.name == self._shorten_server_name(name_or_id) or
-                    server.template_name == self._shorten_server_name(name_or_id) or
-                    server.full_name == self._shorten_server_name(name_or_id)):
-                return server
+        # find by name, template name or full name
+        servers = self.computeUnits.find_by_name(name_or_id)
+        if len(servers) < 1:
+            servers = self.computeUnits.find_by_name(
+                self._shorten_server_name(name_or_id))
+        if len(servers) > 0:
+            return servers[0]
         return None
 
     def create_server(self, name, stack_operation=False):
@@ -634,14 +810,10 @@ class OpenstackCompute(object):
         """
         if name_or_id in self.nets:
             return self.nets[name_or_id]
-        print("name_or_id: ", name_or_id)
-        for net in self.nets.values():
-            if net.name == name_or_id:
-                return net
-        LOG.warning("Could not find net '{}' in {} or {}"
-                    .format(name_or_id,
-                            self.nets.keys(),
-                            [n.name for n in self.nets.values()]))
+        nets = self.nets.find_by_name(name_or_id)
+        if len(nets) > 0:
+            return nets[0]
+        LOG.warning("Could not find net '{}'".format(name_or_id))
         return None
 
     def create_network(self, name, stack_operation=False):
@@ -715,10 +887,7 @@ class OpenstackCompute(object):
         if name_or_id in self.ports:
             return self.ports[name_or_id]
         # find by name
-        matching_ports = list(filter(
-            lambda port: port.name == name_or_id or port.template_name == name_or_id,
-            self.ports.values()
-        ))
+        matching_ports = self.ports.find_by_name(name_or_id)
         matching_ports_count = len(matching_ports)
         if matching_ports_count == 1:
             return matching_ports[0]
@@ -739,7 +908,7 @@ class OpenstackCompute(object):
                 "Port with name or id %s does not exist. Can't delete it." % name_or_id)
             return
 
-        my_links = self.dc.net.links
+        my_links = list(self.dc.net.links)
         for link in my_links:
             if str(link.intf1) == port.intf_name:
                 self._remove_link(link.intf1.node.name, link)
@@ -783,10 +952,9 @@ class OpenstackCompute(object):
         """
         if name_or_id in self.port_pairs:
             return self.port_pairs[name_or_id]
-        for port_pair in self.port_pairs.values():
-            if port_pair.name == name_or_id:
-                return port_pair
-
+        port_pairs = self.port_pairs.find_by_name(name_or_id)
+        if len(port_pairs) > 0:
+            return port_pairs[0]
         return None
 
     def delete_port_pair(self, name_or_id):
@@ -838,10 +1006,9 @@ class OpenstackCompute(object):
         """
         if name_or_id in self.port_pair_groups:
             return self.port_pair_groups[name_or_id]
-        for port_pair_group in self.port_pair_groups.values():
-            if port_pair_group.name == name_or_id:
-                return port_pair_group
-
+        port_pair_groups = self.port_pair_groups.find_by_name(name_or_id)
+        if len(port_pair_groups) > 0:
+            return port_pair_groups[0]
         return None
 
     def delete_port_pair_group(self, name_or_id):
@@ -892,9 +1059,9 @@ class OpenstackCompute(object):
         """
         if name_or_id in self.port_chains:
             return self.port_chains[name_or_id]
-        for port_chain in self.port_chains.values():
-            if port_chain.name == name_or_id:
-                return port_chain
+        port_chains = self.port_chains.find_by_name(name_or_id)
+        if len(port_chains) > 0:
+            return port_chains[0]
         return None
 
     def delete_port_chain(self, name_or_id):
@@ -947,10 +1114,9 @@ class OpenstackCompute(object):
         """
         if name_or_id in self.flow_classifiers:
             return self.flow_classifiers[name_or_id]
-        for flow_classifier in self.flow_classifiers.values():
-            if flow_classifier.name == name_or_id:
-                return flow_classifier
-
+        flow_classifiers = self.flow_classifiers.find_by_name(name_or_id)
+        if len(flow_classifiers) > 0:
+            return flow_classifiers[0]
         return None
 
     def delete_flow_classifier(self, name_or_id):
@@ -998,20 +1164,22 @@ class OpenstackCompute(object):
         :param link: A reference of the link which should be removed.
         :type link: :class:`mininet.link`
         """
-        self.dc.switch.detach(link.intf2)
-        del self.dc.switch.intfs[self.dc.switch.ports[link.intf2]]
-        del self.dc.switch.ports[link.intf2]
-        del self.dc.switch.nameToIntf[link.intf2.name]
-        self.dc.net.removeLink(link=link)
-        for intf_key in self.dc.net[server_name].intfs.keys():
-            if self.dc.net[server_name].intfs[intf_key].link == link:
-                self.dc.net[server_name].intfs[intf_key].delete()
-                del self.dc.net[server_name].intfs[intf_key]
+        with self.dc.net.topology_lock:
+            self.dc.switch.detach(link.intf2)
+            del self.dc.switch.intfs[self.dc.switch.ports[link.intf2]]
+            del self.dc.switch.ports[link.intf2]
+            del self.dc.switch.nameToIntf[link.intf2.name]
+            self.dc.net.removeLink(link=link)
+            for intf_key in self.dc.net[server_name].intfs.keys():
+                if self.dc.net[server_name].intfs[intf_key].link == link:
+                    self.dc.net[server_name].intfs[intf_key].delete()
+                    del self.dc.net[server_name].intfs[intf_key]
 
     @staticmethod
     def timeout_sleep(function, max_sleep):
         """
-        This function will execute a function all 0.1 seconds until it successfully returns.
+        This function will execute a function until it successfully returns. The interval between
+        the calls starts at 10 ms and is doubled up to 0.1 seconds.
         Will return after `max_sleep` seconds if not successful.
 
         :param function: The function to execute. Should return true if done.
@@ -1019,8 +1187,11 @@ class OpenstackCompute(object):
         :param max_sleep: Max seconds to sleep. 1 equals 1 second.
         :type max_sleep: ``float``
         """
-        current_time = time.time()
-        stop_time = current_time + max_sleep
-        while not function() and current_time < stop_time:
-            current_time = time.time()
-            time.sleep(0.1)
+        stop_time = time.time() + max_sleep
+        interval = 0.01
+        while not function():
+            remaining = stop_time - time.time()
+            if remaining <= 0:
+                return
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, 0.1)
@@ -24,16 +24,12 @@
 # acknowledge the contributions of their colleagues of the SONATA
 # partner consortium (www.sonata-nfv.eu).
 from emuvim.api.openstack.resources.net import Net
-import threading
+from emuvim.api.openstack.ipam import CidrAllocator
 
-lock = threading.Lock()
-
-__issued_ips = dict()
-__default_subnet_size = 256
 __default_subnet_bitmask = 24
 __first_ip = Net.ip_2_int('10.0.0.0')
 __last_ip = Net.ip_2_int('10.255.255.255')
-__current_ip = __first_ip
+__allocator = CidrAllocator(__first_ip, __last_ip, __default_subnet_bitmask)
 
 
 def get_new_cidr(uuid):
@@ -45,20 +41,10 @@ def get_new_cidr(uuid):
     :return: Returns None if all available CIDR are used. Otherwise returns a valid CIDR.
     :rtype: ``str``
     """
-    global lock
-    lock.acquire()
-
-    global __current_ip
-    while __first_ip <= __current_ip < __last_ip and __current_ip in __issued_ips:
-        __current_ip += __default_subnet_size
-
-    if __current_ip >= __last_ip or __current_ip < __first_ip or __current_ip in __issued_ips:
+    int_ip = __allocator.allocate(uuid)
+    if int_ip is None:
         return None
-
-    __issued_ips[__current_ip] = uuid
-    lock.release()
-
-    return Net.int_2_ip(__current_ip) + '/' + str(__default_subnet_bitmask)
+    return Net.int_2_ip(int_ip) + '/' + str(__default_subnet_bitmask)
 
 
 def free_cidr(cidr, uuid):
@@ -74,21 +60,7 @@ def free_cidr(cidr, uuid):
     """
     if cidr is None:
         return False
-
-    global __current_ip
-    int_ip = Net.cidr_2_int(cidr)
-
-    global lock
-    lock.acquire()
-
-    if int_ip in __issued_ips and __issued_ips[int_ip] == uuid:
-        del __issued_ips[int_ip]
-        if int_ip < __current_ip:
-            __current_ip = int_ip
-        lock.release()
-        return True
-    lock.release()
-    return False
+    return __allocator.release(Net.cidr_2_int(cidr), uuid)
 
 
 def is_cidr_issued(cidr):
@@ -102,12 +74,7 @@ def is_cidr_issued(cidr):
     """
     if cidr is None:
         return False
-
-    int_ip = Net.cidr_2_int(cidr)
-
-    if int_ip in __issued_ips:
-        return True
-    return False
+    return __allocator.is_allocated(Net.cidr_2_int(cidr))
 
 
 def is_my_cidr(cidr, uuid):
@@ -123,15 +90,7 @@ def is_my_cidr(cidr, uuid):
     """
     if cidr is None:
         return False
-
-    int_ip = Net.cidr_2_int(cidr)
-
-    if int_ip not in __issued_ips:
-        return False
-
-    if __issued_ips[int_ip] == uuid:
-        return True
-    return False
+    return __allocator.is_owner(Net.cidr_2_int(cidr), uuid)
 
 
 def assign_cidr(cidr, uuid):
@@ -147,14 +106,14 @@ def assign_cidr(cidr, uuid):
     """
     if cidr is None:
         return False
+    return __allocator.assign(Net.cidr_2_int(cidr), uuid)
 
-    int_ip = Net.cidr_2_int(cidr)
 
-    if int_ip in __issued_ips:
-        return False
+def get_status():
+    """
+    Returns usage statistics of the subnet address space.
 
-    global lock
-    lock.acquire()
-    __issued_ips[int_ip] = uuid
-    lock.release()
-    return True
+    :return: Dict with the number of issued and free subnets.
+    :rtype: ``dict``
+    """
+    return __allocator.get_status()
@@ -0,0 +1,321 @@
+# Copyright (c) 2015 SONATA-NFV and Paderborn University
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, Paderborn University
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+import heapq
+import logging
+import threading
+
+LOG = logging.getLogger("api.openstack.ipam")
+
+
+class AddressPool(object):
+    """
+    Thread-safe pool of addresses (integers) in the range [first, last].
+    A bitmap marks the allocated addresses. Released addresses are kept in a
+    heap, so that allocate always returns the lowest free address in
+    O(log n) instead of walking over all issued addresses.
+    Addresses below dynamic_first (e.g. gateways) are only handed out
+    when they are requested explicitly with assign.
+    """
+
+    def __init__(self, first, last, dynamic_first=None):
+        self.first = first
+        self.last = last
+        self.dynamic_first = first if dynamic_first is None else dynamic_first
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Release all addresses.
+        """
+        with self._lock:
+            self._bitmap = bytearray((max(0, self.last - self.first) >> 3) + 1)
+            # address -> owner
+            self._owner = dict()
+            # lowest dynamic address that was never handed out
+            self._next = self.dynamic_first
+            # heap of released dynamic addresses below self._next
+            self._free = list()
+            # statistics
+            self.allocations = 0
+            self.releases = 0
+            self.peak_allocated = 0
+
+    def __len__(self):
+        """
+        Number of allocated addresses.
+        """
+        return len(self._owner)
+
+    @property
+    def size(self):
+        return max(0, self.last - self.first + 1)
+
+    def _in_range(self, address):
+        return address is not None and self.first <= address <= self.last
+
+    def _is_set(self, address):
+        i = address - self.first
+        return self._bitmap[i >> 3] & (1 << (i & 7)) != 0
+
+    def _set(self, address, owner):
+        i = address - self.first
+        self._bitmap[i >> 3] |= (1 << (i & 7))
+        self._owner[address] = owner
+        self.allocations += 1
+        self.peak_allocated = max(self.peak_allocated, len(self._owner))
+
+    def _next_free(self):
+        # released addresses are always lower than self._next
+        while len(self._free) > 0:
+            address = heapq.heappop(self._free)
+            # skip addresses that were assigned explicitly meanwhile
+            if not self._is_set(address):
+                return address
+        while self._next <= self.last:
+            address = self._next
+            self._next += 1
+            if not self._is_set(address):
+                return address
+        return None
+
+    def is_allocated(self, address):
+        """
+        Check if the given address is currently allocated.
+        """
+        if not self._in_range(address):
+            return False
+        return self._is_set(address)
+
+    def get_owner(self, address):
+        return self._owner.get(address)
+
+    def is_owner(self, address, owner):
+        """
+        Check if the given address is allocated by the given owner.
+        """
+        return self.is_allocated(address) and self._owner.get(address) == owner
+
+    def allocate(self, owner=None):
+        """
+        Allocate the lowest free address.
+        :param owner: object that identifies the owner of the address
+        :return: address (int) or None if the pool is exhausted
+        """
+        with self._lock:
+            address = self._next_free()
+            if address is not None:
+                self._set(address, owner)
+        return address
+
+    def allocate_many(self, owners):
+        """
+        Allocate one address for each of the given owners at once,
+        e.g. for all ports of a stack. Either all or no addresses are
+        allocated.
+        :param owners: list of owners
+        :return: list of addresses or None if the pool has not enough free
+            addresses
+        """
+        addresses = list()
+        with self._lock:
+            for owner in owners:
+                address = self._next_free()
+                if address is None:
+                    for a in addresses:
+                        self._release(a)
+                    return None
+                self._set(address, owner)
+                addresses.append(address)
+        return addresses
+
+    def assign(self, address, owner=None):
+        """
+        Allocate the given address.
+        :param address: requested address (int)
+        :param owner: object that identifies the owner of the address
+        :return: False if the address is already allocated or not in the
+            range of this pool, else True
+        """
+        if not self._in_range(address):
+            return False
+        with self._lock:
+            if self._is_set(address):
+                return False
+            self._set(address, owner)
+        return True
+
+    def set_owner(self, address, owner):
+        """
+        Change the owner of the given address. Free addresses are assigned.
+        :return: False if the address is not in the range of this pool
+        """
+        if not self._in_range(address):
+            return False
+        with self._lock:
+            if not self._is_set(address):
+                self._set(address, owner)
+            self._owner[address] = owner
+        return True
+
+    def release(self, address, owner=None):
+        """
+        Return an address to the pool.
+        :param address: allocated address (int)
+        :param owner: only release the address if it belongs to this owner
+            (None: release it in any case)
+        :return: True if the address was released
+        """
+        if not self._in_range(address):
+            return False
+        with self._lock:
+            if not self._is_set(address):
+                return False
+            if owner is not None and self._owner.get(address) != owner:
+                return False
+            self._release(address)
+        return True
+
+    def _release(self, address):
+        i = address - self.first
+        self._bitmap[i >> 3] &= ~(1 << (i & 7)) & 0xff
+        del self._owner[address]
+        if self.dynamic_first <= address < self._next:
+            heapq.heappush(self._free, address)
+        self.releases += 1
+
+    def get_status(self):
+        """
+        Return a dict with usage statistics of this pool.
+        """
+        with self._lock:
+            allocated = len(self._owner)
+            return {
+                "size": self.size,
+                "allocated": allocated,
+                "free": self.size - allocated,
+                "utilization": (float(allocated) / self.size
+                                if self.size > 0 else 1.0),
+                "peak_allocated": self.peak_allocated,
+                "allocations": self.allocations,
+                "releases": self.releases
+            }
+
+
+class CidrAllocator(object):
+    """
+    Thread-safe allocator of subnets with a fixed prefix length in the
+    address range [first, last]. Subnets are managed as blocks in an
+    AddressPool. Subnets outside of the range can still be assigned
+    explicitly and are tracked separately.
+    """
+
+    def __init__(self, first, last, prefix_len):
+        self.first = first
+        self.prefix_len = prefix_len
+        self.block_size = 1 << (32 - prefix_len)
+        self._blocks = AddressPool(
+            0, (last - first + 1) // self.block_size - 1)
+        # network address -> owner of subnets outside of the range
+        self._external = dict()
+        self._lock = threading.Lock()
+
+    def _block(self, address):
+        if address is None:
+            return None
+        block = (address - self.first) // self.block_size
+        if address < self.first or block > self._blocks.last:
+            return None
+        return block
+
+    def allocate(self, owner=None):
+        """
+        Allocate the lowest free subnet.
+        :param owner: object that identifies the owner of the subnet
+        :return: network address (int) or None if all subnets are in use
+        """
+        block = self._blocks.allocate(owner)
+        if block is None:
+            LOG.warning("No free subnets left.")
+            return None
+        return self.first + block * self.block_size
+
+    def assign(self, address, owner=None):
+        """
+        Allocate the subnet that contains the given address.
+        :return: False if the subnet is already allocated, else True
+        """
+        if address is None:
+            return False
+        block = self._block(address)
+        if block is not None:
+            return self._blocks.assign(block, owner)
+        with self._lock:
+            if address in self._external:
+                return False
+            self._external[address] = owner
+        return True
+
+    def release(self, address, owner=None):
+        """
+        Return the subnet that contains the given address.
+        :param owner: only release the subnet if it belongs to this owner
+            (None: release it in any case)
+        :return: True if the subnet was released
+        """
+        if address is None:
+            return False
+        block = self._block(address)
+        if block is not None:
+            return self._blocks.release(block, owner)
+        with self._lock:
+            if address not in self._external:
+                return False
+            if owner is not None and self._external[address] != owner:
+                return False
+            del self._external[address]
+        return True
+
+    def is_allocated(self, address):
+        block = self._block(address)
+        if block is not None:
+            return self._blocks.is_allocated(block)
+        return address in self._external
+
+    def is_owner(self, address, owner):
+        block = self._block(address)
+        if block is not None:
+            return self._blocks.is_owner(block, owner)
+        return address in self._external and self._external[address] == owner
+
+    def get_status(self):
+        """
+        Return a dict with usage statistics of this allocator.
+        """
+        status = self._blocks.get_status()
+        status["prefix_len"] = self.prefix_len
+        status["external"] = len(self._external)
+        return status
@@ -26,7 +26,6 @@
 import logging
 import threading
 import uuid
-import networkx as nx
 import emuvim.api.openstack.chain_api as chain_api
 import json
 import random
@@ -398,16 +397,10 @@ class OpenstackManage(object):
         """
         src_sw = None
         src_sw_inport_nr = None
-        for connected_sw in self.net.DCNetwork_graph.neighbors(vnf_name):
-            link_dict = self.net.DCNetwork_graph[vnf_name][connected_sw]
-            for link in link_dict:
-                if (link_dict[link]['src_port_id'] == vnf_interface or
-                    link_dict[link][
-                        'src_port_name'] == vnf_interface):
-                    # found the right link and connected switch
-                    src_sw = connected_sw
-                    src_sw_inport_nr = link_dict[link]['dst_port_nr']
-                    break
+        port = self.net.getConnectedSwitchPort(vnf_name, vnf_interface)
+        if port is not None:
+            src_sw = port['switch']
+            src_sw_inport_nr = port['switch_port_nr']
 
         return src_sw, src_sw_inport_nr
 
@@ -434,32 +427,18 @@ class OpenstackManage(object):
         logging.debug("Find shortest path from vnf %s to %s",
                       src_vnf, dst_vnf)
 
-        for connected_sw in self.net.DCNetwork_graph.neighbors(src_vnf):
-            link_dict = self.net.DCNetwork_graph[src_vnf][connected_sw]
-            for link in link_dict:
-                if (link_dict[link]['src_port_id'] == src_vnf_intf or
-                    link_dict[link][
-                        'src_port_name'] == src_vnf_intf):
-                    # found the right link and connected switch
-                    src_sw = connected_sw
-                    break
-
-        for connected_sw in self.net.DCNetwork_graph.neighbors(dst_vnf):
-            link_dict = self.net.DCNetwork_graph[connected_sw][dst_vnf]
-            for link in link_dict:
-                if link_dict[link]['dst_port_id'] == dst_vnf_intf or \
-                        link_dict[link][
-                        'dst_port_name'] == dst_vnf_intf:
-                    # found the right link and connected
-                    dst_sw = connected_sw
-                    break
+        src_port = self.net.getConnectedSwitchPort(src_vnf, src_vnf_intf)
+        if src_port is not None:
+            src_sw = src_port['switch']
+        dst_port = self.net.getConnectedSwitchPort(dst_vnf, dst_vnf_intf)
+        if dst_port is not None:
+            dst_sw = dst_port['switch']
         logging.debug("From switch %s to %s " % (src_sw, dst_sw))
 
         # get shortest path
         try:
-            # returns the first found shortest path
-            # if all shortest paths are wanted, use: all_shortest_paths
-            path = nx.shortest_path(self.net.DCNetwork_graph, src_sw, dst_sw)
+            # returns the first found shortest path (cached by the DCNetwork)
+            path = self.net.getShortestPath(src_sw, dst_sw)
         except BaseException:
             logging.exception("No path could be found between {0} and {1} using src_sw={2} and dst_sw={3}".format(
                 src_vnf, dst_vnf, src_sw, dst_sw))
@@ -507,13 +486,10 @@ class OpenstackManage(object):
 
         # find the switch belonging to the source interface, as well as the
         # inport nr
-        for connected_sw in net.DCNetwork_graph.neighbors(src_vnf_name):
-            link_dict = net.DCNetwork_graph[src_vnf_name][connected_sw]
-            for link in link_dict:
-                if link_dict[link]['src_port_name'] == src_vnf_interface:
-                    src_sw = connected_sw
-                    src_sw_inport_nr = link_dict[link]['dst_port_nr']
-                    break
+        src_port = net.getConnectedSwitchPort(src_vnf_name, src_vnf_interface)
+        if src_port is not None:
+            src_sw = src_port['switch']
+            src_sw_inport_nr = src_port['switch_port_nr']
 
         if src_sw is None or src_sw_inport_nr == 0:
             raise Exception(u"Source VNF or interface can not be found.")
@@ -522,12 +498,10 @@ class OpenstackManage(object):
         for vnf_name in dest_intfs_mapping:
             if vnf_name not in net.DCNetwork_graph:
                 raise Exception(u"Target VNF %s is not known." % vnf_name)
-            for connected_sw in net.DCNetwork_graph.neighbors(vnf_name):
-                link_dict = net.DCNetwork_graph[vnf_name][connected_sw]
-                for link in link_dict:
-                    if link_dict[link]['src_port_name'] == dest_intfs_mapping[vnf_name]:
-                        dest_vnf_outport_nrs.append(
-                            int(link_dict[link]['dst_port_nr']))
+            port = net.getConnectedSwitchPort(
+                vnf_name, dest_intfs_mapping[vnf_name])
+            if port is not None:
+                dest_vnf_outport_nrs.append(int(port['switch_port_nr']))
         # get first switch
         if (src_vnf_name, src_vnf_interface) not in self.lb_flow_cookies:
             self.lb_flow_cookies[(src_vnf_name, src_vnf_interface)] = list()
@@ -604,9 +578,8 @@ class OpenstackManage(object):
 
             # choose free vlan if path contains more than 1 switch
             if len(path) > 1:
-                vlan = net.vlans.pop()
-                if vlan == 0:
-                    vlan = net.vlans.pop()
+                vlan = net.vlans.allocate(
+                    owner=('loadbalancer', src_vnf_name, src_vnf_interface))
             else:
                 vlan = None
 
@@ -789,12 +762,10 @@ class OpenstackManage(object):
         for vnf_name in dest_intfs_mapping:
             if vnf_name not in net.DCNetwork_graph:
                 raise Exception(u"Target VNF %s is not known." % vnf_name)
-            for connected_sw in net.DCNetwork_graph.neighbors(vnf_name):
-                link_dict = net.DCNetwork_graph[vnf_name][connected_sw]
-                for link in link_dict:
-                    if link_dict[link]['src_port_name'] == dest_intfs_mapping[vnf_name]:
-                        dest_vnf_outport_nrs.append(
-                            int(link_dict[link]['dst_port_nr']))
+            port = net.getConnectedSwitchPort(
+                vnf_name, dest_intfs_mapping[vnf_name])
+            if port is not None:
+                dest_vnf_outport_nrs.append(int(port['switch_port_nr']))
 
         if len(dest_vnf_outport_nrs) == 0:
             raise Exception(
@@ -837,7 +808,7 @@ class OpenstackManage(object):
             dst_sw_outport_nr = dest_vnf_outport_nrs[index]
             current_hop = src_sw
             switch_inport_nr = src_sw_inport_nr
-            vlan = net.vlans.pop()
+            vlan = net.vlans.allocate(owner=('floating_lb', cookie))
 
             # iterate all switches on the path
             for i in range(0, len(path)):
@@ -1034,11 +1005,14 @@ class OpenstackManage(object):
             flow['cookie_mask'] = int('0xffffffffffffffff', 16)
 
             flows.append(flow)
+        batch = self.net.ryu_client.new_batch()
         for flow in flows:
             logging.debug("Deleting flowentry with cookie %d" % (
                 flow["cookie"]))
             if self.net.controller == RemoteController:
-                self.net.ryu_REST('stats/flowentry/delete', data=flow)
+                self.net.ryu_REST_async(
+                    'stats/flowentry/delete', data=flow, batch=batch)
+        self.net.ryu_REST_flush(batch)
 
         self.cookies.remove(cookie)
         return True
@@ -1103,17 +1077,22 @@ class OpenstackManage(object):
             group_del["group_id"] = group_id
             delete_group.append(group_del)
 
+        batch = self.net.ryu_client.new_batch()
         for flow in flows:
             logging.debug("Deleting flowentry with cookie %d belonging to lb at %s:%s" % (
                 flow["cookie"], vnf_src_name, vnf_src_interface))
             if self.net.controller == RemoteController:
-                self.net.ryu_REST('stats/flowentry/delete', data=flow)
+                self.net.ryu_REST_async(
+                    'stats/flowentry/delete', data=flow, batch=batch)
+        # the groups can only be deleted once no flow uses them
+        self.net.ryu_REST_flush(batch)
 
         logging.debug("Deleting group with id %s" % group_id)
         for switch_del_group in delete_group:
             if self.net.controller == RemoteController:
-                self.net.ryu_REST("stats/groupentry/delete",
-                                  data=switch_del_group)
+                self.net.ryu_REST_async("stats/groupentry/delete",
+                                        data=switch_del_group, batch=batch)
+        self.net.ryu_REST_flush(batch)
 
         # unmap groupid from the interface
         target_pair = (vnf_src_name, vnf_src_interface)
@@ -1121,6 +1100,9 @@ class OpenstackManage(object):
             del self.flow_groups[target_pair]
         if target_pair in self.full_lb_data:
             del self.full_lb_data[target_pair]
+        # return the vlan tags of the paths to the pool
+        self.net.vlans.release_owner(
+            ('loadbalancer', vnf_src_name, vnf_src_interface))
 
     def delete_floating_lb(self, cookie):
         """
@@ -1135,6 +1117,7 @@ class OpenstackManage(object):
                 "Can not delete floating loadbalancer as the flowcookie is not known")
 
         self.delete_flow_by_cookie(cookie)
+        self.net.vlans.release_owner(('floating_lb', cookie))
         floating_ip = self.floating_cookies[cookie]
         self.floating_network.withdraw_ip_address(floating_ip)
 
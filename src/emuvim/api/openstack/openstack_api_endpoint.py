@@ -116,6 +116,7 @@ class OpenstackApiEndpoint():
         for c in self.openstack_endpoints.values():
             if c.server_thread:
                 c.server_thread.join()
+        self.compute.stack_executor.stop()
         self.manage.stop()
 
     def _wait_for_port(self, ip, port):
@@ -165,11 +165,17 @@ class GlanceListImagesApi(Resource):
             img_is_public = True if "public" in body_data.get(
                 "visibility") else False
             img_container_format = body_data.get("container_format")
-        # try to find ID of already existing image (matched by name)
+        # try to find ID of already existing image (matched by name),
+        # the image might have been pulled right before this call, so
+        # the image catalog is updated if the name is unknown
         img_id = None
-        for image in self.api.compute.images.values():
-            if str(img_name) in image.name:
-                img_id = image.id
+        image = self.api.compute.find_image_by_name_or_id(str(img_name))
+        if image is not None:
+            img_id = image.id
+        else:
+            for image in self.api.compute.images.values():
+                if str(img_name) in image.name:
+                    img_id = image.id
         LOG.debug("Image name: %s" % img_name)
         LOG.debug("Image id: %s" % img_id)
         # build a response body that looks like a real one
@@ -210,13 +216,13 @@ class GlanceImageByIdApi(Resource):
         LOG.debug("API CALL: %s GET" % str(self.__class__.__name__))
         try:
             resp = dict()
-            for image in self.api.compute.images.values():
-                if image.id == id or image.name == id:
-                    resp['id'] = image.id
-                    resp['name'] = image.name
+            image = self.api.compute.find_image_by_name_or_id(id)
+            if image is not None:
+                resp['id'] = image.id
+                resp['name'] = image.name
 
-                    return Response(json.dumps(resp), status=200,
-                                    mimetype="application/json")
+                return Response(json.dumps(resp), status=200,
+                                mimetype="application/json")
 
             response = Response(
                 "Image with id or name %s does not exists." % id, status=404)
@@ -243,8 +249,8 @@ class GlanceImageByDockerNameApi(Resource):
         logging.debug("API CALL: %s GET" % str(self.__class__.__name__))
         try:
             name = "%s/%s" % (owner, container)
-            if name in self.api.compute.images:
-                image = self.api.compute.images[name]
+            image = self.api.compute.find_image_by_name_or_id(name)
+            if image is not None:
                 resp = dict()
                 resp['id'] = image.id
                 resp['name'] = image.name
@@ -41,6 +41,8 @@ class HeatDummyApi(BaseOpenstackDummy):
     def __init__(self, in_ip, in_port, compute):
         super(HeatDummyApi, self).__init__(in_ip, in_port)
         self.compute = compute
+        # if True, create, update and delete requests return before the stack operation is done
+        self.async_stack_operations = True
 
         self.api.add_resource(HeatListAPIVersions, "/",
                               resource_class_kwargs={'api': self})
@@ -125,7 +127,6 @@ class HeatCreateStack(Resource):
 
             stack.template = stack_dict['template']
             stack.creation_time = str(datetime.now())
-            stack.status = "CREATE_COMPLETE"
 
             return_dict = {"stack": {"id": stack.id,
                                      "links": [
@@ -136,7 +137,8 @@ class HeatCreateStack(Resource):
                                          }]}}
 
             self.api.compute.add_stack(stack)
-            self.api.compute.deploy_stack(stack.id)
+            self.api.compute.deploy_stack(
+                stack.id, wait=not self.api.async_stack_operations)
             return Response(json.dumps(return_dict), status=201,
                             mimetype="application/json")
 
@@ -165,7 +167,7 @@ class HeatCreateStack(Resource):
                      "links": [],
                      "stack_name": stack.stack_name,
                      "stack_status": stack.status,
-                     "stack_status_reason": "Stack CREATE completed successfully",
+                     "stack_status_reason": stack.status_reason,
                      "updated_time": stack.update_time,
                      "tags": ""
                      })
@@ -228,8 +230,8 @@ class HeatShowStack(Resource):
                     "stack_name": stack.stack_name,
                     "stack_owner": "The owner of the stack.",  # add stack owner
                     "stack_status": stack.status,
-                    # add status reason
-                    "stack_status_reason": "The reason for the current status of the stack.",
+                    "stack_status_reason": stack.status_reason,
+                    "progress": stack.progress,
                     "template_description": "The description of the stack template.",
                     "stack_user_project_id": "The project UUID of the stack user.",
                     "timeout_mins": "",
@@ -358,7 +360,6 @@ class HeatUpdateStack(Resource):
             stack.id = old_stack.id
             stack.creation_time = old_stack.creation_time
             stack.update_time = str(datetime.now())
-            stack.status = "UPDATE_COMPLETE"
 
             reader = HeatParser(self.api.compute)
             if isinstance(stack_dict['template'], str) or isinstance(
@@ -369,7 +370,8 @@ class HeatUpdateStack(Resource):
                 return 'Could not create stack.', 400
             stack.template = stack_dict['template']
 
-            if not self.api.compute.update_stack(old_stack.id, stack):
+            if not self.api.compute.update_stack(
+                    old_stack.id, stack, wait=not self.api.async_stack_operations):
                 return 'Could not update stack.', 400
 
             return Response(status=202, mimetype="application/json")
@@ -396,13 +398,15 @@ class HeatDeleteStack(Resource):
         LOG.debug("API CALL: %s DELETE" % str(self.__class__.__name__))
         try:
             if stack_name_or_id in self.api.compute.stacks:
-                self.api.compute.delete_stack(stack_name_or_id)
+                self.api.compute.delete_stack(
+                    stack_name_or_id, wait=not self.api.async_stack_operations)
                 return Response("", 204,
                                 mimetype='application/json')
 
             for stack in self.api.compute.stacks.values():
                 if stack.stack_name == stack_name_or_id:
-                    self.api.compute.delete_stack(stack.id)
+                    self.api.compute.delete_stack(
+                        stack.id, wait=not self.api.async_stack_operations)
                     return Response("", 204,
                                     mimetype='application/json')
 
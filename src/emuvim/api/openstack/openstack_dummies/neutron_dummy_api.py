@@ -29,6 +29,7 @@ from emuvim.api.openstack.openstack_dummies.base_openstack_dummy import \
     BaseOpenstackDummy
 from datetime import datetime
 import emuvim.api.openstack.openstack_dummies.neutron_sfc_dummy_api as SFC
+import emuvim.api.openstack.ip_handler as IP
 import logging
 import json
 import uuid
@@ -79,6 +80,12 @@ class NeutronDummyApi(BaseOpenstackDummy):
                               resource_class_kwargs={'api': self})
         self.api.add_resource(NeutronDeletePort, "/v2.0/ports/<port_id>.json", "/v2.0/ports/<port_id>",
                               resource_class_kwargs={'api': self})
+        self.api.add_resource(NeutronListNetworkIpAvailabilities, "/v2.0/network-ip-availabilities.json",
+                              "/v2.0/network-ip-availabilities", resource_class_kwargs={'api': self})
+        self.api.add_resource(NeutronShowNetworkIpAvailability,
+                              "/v2.0/network-ip-availabilities/<network_id>.json",
+                              "/v2.0/network-ip-availabilities/<network_id>",
+                              resource_class_kwargs={'api': self})
         self.api.add_resource(NeutronAddFloatingIp, "/v2.0/floatingips.json", "/v2.0/floatingips",
                               resource_class_kwargs={'api': self})
 
@@ -324,6 +331,65 @@ class NeutronShowNetwork(Resource):
                             mimetype='application/json')
 
 
+class NeutronListNetworkIpAvailabilities(Resource):
+    def __init__(self, api):
+        self.api = api
+
+    def get(self):
+        """
+        Lists the IP address usage of all networks. The usage of the address space
+        the subnets are allocated from is added as 'subnet_pool'.
+
+        :return: Returns a json response, starting with 'network_ip_availabilities' as root node.
+        :rtype: :class:`flask.response`
+        """
+        LOG.debug("API CALL: %s GET" % str(self.__class__.__name__))
+        try:
+            availability_list = list()
+            for net in self.api.compute.nets.values():
+                availability_list.append(net.create_ip_availability_dict())
+            availability_dict = dict()
+            availability_dict["network_ip_availabilities"] = availability_list
+            availability_dict["subnet_pool"] = IP.get_status()
+            return Response(json.dumps(availability_dict),
+                            status=200, mimetype='application/json')
+
+        except Exception as ex:
+            LOG.exception("Neutron: List network IP availabilities exception.")
+            return Response(str(ex), status=500,
+                            mimetype='application/json')
+
+
+class NeutronShowNetworkIpAvailability(Resource):
+    def __init__(self, api):
+        self.api = api
+
+    def get(self, network_id):
+        """
+        Returns the IP address usage of the network, specified via 'network_id'.
+
+        :param network_id: The unique ID string of the network.
+        :type network_id: ``str``
+        :return: Returns a json response, starting with 'network_ip_availability' as root node.
+        :rtype: :class:`flask.response`
+        """
+        LOG.debug("API CALL: %s GET" % str(self.__class__.__name__))
+        try:
+            net = self.api.compute.find_network_by_name_or_id(network_id)
+            if net is None:
+                return Response(u'Network not found.\n',
+                                status=404, mimetype='application/json')
+            availability_dict = dict()
+            availability_dict["network_ip_availability"] = net.create_ip_availability_dict()
+            return Response(json.dumps(availability_dict),
+                            status=200, mimetype='application/json')
+
+        except Exception as ex:
+            LOG.exception("Neutron: Show network IP availability exception.")
+            return Response(str(ex), status=500,
+                            mimetype='application/json')
+
+
 class NeutronCreateNetwork(Resource):
     def __init__(self, api):
         self.api = api
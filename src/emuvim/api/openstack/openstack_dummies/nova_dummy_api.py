@@ -240,9 +240,11 @@ class NovaListServersApi(Resource):
             for flavor in self.api.compute.flavors.values():
                 if flavor.id == server_dict.get('flavorRef', ''):
                     server.flavor = flavor.name
-            for image in self.api.compute.images.values():
-                if image.id in server_dict['imageRef']:
-                    server.image = image.name
+            # the image reference might be a link that ends with the id
+            image = self.api.compute.find_image_by_name_or_id(
+                server_dict.get('imageRef', '').split("/")[-1])
+            if image is not None:
+                server.image = image.name
 
             if networks is not None:
                 for net in networks:
@@ -655,13 +657,13 @@ class NovaListImageById(Resource):
         try:
             resp = dict()
             i = resp['image'] = dict()
-            for image in self.api.compute.images.values():
-                if image.id == imageid or image.name == imageid:
-                    i['id'] = image.id
-                    i['name'] = image.name
+            image = self.api.compute.find_image_by_name_or_id(imageid)
+            if image is not None:
+                i['id'] = image.id
+                i['name'] = image.name
 
-                    return Response(json.dumps(resp), status=200,
-                                    mimetype="application/json")
+                return Response(json.dumps(resp), status=200,
+                                mimetype="application/json")
 
             response = Response(
                 "Image with id or name %s does not exists." % imageid, status=404)
@@ -24,9 +24,10 @@
 # acknowledge the contributions of their colleagues of the SONATA
 # partner consortium (www.sonata-nfv.eu).
 import uuid
+from emuvim.api.openstack.resources.name_index import NamedResource
 
 
-class FlowClassifier(object):
+class FlowClassifier(NamedResource):
     def __init__(self, name):
         self.id = str(uuid.uuid4())
         self.tenant_id = "abcdefghijklmnopqrstuvwxyz123456"
@@ -0,0 +1,140 @@
+# Copyright (c) 2015 SONATA-NFV and Paderborn University
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, Paderborn University
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+
+
+class NamedResource(object):
+    """
+    Base class of resources that are looked up by name.
+    Changes of indexed attributes (e.g. renames) are reported to all
+    NameIndexedDicts that contain the resource.
+    """
+
+    def __setattr__(self, attr, value):
+        indexes = [(index, key) for index, key
+                   in self.__dict__.get("_name_indexes", [])
+                   if attr in index.attributes]
+        if len(indexes) == 0:
+            object.__setattr__(self, attr, value)
+            return
+        old = self.__dict__.get(attr)
+        object.__setattr__(self, attr, value)
+        if old != value:
+            for index, key in indexes:
+                index._reindex(key, self, attr, old, value)
+
+
+class NameIndexedDict(dict):
+    """
+    Dictionary (id -> resource) with a secondary index over the names of
+    its resources, so that resources can be found by name in constant time.
+    """
+
+    def __init__(self, attributes=("name",)):
+        super(NameIndexedDict, self).__init__()
+        self.attributes = tuple(attributes)
+        # name -> list of keys (in insertion order)
+        self._names = dict()
+
+    def find_by_name(self, name):
+        """
+        Return all resources with the given value in one of the indexed
+        attributes.
+        :param name: name
+        :return: list of resources
+        """
+        return [dict.__getitem__(self, k) for k in self._names.get(name, [])]
+
+    def __setitem__(self, key, resource):
+        if key in self:
+            self._unindex(key, dict.__getitem__(self, key))
+        dict.__setitem__(self, key, resource)
+        self._index(key, resource)
+
+    def __delitem__(self, key):
+        resource = dict.__getitem__(self, key)
+        dict.__delitem__(self, key)
+        self._unindex(key, resource)
+
+    def pop(self, key, *default):
+        if key not in self:
+            return dict.pop(self, key, *default)
+        resource = dict.pop(self, key)
+        self._unindex(key, resource)
+        return resource
+
+    def popitem(self):
+        key, resource = dict.popitem(self)
+        self._unindex(key, resource)
+        return key, resource
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def update(self, *args, **kwargs):
+        for key, resource in dict(*args, **kwargs).items():
+            self[key] = resource
+
+    def clear(self):
+        for key in list(self.keys()):
+            del self[key]
+
+    def _index(self, key, resource):
+        for attr in self.attributes:
+            self._add_name(key, getattr(resource, attr, None))
+        if isinstance(resource, NamedResource):
+            resource.__dict__.setdefault("_name_indexes", []).append(
+                (self, key))
+
+    def _unindex(self, key, resource):
+        for attr in self.attributes:
+            self._remove_name(key, getattr(resource, attr, None))
+        indexes = getattr(resource, "__dict__", {}).get("_name_indexes")
+        if indexes is not None:
+            indexes[:] = [(i, k) for i, k in indexes
+                          if i is not self or k != key]
+
+    def _reindex(self, key, resource, attr, old, new):
+        # another indexed attribute might still have the old value
+        if not any(getattr(resource, a, None) == old for a in self.attributes):
+            self._remove_name(key, old)
+        self._add_name(key, new)
+
+    def _add_name(self, key, name):
+        if name is None:
+            return
+        keys = self._names.setdefault(name, [])
+        if key not in keys:
+            keys.append(key)
+
+    def _remove_name(self, key, name):
+        keys = self._names.get(name)
+        if keys is None or key not in keys:
+            return
+        keys.remove(key)
+        if len(keys) == 0:
+            del self._names[name]
@@ -25,9 +25,11 @@
 # partner consortium (www.sonata-nfv.eu).
 import re
 from json import dumps
+from emuvim.api.openstack.resources.name_index import NamedResource
+from emuvim.api.openstack.ipam import AddressPool
 
 
-class Net:
+class Net(NamedResource):
     def __init__(self, name):
         self.name = name
         self.id = None
@@ -39,7 +41,7 @@ class Net:
         self.segmentation_id = None  # not set
         self._cidr = None
         self.start_end_dict = None
-        self._issued_ip_addresses = dict()
+        self._ip_pool = None
 
     def get_short_id(self):
         """
@@ -59,22 +61,33 @@ class Net:
         :return: Returns a unused IP Address or none if all are in use.
         :rtype: ``str``
         """
-        if self.start_end_dict is None:
+        if self._ip_pool is None:
             return None
 
-        # First address as network address not usable
-        int_start_ip = Net.ip_2_int(self.start_end_dict['start']) + 2
-        # Second one is for gateways only
-        # Last address for broadcasts
-        int_end_ip = Net.ip_2_int(self.start_end_dict['end']) - 1
-        while int_start_ip in self._issued_ip_addresses and int_start_ip <= int_end_ip:
-            int_start_ip += 1
+        int_ip = self._ip_pool.allocate(port_name)
+        if int_ip is None:
+            return None
+        return self._int_2_cidr(int_ip)
+
+    def get_new_ip_addresses(self, port_names):
+        """
+        Issues unused IP addresses for all given ports at once.
+
+        :param port_names: Specifies the ports.
+        :type port_names: ``list``
+        :return: Returns a list with one IP address per port or None if there are not enough unused addresses.
+        :rtype: ``list``
+        """
+        if self._ip_pool is None:
+            return None
 
-        if int_start_ip > int_end_ip:
+        int_ips = self._ip_pool.allocate_many(port_names)
+        if int_ips is None:
             return None
+        return [self._int_2_cidr(int_ip) for int_ip in int_ips]
 
-        self._issued_ip_addresses[int_start_ip] = port_name
-        return Net.int_2_ip(int_start_ip) + '/' + self._cidr.rsplit('/', 1)[1]
+    def _int_2_cidr(self, int_ip):
+        return Net.int_2_ip(int_ip) + '/' + self._cidr.rsplit('/', 1)[1]
 
     def assign_ip_address(self, cidr, port_name):
         """
@@ -87,19 +100,9 @@ class Net:
         :return: * *False*: If the IP address is already issued or if it is not within this subnet mask.
             * *True*: Else
         """
-        int_ip = Net.cidr_2_int(cidr)
-        if int_ip in self._issued_ip_addresses:
+        if self._ip_pool is None:
             return False
-
-        # First address as network address not usable
-        int_start_ip = Net.ip_2_int(self.start_end_dict['start']) + 1
-        # Last address for broadcasts
-        int_end_ip = Net.ip_2_int(self.start_end_dict['end']) - 1
-        if int_ip < int_start_ip or int_ip > int_end_ip:
-            return False
-
-        self._issued_ip_addresses[int_ip] = port_name
-        return True
+        return self._ip_pool.assign(Net.cidr_2_int(cidr), port_name)
 
     def is_my_ip(self, cidr, port_name):
         """
@@ -111,14 +114,9 @@ class Net:
         :type port_name: ``str``
         :return: Returns true if the IP address belongs to the port name. Else it returns false.
         """
-        int_ip = Net.cidr_2_int(cidr)
-
-        if int_ip not in self._issued_ip_addresses:
+        if self._ip_pool is None:
             return False
-
-        if self._issued_ip_addresses[int_ip] == port_name:
-            return True
-        return False
+        return self._ip_pool.is_owner(Net.cidr_2_int(cidr), port_name)
 
     def withdraw_ip_address(self, ip_address):
         """
@@ -127,22 +125,21 @@ class Net:
         :param ip_address: The issued IP address.
         :type ip_address: ``str``
         """
-        if ip_address is None:
+        if ip_address is None or self._ip_pool is None:
             return
 
         if "/" in ip_address:
             address, suffix = ip_address.rsplit('/', 1)
         else:
             address = ip_address
-        int_ip_address = Net.ip_2_int(address)
-        if int_ip_address in self._issued_ip_addresses.keys():
-            del self._issued_ip_addresses[int_ip_address]
+        self._ip_pool.release(Net.ip_2_int(address))
 
     def reset_issued_ip_addresses(self):
         """
         Resets all issued IP addresses.
         """
-        self._issued_ip_addresses = dict()
+        if self._ip_pool is not None:
+            self._ip_pool.reset()
 
     def update_port_name_for_ip_address(self, ip_address, port_name):
         """
@@ -153,9 +150,21 @@ class Net:
         :param port_name: The new port name
         :type port_name: ``str``
         """
+        if self._ip_pool is None:
+            return
         address, suffix = ip_address.rsplit('/', 1)
-        int_ip_address = Net.ip_2_int(address)
-        self._issued_ip_addresses[int_ip_address] = port_name
+        self._ip_pool.set_owner(Net.ip_2_int(address), port_name)
+
+    def get_ip_address_status(self):
+        """
+        Returns usage statistics of the IP addresses of the subnet.
+
+        :return: Dict with the number of issued and free addresses or None if the subnet has no CIDR.
+        :rtype: ``dict``
+        """
+        if self._ip_pool is None:
+            return None
+        return self._ip_pool.get_status()
 
     def set_cidr(self, cidr):
         """
@@ -172,14 +181,20 @@ class Net:
                 import emuvim.api.openstack.ip_handler as IP
                 IP.free_cidr(self._cidr, self.subnet_id)
             self._cidr = None
-            self.reset_issued_ip_addresses()
+            self._ip_pool = None
             self.start_end_dict = dict()
             return True
         if not Net.check_cidr_format(cidr):
             return False
 
-        self.reset_issued_ip_addresses()
         self.start_end_dict = Net.calculate_start_and_end_dict(cidr)
+        # First address as network address not usable
+        # Second one is for gateways only, it is not issued automatically
+        # Last address for broadcasts
+        int_start_ip = Net.ip_2_int(self.start_end_dict['start'])
+        int_end_ip = Net.ip_2_int(self.start_end_dict['end'])
+        self._ip_pool = AddressPool(int_start_ip + 1, int_end_ip - 1,
+                                    dynamic_first=int_start_ip + 2)
         self._cidr = cidr
         return True
 
@@ -195,7 +210,7 @@ class Net:
     def clear_cidr(self):
         self._cidr = None
         self.start_end_dict = dict()
-        self.reset_issued_ip_addresses()
+        self._ip_pool = None
 
     def delete_subnet(self):
         self.subnet_id = None
@@ -326,6 +341,34 @@ class Net:
         subnet_dict["enable_dhcp"] = False  # TODO do we support DHCP?
         return subnet_dict
 
+    def create_ip_availability_dict(self):
+        """
+        Creates the IP availability description dictionary of the network.
+
+        :return: IP availability description.
+        :rtype: ``dict``
+        """
+        subnets = list()
+        status = self.get_ip_address_status()
+        if status is not None:
+            subnets.append({
+                "subnet_id": self.subnet_id,
+                "subnet_name": self.subnet_name,
+                "cidr": self.get_cidr(),
+                "ip_version": 4,
+                "total_ips": status["size"],
+                "used_ips": status["allocated"]
+            })
+        availability_dict = dict()
+        availability_dict["network_id"] = self.id
+        availability_dict["network_name"] = self.name
+        availability_dict["tenant_id"] = "abcdefghijklmnopqrstuvwxyz123456"
+        availability_dict["project_id"] = availability_dict["tenant_id"]
+        availability_dict["total_ips"] = sum(s["total_ips"] for s in subnets)
+        availability_dict["used_ips"] = sum(s["used_ips"] for s in subnets)
+        availability_dict["subnet_ip_availability"] = subnets
+        return availability_dict
+
     def __eq__(self, other):
         if self.name == other.name and self.subnet_name == other.subnet_name and \
                 self.gateway_ip == other.gateway_ip and \
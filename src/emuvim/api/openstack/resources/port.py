@@ -26,12 +26,13 @@
 import logging
 import threading
 import uuid
+from emuvim.api.openstack.resources.name_index import NamedResource
 
 lock = threading.Lock()
 intf_names = dict()
 
 
-class Port:
+class Port(NamedResource):
     def __init__(self, name, ip_address=None,
                  mac_address=None, floating_ip=None):
         self.name = name
@@ -26,9 +26,10 @@
 import random
 import uuid
 import logging
+from emuvim.api.openstack.resources.name_index import NamedResource
 
 
-class PortChain(object):
+class PortChain(NamedResource):
     def __init__(self, name):
         self.id = str(uuid.uuid4())
         self.tenant_id = "abcdefghijklmnopqrstuvwxyz123456"
@@ -23,9 +23,10 @@
 # the Horizon 2020 and 5G-PPP programmes. The authors would like to
 # acknowledge the contributions of their colleagues of the SONATA
 # partner consortium (www.sonata-nfv.eu).
+from emuvim.api.openstack.resources.name_index import NamedResource
 
 
-class Server(object):
+class Server(NamedResource):
     def __init__(self, name, id=None, flavor=None,
                  image=None, command=None, nw_list=None):
         self.name = name
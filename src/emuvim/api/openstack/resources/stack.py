@@ -36,12 +36,39 @@ class Stack:
         self.creation_time = None
         self.update_time = None
         self.status = None
+        self.status_reason = None
         self.template = None
         if id is None:
             self.id = str(uuid.uuid4())
         else:
             self.id = id
 
+    def set_status(self, status, reason=None):
+        """
+        Sets the status of the stack, e.g. CREATE_IN_PROGRESS.
+
+        :param status: The new status.
+        :type status: ``str``
+        :param reason: Human readable reason of the status.
+        :type reason: ``str``
+        """
+        self.status = status
+        self.status_reason = reason
+
+    @property
+    def progress(self):
+        """
+        Percentage of servers of the stack that are running in the emulator.
+
+        :return: Progress between 0 and 100.
+        :rtype: ``int``
+        """
+        servers = list(self.servers.values())
+        if len(servers) < 1:
+            return 100
+        started = len([s for s in servers if s.emulator_compute is not None])
+        return int(100 * started / len(servers))
+
     def add_server(self, server):
         """
         Adds one server to the server dictionary.
@@ -0,0 +1,131 @@
+# Copyright (c) 2015 SONATA-NFV and Paderborn University
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, Paderborn University
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+from collections import deque
+import logging
+import threading
+
+LOG = logging.getLogger("api.openstack.stack_executor")
+
+# max. number of stack operations that run at the same time, the DCNetwork
+# serializes their changes of links, graph and resource model (topology_lock)
+DEFAULT_WORKERS = 4
+
+
+class StackOperationExecutor(object):
+    """
+    Runs stack operations (create, update, delete) in background threads, so that the
+    Heat API can return immediately.
+    Operations of the same stack run one after another in the order they were submitted.
+    With more than one worker, operations of different stacks run concurrently.
+    """
+
+    def __init__(self, max_workers=DEFAULT_WORKERS):
+        self.max_workers = max_workers
+        self._lock = threading.Condition()
+        # stack id -> queue of pending operations
+        self._pending = dict()
+        # stack ids with pending operations that are not running right now
+        self._ready = deque()
+        self._running = set()
+        self._workers = list()
+        self._stopped = False
+
+    def submit(self, stack_id, function, *args):
+        """
+        Schedules function(*args) as operation of the given stack.
+
+        :param stack_id: ID of the stack the operation belongs to.
+        :type stack_id: ``str``
+        :param function: The operation.
+        :type function: ``function``
+        """
+        with self._lock:
+            if self._stopped:
+                raise Exception("Stack operation executor is stopped.")
+            queue = self._pending.setdefault(stack_id, deque())
+            queue.append((function, args))
+            if stack_id not in self._running and len(queue) == 1:
+                self._ready.append(stack_id)
+            # start workers lazily
+            self._workers = [w for w in self._workers if w.is_alive()]
+            if len(self._workers) < self.max_workers:
+                w = threading.Thread(target=self._work)
+                w.daemon = True
+                w.start()
+                self._workers.append(w)
+            self._lock.notify()
+
+    def is_busy(self, stack_id):
+        """
+        Returns True if operations of the given stack are pending or running.
+        """
+        with self._lock:
+            return stack_id in self._running or stack_id in self._pending
+
+    def stop(self):
+        """
+        Stops the workers after their current operations. Pending operations are dropped.
+        """
+        with self._lock:
+            self._stopped = True
+            self._pending.clear()
+            self._ready.clear()
+            self._lock.notify_all()
+
+    def _next(self):
+        with self._lock:
+            while len(self._ready) < 1 and not self._stopped:
+                self._lock.wait()
+            if self._stopped:
+                return None, None, None
+            stack_id = self._ready.popleft()
+            function, args = self._pending[stack_id].popleft()
+            self._running.add(stack_id)
+            return stack_id, function, args
+
+    def _done(self, stack_id):
+        with self._lock:
+            self._running.discard(stack_id)
+            queue = self._pending.get(stack_id)
+            if queue is None:
+                return
+            if len(queue) > 0:
+                self._ready.append(stack_id)
+                self._lock.notify()
+            else:
+                del self._pending[stack_id]
+
+    def _work(self):
+        while True:
+            stack_id, function, args = self._next()
+            if stack_id is None:
+                return
+            try:
+                function(*args)
+            except Exception:
+                LOG.exception("Stack operation of %s failed." % stack_id)
+            finally:
+                self._done(stack_id)
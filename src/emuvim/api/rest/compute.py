@@ -35,6 +35,8 @@ CORS_HEADER = {'Access-Control-Allow-Origin': '*'}
 
 # the dcs dict is set in the rest_api_endpoint.py upon datacenter init
 dcs = {}
+# the DCNetwork is set in the rest_api_endpoint.py upon network init
+net = None
 
 
 class Compute(Resource):
@@ -154,9 +156,13 @@ class ComputeList(Resource):
         try:
             if dc_label is None or dc_label == 'None':
                 # return list with all compute nodes in all DCs
-                all_containers = []
-                for dc in dcs.values():
-                    all_containers += dc.listCompute()
+                if net is not None:
+                    all_containers = [c for c in net.getAllContainers()
+                                      if str(c.datacenter) in dcs]
+                else:
+                    all_containers = []
+                    for dc in dcs.values():
+                        all_containers += dc.listCompute()
                 container_list = [(c.name, c.getStatus())
                                   for c in all_containers]
                 return container_list, 200, CORS_HEADER
@@ -248,7 +254,20 @@ class DatacenterList(Resource):
     def get(self):
         logging.debug("API CALL: datacenter list")
         try:
-            return [d.getStatus() for d in dcs.values()], 200, CORS_HEADER
+            if net is None:
+                return [d.getStatus() for d in dcs.values()], 200, CORS_HEADER
+            # use the read-only copy of the topology
+            dc_list = list()
+            for label, status in net.getTopologySnapshot().datacenters.items():
+                if label not in dcs:
+                    continue
+                # the state of the warm container pools changes independently
+                status = dict(status)
+                pool = dcs[label].container_pool
+                status["container_pool"] = (None if pool is None
+                                            else pool.get_status())
+                dc_list.append(status)
+            return dc_list, 200, CORS_HEADER
         except Exception as ex:
             logging.exception("API error.")
             return ex.message, 500, CORS_HEADER
@@ -0,0 +1,94 @@
+# Copyright (c) 2015 SONATA-NFV and Paderborn University
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, Paderborn University
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+import logging
+import json
+import time
+import gevent
+from flask_restful import Resource
+from flask import request, Response
+
+logging.basicConfig()
+
+CORS_HEADER = {'Access-Control-Allow-Origin': '*'}
+
+# the global net is set from the topology file, and connected via
+# connectDCNetwork function in rest_api_endpoint.py
+net = None
+
+# seconds between two checks for new events (the HTTP server is
+# gevent based, so we must not block in a queue)
+POLL_INTERVAL = 0.2
+# seconds after which a keep-alive comment is sent
+KEEPALIVE_INTERVAL = 15
+
+
+class EventStream(Resource):
+    """
+    Server-sent events (text/event-stream) of the emulator:
+    container_start/stop, link_add/remove, chain_install/remove,
+    resource_update and monitoring_sample.
+        url params:
+            types: comma separated list of event types (default: all)
+    Reconnecting clients get the missed events (Last-Event-ID header).
+    """
+    global net
+
+    def get(self):
+        logging.debug("API CALL: event stream")
+        types = request.args.get("types")
+        if types:
+            types = [t.strip() for t in types.split(",")]
+        last_event_id = request.headers.get("Last-Event-ID")
+        try:
+            last_event_id = int(last_event_id)
+        except (TypeError, ValueError):
+            last_event_id = None
+        subscription = net.events.subscribe(
+            types=types, last_event_id=last_event_id)
+        return Response(self._stream(subscription),
+                        mimetype="text/event-stream",
+                        headers=dict(CORS_HEADER, **{
+                            "Cache-Control": "no-cache"}))
+
+    @staticmethod
+    def _stream(subscription):
+        try:
+            last_sent = time.time()
+            while True:
+                events = subscription.poll()
+                for e in events:
+                    yield "id: %d\nevent: %s\ndata: %s\n\n" % (
+                        e["id"], e["type"], json.dumps(
+                            {"timestamp": e["timestamp"], "data": e["data"]}))
+                if len(events) > 0:
+                    last_sent = time.time()
+                elif time.time() - last_sent > KEEPALIVE_INTERVAL:
+                    # detects closed connections
+                    yield ": keep-alive\n\n"
+                    last_sent = time.time()
+                gevent.sleep(POLL_INTERVAL)
+        finally:
+            subscription.close()
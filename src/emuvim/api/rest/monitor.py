@@ -262,6 +262,47 @@ class MonitorLinkAction(Resource):
             return ex.message, 500, CORS_HEADER
 
 
+class MonitorHistory(Resource):
+    """
+    Get the sample history of the monitored interfaces and flows
+    :param vnf_name: name of the VNF (default: all)
+    :param vnf_interface: name of the VNF interface (default: all)
+    :param metric: tx_bytes, rx_bytes, tx_packets, rx_packets (default: all)
+    :param cookie: cookie of a monitored flow (default: all)
+    :param alpha: smoothing factor of the EWMA of the rates
+    :param percentiles: comma separated list of percentiles of the rates (default: 50,90,99)
+    :param samples: number of newest raw samples to return (default: 0)
+    :return: list of dicts with rate, ewma, percentiles (per second) and samples
+    """
+    global net
+
+    def get(self):
+        logging.debug("REST CALL: get monitor history")
+        # get URL parameters
+        data = request.args
+        if data is None:
+            data = {}
+        try:
+            percentiles = []
+            for p in data.get("percentiles", "50,90,99").split(","):
+                if p:
+                    p = float(p)
+                    percentiles.append(int(p) if p.is_integer() else p)
+            alpha = data.get("alpha")
+            c = net.monitor_agent.get_history(
+                vnf_name=data.get("vnf_name"),
+                vnf_interface=data.get("vnf_interface"),
+                metric=data.get("metric"),
+                cookie=data.get("cookie"),
+                alpha=float(alpha) if alpha else None,
+                percentiles=percentiles,
+                n_samples=int(data.get("samples", 0)))
+            return c, 200, CORS_HEADER
+        except Exception as ex:
+            logging.exception("API error.")
+            return ex.message, 500, CORS_HEADER
+
+
 class MonitorSkewAction(Resource):
     """
     Monitor the counters of a VNF interface
@@ -28,9 +28,10 @@
 # Networking and monitoring functions
 # (c) 2015 by Steven Van Rossem <steven.vanrossem@intec.ugent.be>
 import logging
+import hashlib
+import json
 from flask_restful import Resource
 from flask import request
-import networkx
 
 logging.basicConfig()
 
@@ -118,30 +119,119 @@ class NetworkAction(Resource):
             return str(ex), 500, CORS_HEADER
 
 
+class NetworkStatus(Resource):
+    """
+    Usage statistics of the emulated network: the vlan tag pool
+    used for chains and E-LANs and the number of installed chains.
+    """
+
+    global net
+
+    def get(self):
+        logging.debug("API CALL: network status")
+        try:
+            status = {
+                "vlans": net.vlans.get_status(),
+                "n_chains": len(net.installed_chains)
+            }
+            return status, 200, CORS_HEADER
+        except Exception as ex:
+            logging.exception("API error.")
+            return str(ex), 500, CORS_HEADER
+
+
+# link attributes included in the D3 graph
+D3_LINK_ATTRIBUTES = ['bw', 'delay', 'jitter', 'loss',
+                      'src_port_name', 'dst_port_name']
+
+
 class DrawD3jsgraph(Resource):
+    """
+    Topology as D3 force layout graph: {"nodes": [...], "links": [...]}.
+    Links to monitored VNF interfaces contain the newest traffic rates
+    per second ("rates"). Supports ETag/If-None-Match, unchanged
+    graphs are answered with 304.
+    """
 
     global net
 
     def get(self):
+        # the graph is computed once per topology version
+        topology = net.getTopologySnapshot()
+        graph, vnf_links = topology.render("d3js", self._render)
+        # add the traffic rates of the monitored interfaces
+        rates = dict()
+        if net.monitor_agent is not None:
+            rates = net.monitor_agent.get_interface_rates()
+        link_rates = dict()
+        for i, vnf_name, port_id, port_name in vnf_links:
+            r = rates.get((vnf_name, port_id)) or rates.get(
+                (vnf_name, port_name))
+            if r is not None:
+                link_rates[i] = r
+        if len(link_rates) > 0:
+            links = list(graph["links"])
+            for i, r in link_rates.items():
+                links[i] = dict(links[i], rates=r)
+            graph = {"nodes": graph["nodes"], "links": links}
+            etag = "%d-%s" % (topology.version, hashlib.md5(json.dumps(
+                sorted(link_rates.items())).encode()).hexdigest())
+        else:
+            etag = str(topology.version)
+        headers = dict(CORS_HEADER)
+        headers['ETag'] = '"%s"' % etag
+        if self._etag_matches(etag):
+            return '', 304, headers
+        return graph, 200, headers
+
+    @staticmethod
+    def _etag_matches(etag):
+        header = request.headers.get('If-None-Match')
+        if header is None:
+            return False
+        for tag in header.split(','):
+            tag = tag.strip()
+            if tag.startswith('W/'):
+                tag = tag[2:]
+            if tag == '*' or tag.strip('"') == etag:
+                return True
+        return False
+
+    @staticmethod
+    def _render(topology):
+        """
+        :return: (graph, list of (link index, vnf name, port id, port name)
+            for all links that start or end at a container)
+        """
         nodes = list()
-        nodes2 = list()
+        index = dict()
+        # add all nodes
+        for node_name, node_attr in topology.nodes.items():
+            index[node_name] = len(nodes)
+            nodes.append({"name": node_name, "group": node_attr.get('type')})
+
+        # add one link per connected pair of nodes and direction
         links = list()
-        # add all DCs
-        node_attr = networkx.get_node_attributes(net.DCNetwork_graph, 'type')
-        for node_name in net.DCNetwork_graph.nodes():
-            nodes2.append(node_name)
-            type = node_attr[node_name]
-            node_dict = {"name": node_name, "group": type}
-            nodes.append(node_dict)
-
-        # add links between other DCs
-        for node1_name in net.DCNetwork_graph.nodes():
-            node1_index = nodes2.index(node1_name)
-            for node2_name in net.DCNetwork_graph.neighbors(node1_name):
-                node2_index = nodes2.index(node2_name)
-                edge_dict = {"source": node1_index,
-                             "target": node2_index, "value": 10}
-                links.append(edge_dict)
-
-        json = {"nodes": nodes, "links": links}
-        return json, 200, CORS_HEADER
+        vnf_links = list()
+        seen = set()
+        for node1_name, node2_name, _, data in topology.edges:
+            if (node1_name, node2_name) in seen:
+                continue
+            seen.add((node1_name, node2_name))
+            edge_dict = {"source": index[node1_name],
+                         "target": index[node2_name], "value": 10}
+            for attr in D3_LINK_ATTRIBUTES:
+                if data.get(attr) is not None:
+                    edge_dict[attr] = data.get(attr)
+            # remember links of containers to add their traffic rates
+            if topology.nodes[node1_name].get('type') == 'docker':
+                vnf_links.append((len(links), node1_name,
+                                  data.get('src_port_id'),
+                                  data.get('src_port_name')))
+            elif topology.nodes[node2_name].get('type') == 'docker':
+                vnf_links.append((len(links), node2_name,
+                                  data.get('dst_port_id'),
+                                  data.get('dst_port_name')))
+            links.append(edge_dict)
+
+        return {"nodes": nodes, "links": links}, vnf_links
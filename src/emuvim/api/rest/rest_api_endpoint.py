@@ -36,10 +36,14 @@ from emuvim.api.rest.compute import ComputeList, Compute, ComputeResources, Data
 
 # need to import total module to set its global variable net
 from emuvim.api.rest import network
-from emuvim.api.rest.network import NetworkAction, DrawD3jsgraph
+from emuvim.api.rest.network import NetworkAction, DrawD3jsgraph, NetworkStatus
 
 from emuvim.api.rest import monitor
-from emuvim.api.rest.monitor import MonitorInterfaceAction, MonitorFlowAction, MonitorLinkAction, MonitorSkewAction, MonitorTerminal
+from emuvim.api.rest.monitor import MonitorInterfaceAction, MonitorFlowAction, MonitorLinkAction, MonitorSkewAction, \
+    MonitorTerminal, MonitorHistory
+
+from emuvim.api.rest import events
+from emuvim.api.rest.events import EventStream
 
 import pkg_resources
 from os import path
@@ -94,6 +98,8 @@ class RestApiEndpoint(object):
                               "/restapi/network")
         self.api.add_resource(DrawD3jsgraph,
                               "/restapi/network/d3jsgraph")
+        self.api.add_resource(NetworkStatus,
+                              "/restapi/network/status")
 
         # monitoring related actions
         # export a network interface traffic rate counter
@@ -107,6 +113,9 @@ class RestApiEndpoint(object):
         # the traffic counters of the newly installed monitor flow are exported
         self.api.add_resource(MonitorLinkAction,
                               "/restapi/monitor/link")
+        # sample history and derived rates of the monitored interfaces and flows
+        self.api.add_resource(MonitorHistory,
+                              "/restapi/monitor/history")
         # install skewness monitor of resource usage disribution
         # the skewness metric is exported
         self.api.add_resource(MonitorSkewAction,
@@ -115,6 +124,10 @@ class RestApiEndpoint(object):
         self.api.add_resource(MonitorTerminal,
                               "/restapi/monitor/term")
 
+        # stream of topology and deployment events (server-sent events)
+        self.api.add_resource(EventStream,
+                              "/restapi/events")
+
         logging.debug("Created API endpoint %s(%s:%d)" %
                       (self.__class__.__name__, self.ip, self.port))
 
@@ -137,6 +150,8 @@ class RestApiEndpoint(object):
     def connectDCNetwork(self, DCnetwork):
         network.net = DCnetwork
         monitor.net = DCnetwork
+        compute.net = DCnetwork
+        events.net = DCnetwork
 
         logging.info("Connected DCNetwork to API endpoint %s(%s:%d)" % (
             self.__class__.__name__, self.ip, self.port))
@@ -39,8 +39,8 @@ from subprocess import Popen
 from random import randint
 import ipaddress
 import copy
-import time
 from functools import reduce
+from emuvim.dcemulator.concurrency import wait_for_threads
 
 logging.basicConfig()
 LOG = logging.getLogger("sonata-dummy-gatekeeper")
@@ -102,7 +102,7 @@ ELINE_SUBNETS = generate_subnets('10.30', 0, subnet_size=50, mask=30)
 # path to the VNFD for the SAP VNF that is deployed as internal SAP point
 SAP_VNFD = None
 
-# Time in seconds to wait for vnf stop scripts to execute fully
+# Max. time in seconds to wait for vnf stop scripts to execute fully
 VNF_STOP_WAIT_TIME = 5
 
 
@@ -229,8 +229,14 @@ class Service(object):
             GK.net.deployed_elines.extend(eline_fwd_links)
             GK.net.deployed_elans.extend(elan_fwd_links)
 
-            # 5a. deploy E-Line links
-            self._connect_elines(eline_fwd_links, instance_uuid)
+            # 5a. deploy E-Line links (flows of all E-Lines in one batch)
+            GK.net.startFlowBatch()
+            try:
+                self._connect_elines(eline_fwd_links, instance_uuid)
+            except Exception:
+                GK.net.discardFlowBatch()
+                raise
+            GK.net.commitFlowBatch()
 
             # 5b. deploy E-LAN links
             self._connect_elans(elan_fwd_links, instance_uuid)
@@ -256,13 +262,21 @@ class Service(object):
         # instance_uuid = str(self.uuid.uuid4())
         vnf_instances = self.instances[instance_uuid]["vnf_instances"]
 
-        # trigger stop skripts in vnf instances and wait a few seconds for
-        # completion
-        self._trigger_emulator_stop_scripts_in_vnfis(vnf_instances)
-        time.sleep(VNF_STOP_WAIT_TIME)
-
-        for v in vnf_instances:
-            self._stop_vnfi(v)
+        # trigger stop skripts in vnf instances and wait until they are
+        # completed (max. VNF_STOP_WAIT_TIME)
+        stop_scripts = self._trigger_emulator_stop_scripts_in_vnfis(
+            vnf_instances)
+        wait_for_threads(stop_scripts, VNF_STOP_WAIT_TIME)
+
+        if GK.net is not None:
+            # containers are removed concurrently
+            for r in GK.net.stopComputeBatch([v.name for v in vnf_instances]):
+                if r.get("error") is not None:
+                    LOG.error("Could not stop %r: %r" %
+                              (r.get("name"), r.get("error")))
+        else:
+            for v in vnf_instances:
+                self._stop_vnfi(v)
 
         for sap_name in self.saps_ext:
             ext_sap = self.saps[sap_name]
@@ -272,9 +286,10 @@ class Service(object):
                      (sap_name, target_dc))
 
         if not GK_STANDALONE_MODE:
+            # return the vlan tags of the E-Lines and E-LANs to the pool
+            GK.net.releaseVlanTags(instance_uuid)
             # remove placement?
             # self._remove_placement(RoundRobinPlacement)
-            None
 
         # last step: remove the instance from the list of all instances
         del self.instances[instance_uuid]
@@ -416,9 +431,16 @@ class Service(object):
         :return:
         """
         dn = vnf_id
-        for vnfi in self.instances[instance_uuid]["vnf_instances"]:
-            if vnfi.name == dn:
+        vnfis = self.instances[instance_uuid]["vnf_instances"]
+        if GK.net is not None:
+            # container names are unique, use the index of the emulator
+            vnfi = GK.net.getContainerByName(dn)
+            if vnfi is not None and vnfi in vnfis:
                 return vnfi
+        else:
+            for vnfi in vnfis:
+                if vnfi.name == dn:
+                    return vnfi
         LOG.warning("No container with name: {0} found.".format(dn))
         return None
 
@@ -468,6 +490,11 @@ class Service(object):
                     t.start()
 
     def _trigger_emulator_stop_scripts_in_vnfis(self, vnfi_list):
+        """
+        Execute the stop scripts of the given VNF instances.
+        :return: list of threads executing the scripts
+        """
+        threads = list()
         for vnfi in vnfi_list:
             config = vnfi.dcinfo.get("Config", dict())
             env = config.get("Env", list())
@@ -481,6 +508,8 @@ class Service(object):
                     t = threading.Thread(target=vnfi.cmdPrint, args=(cmd,))
                     t.daemon = True
                     t.start()
+                    threads.append(t)
+        return threads
 
     def _unpack_service_package(self):
         """
@@ -698,7 +727,8 @@ class Service(object):
                 GK.net.setChain(
                     src_id, dst_id,
                     vnf_src_interface=src_if_name, vnf_dst_interface=dst_if_name,
-                    bidirectional=BIDIRECTIONAL_CHAIN, cmd="add-flow", cookie=cookie, priority=10)
+                    bidirectional=BIDIRECTIONAL_CHAIN, cmd="add-flow", cookie=cookie, priority=10,
+                    owner=instance_uuid)
                 LOG.debug(
                     "Setting up E-Line link. (%s:%s) -> (%s:%s)" % (
                         src_id, src_if_name, dst_id, dst_if_name))
@@ -765,7 +795,7 @@ class Service(object):
                         {'name': src_docker_name, 'interface': intf_name})
 
             # install the VLAN tags for this E-LAN
-            GK.net.setLAN(elan_vnf_list)
+            GK.net.setLAN(elan_vnf_list, owner=instance_uuid)
 
     def _load_docker_files(self):
         """
@@ -45,7 +45,7 @@ from gevent.pywsgi import WSGIServer
 from subprocess import Popen
 import ipaddress
 import copy
-import time
+from emuvim.dcemulator.concurrency import wait_for_threads
 
 
 LOG = logging.getLogger("5gtango.llcm")
@@ -89,7 +89,7 @@ AUTO_DELETE = False
 ELAN_SUBNETS = None
 ELINE_SUBNETS = None
 
-# Time in seconds to wait for vnf stop scripts to execute fully
+# Max. time in seconds to wait for vnf stop scripts to execute fully
 VNF_STOP_WAIT_TIME = 5
 
 # If services are instantiated multiple times, the public port
@@ -214,22 +214,30 @@ class Service(object):
         self._instance_counter += 1
 
         # 3. start all vnfds that we have in the service
+        # (the containers of all VNFDs are created concurrently)
+        computes = list()
         for vnf_id in self.vnfds:
             vnfd = self.vnfds[vnf_id]
-            # attention: returns a list of started deployment units
-            vnfis = self._start_vnfd(
-                vnfd, vnf_id, self.instances[instance_uuid]["ssiid"])
-            # add list of VNFIs to total VNFI list
-            self.instances[instance_uuid]["vnf_instances"].extend(vnfis)
+            computes.extend(self._get_vnfd_computes(
+                vnfd, vnf_id, self.instances[instance_uuid]["ssiid"]))
+        vnfis = self._start_computes(computes)
+        # add list of VNFIs to total VNFI list
+        self.instances[instance_uuid]["vnf_instances"].extend(vnfis)
 
         # 4. Deploy E-Line, E-Tree and E-LAN links
         # Attention: Only done if ""forwarding_graphs" section in NSD exists,
         # even if "forwarding_graphs" are not used directly.
         # Attention2: Do a copy of *_subnets with list() is important here!
         eline_fwd_links, elan_fwd_links = self._get_elines_and_elans()
-        # 5a. deploy E-Line links
+        # 5a. deploy E-Line links (flows of all E-Lines in one batch)
         GK.net.deployed_elines.extend(eline_fwd_links)  # bookkeeping
-        self._connect_elines(eline_fwd_links, instance_uuid, list(self.eline_subnets))
+        GK.net.startFlowBatch()
+        try:
+            self._connect_elines(eline_fwd_links, instance_uuid, list(self.eline_subnets))
+        except Exception:
+            GK.net.discardFlowBatch()
+            raise
+        GK.net.commitFlowBatch()
         # 5b. deploy E-Tree/E-LAN links
         GK.net.deployed_elans.extend(elan_fwd_links)  # bookkeeping
         self._connect_elans(elan_fwd_links, instance_uuid, list(self.elan_subnets))
@@ -256,13 +264,18 @@ class Service(object):
         # get relevant information
         # instance_uuid = str(self.uuid.uuid4())
         vnf_instances = self.instances[instance_uuid]["vnf_instances"]
-        # trigger stop skripts in vnf instances and wait a few seconds for
-        # completion
-        self._trigger_emulator_stop_scripts_in_vnfis(vnf_instances)
-        time.sleep(VNF_STOP_WAIT_TIME)
-        # stop all vnfs
-        for v in vnf_instances:
-            self._stop_vnfi(v)
+        # trigger stop skripts in vnf instances and wait until they are
+        # completed (max. VNF_STOP_WAIT_TIME)
+        stop_scripts = self._trigger_emulator_stop_scripts_in_vnfis(
+            vnf_instances)
+        wait_for_threads(stop_scripts, VNF_STOP_WAIT_TIME)
+        # stop all vnfs (containers are removed concurrently)
+        for r in GK.net.stopComputeBatch([v.name for v in vnf_instances]):
+            if r.get("error") is not None:
+                LOG.error("Could not stop {}: {}"
+                          .format(r.get("name"), r.get("error")))
+        # return the vlan tags of the E-Lines and E-LANs to the pool
+        GK.net.releaseVlanTags(instance_uuid)
         # last step: remove the instance from the list of all instances
         del self.instances[instance_uuid]
 
@@ -325,7 +338,47 @@ class Service(object):
         :param vnf_id: unique id of this vnf in the nsd
         :return:
         """
+        return self._start_computes(
+            self._get_vnfd_computes(vnfd, vnf_id, ssiid, **kwargs))
+
+    def _start_computes(self, computes):
+        """
+        Start the containers of one or more deployment units
+        at once using DCNetwork.startComputeBatch.
+        :param computes: list of (startComputeBatch arguments, vnfi attributes)
+        :return: list of started deployment units
+        """
+        results = GK.net.startComputeBatch([c for c, _ in computes])
+        failed = [r for r in results if r.get("container") is None]
+        if len(failed) > 0:
+            # the VNFIs are not recorded yet, remove the started containers
+            # of this batch, otherwise stop_service would never stop them
+            started = [r.get("name") for r in results
+                       if r.get("container") is not None]
+            if len(started) > 0:
+                GK.net.stopComputeBatch(started)
+            raise Exception("Could not start {}: {}"
+                            .format(failed[0].get("name"), failed[0].get("error")))
         vnfis = list()
+        for (_, attrs), r in zip(computes, results):
+            LOG.debug("Started %r in %r: %r" %
+                      (r.get("name"), r.get("datacenter"), r.get("timings")))
+            vnfi = r.get("container")
+            for k, v in attrs.items():
+                setattr(vnfi, k, v)
+            # store vnfi
+            vnfis.append(vnfi)
+        return vnfis
+
+    def _get_vnfd_computes(self, vnfd, vnf_id, ssiid, **kwargs):
+        """
+        Place the deployment units of a single VNFD of this service
+        and collect the arguments to start their containers.
+        :param vnfd: vnfd descriptor dict
+        :param vnf_id: unique id of this vnf in the nsd
+        :return: list of (startComputeBatch arguments, vnfi attributes)
+        """
+        computes = list()
         # the vnf_name refers to the container image to be deployed
         vnf_name = vnfd.get("name")
         # combine VDUs and CDUs
@@ -428,13 +481,13 @@ class Service(object):
             # 5.5 handle optional cap_add setting
             cap_add = u.get("cap_add", [])
 
-            # 6. Start the container
+            # 6. Collect the arguments to start the container
             LOG.info("Starting %r as %r in DC %r" %
                      (vnf_name, vnf_container_instance_name, target_dc))
             LOG.debug("Interfaces for %r: %r" % (vnf_id, intfs))
-            # start the container
-            vnfi = target_dc.startCompute(
-                vnf_container_instance_name,
+            compute = dict(
+                datacenter=target_dc,
+                name=vnf_container_instance_name,
                 network=intfs,
                 image=docker_image_name,
                 cpu_quota=cpu_quota,
@@ -451,37 +504,25 @@ class Service(object):
                 devices=devices,
                 cap_add=cap_add,
                 type=kwargs.get('type', 'docker'))
-            # add vnfd reference to vnfi
-            vnfi.vnfd = vnfd
-            # add container name
-            vnfi.vnf_container_name = vnf_container_name
-            vnfi.vnf_container_instance_name = vnf_container_instance_name
-            vnfi.ssiid = ssiid
-            # store vnfi
-            vnfis.append(vnfi)
-        return vnfis
-
-    def _stop_vnfi(self, vnfi):
-        """
-        Stop a VNF instance.
-        :param vnfi: vnf instance to be stopped
-        """
-        # Find the correct datacenter
-        status = vnfi.getStatus()
-        dc = vnfi.datacenter
-        # stop the vnfi
-        LOG.info("Stopping the vnf instance contained in %r in DC %r" %
-                 (status["name"], dc))
-        dc.stopCompute(status["name"])
+            # vnfd reference and container names added to the vnfi
+            attrs = dict(
+                vnfd=vnfd,
+                vnf_container_name=vnf_container_name,
+                vnf_container_instance_name=vnf_container_instance_name,
+                ssiid=ssiid)
+            computes.append((compute, attrs))
+        return computes
 
     def _get_vnf_instance(self, instance_uuid, vnf_id):
         """
         Returns VNFI object for a given "vnf_id" or "vnf_container_name" taken from an NSD.
         :return: single object
         """
-        for vnfi in self.instances[instance_uuid]["vnf_instances"]:
-            if str(vnfi.name) == str(vnf_id):
-                return vnfi
+        vnfis = self.instances[instance_uuid]["vnf_instances"]
+        # container names are unique, use the index of the emulator
+        vnfi = GK.net.getContainerByName(str(vnf_id))
+        if vnfi is not None and vnfi in vnfis:
+            return vnfi
         LOG.warning("No container with name: {0} found.".format(vnf_id))
         return None
 
@@ -549,6 +590,11 @@ class Service(object):
                     break  # only execute one command
 
     def _trigger_emulator_stop_scripts_in_vnfis(self, vnfi_list):
+        """
+        Execute the stop scripts of the given VNF instances.
+        :return: list of threads executing the scripts
+        """
+        threads = list()
         for vnfi in vnfi_list:
             config = vnfi.dcinfo.get("Config", dict())
             env = config.get("Env", list())
@@ -562,7 +608,9 @@ class Service(object):
                     t = threading.Thread(target=vnfi.cmdPrint, args=(cmd,))
                     t.daemon = True
                     t.start()
+                    threads.append(t)
                     break  # only execute one command
+        return threads
 
     def _load_instance_conf_envs(self, cname):
         """
@@ -716,7 +764,8 @@ class Service(object):
                 GK.net.setChain(
                     src_id, dst_id,
                     vnf_src_interface=src_if_name, vnf_dst_interface=dst_if_name,
-                    bidirectional=BIDIRECTIONAL_CHAIN, cmd="add-flow", cookie=cookie, priority=10)
+                    bidirectional=BIDIRECTIONAL_CHAIN, cmd="add-flow", cookie=cookie, priority=10,
+                    owner=instance_uuid)
 
     def _get_vnfd_cp_from_vnfi(self, vnfi, ifname):
         """
@@ -787,7 +836,7 @@ class Service(object):
                         elan_vnf_list.append(
                             {'name': container_name, 'interface': intf_name})
             # install the VLAN tags for this E-LAN
-            GK.net.setLAN(elan_vnf_list)
+            GK.net.setLAN(elan_vnf_list, owner=instance_uuid)
 
     def _load_docker_files(self):
         """
@@ -86,6 +86,18 @@ class RestApiClient():
         response = put(url, params=params)
         pp.pprint(response.text)
 
+    def history(self, args):
+        params = self._create_dict(
+            vnf_name=self._parse_vnf_name(args.get("vnf_name")),
+            vnf_interface=self._parse_vnf_interface(args.get("vnf_name")),
+            metric=args.get("metric"),
+            cookie=args.get("cookie"),
+            samples=args.get("samples"))
+
+        url = "{0}/restapi/monitor/history".format(args.get("endpoint"))
+        response = get(url, params=params)
+        pp.pprint(response.json())
+
     def prometheus(self, args):
         # This functions makes it more user-friendly to create the correct prometheus query
         # <uuid> is replaced by the correct uuid of the deployed vnf container
@@ -103,6 +115,8 @@ class RestApiClient():
         pp.pprint(response)
 
     def _parse_vnf_name(self, vnf_name_str):
+        if vnf_name_str is None:
+            return None
         vnf_name = vnf_name_str.split(':')[0]
         return vnf_name
 
@@ -122,8 +136,8 @@ parser = argparse.ArgumentParser(description='son-emu-cli monitor')
 parser.add_argument(
     "command",
     choices=['setup_metric', 'stop_metric',
-             'setup_flow', 'stop_flow', 'prometheus'],
-    help="setup/stop a metric/flow to be monitored or query Prometheus")
+             'setup_flow', 'stop_flow', 'history', 'prometheus'],
+    help="setup/stop a metric/flow to be monitored, get its history (rates) or query Prometheus")
 parser.add_argument(
     "--vnf_name", "-vnf", dest="vnf_name",
     help="vnf name:interface to be monitored")
@@ -133,6 +147,9 @@ parser.add_argument(
 parser.add_argument(
     "--cookie", "-c", dest="cookie",
     help="flow cookie to monitor")
+parser.add_argument(
+    "--samples", "-s", dest="samples",
+    help="number of raw samples to show (history)")
 parser.add_argument(
     "--query", "-q", dest="query",
     help="prometheus query")
@@ -0,0 +1,171 @@
+# Copyright (c) 2015 SONATA-NFV and Paderborn University
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, Paderborn University
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+import logging
+import threading
+
+LOG = logging.getLogger("dcemulator.chains")
+LOG.setLevel(logging.DEBUG)
+
+
+class ChainRegistry(object):
+    """
+    Registry of the chains installed by DCNetwork.setChain.
+    Chains are stored as dicts and keyed by
+    (vnf_src_name, vnf_src_interface, vnf_dst_name, vnf_dst_interface),
+    secondary indexes allow to look them up by cookie and by VNF name.
+    All lookups and removals are O(1) in the number of installed chains.
+    """
+
+    def __init__(self):
+        # key -> chain dict
+        self._chains = dict()
+        # cookie -> set of keys
+        self._by_cookie = dict()
+        # vnf name -> set of keys
+        self._by_vnf = dict()
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def key(vnf_src_name, vnf_src_interface, vnf_dst_name, vnf_dst_interface):
+        return (vnf_src_name, vnf_src_interface,
+                vnf_dst_name, vnf_dst_interface)
+
+    @staticmethod
+    def _chain_key(chain_dict):
+        return ChainRegistry.key(chain_dict['vnf_src_name'],
+                                 chain_dict['vnf_src_interface'],
+                                 chain_dict['vnf_dst_name'],
+                                 chain_dict['vnf_dst_interface'])
+
+    def __len__(self):
+        return len(self._chains)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._chains.values()))
+
+    def __contains__(self, key):
+        return key in self._chains
+
+    def add(self, chain_dict):
+        """
+        Register a chain. An existing chain with the same key is replaced.
+        :param chain_dict: dict with at least the keys vnf_src_name,
+            vnf_src_interface, vnf_dst_name, vnf_dst_interface
+            (optional: cookie)
+        :return: the replaced chain dict or None
+        """
+        key = self._chain_key(chain_dict)
+        with self._lock:
+            old = self._remove_key(key)
+            if old is not None:
+                LOG.warning("Chain %r already registered, replacing it." %
+                            (key,))
+            self._chains[key] = chain_dict
+            self._by_cookie.setdefault(
+                chain_dict.get('cookie'), set()).add(key)
+            for vnf_name in set([key[0], key[2]]):
+                self._by_vnf.setdefault(vnf_name, set()).add(key)
+        return old
+
+    def get(self, vnf_src_name, vnf_src_interface,
+            vnf_dst_name, vnf_dst_interface):
+        """
+        :return: the chain dict between the given interfaces or None
+        """
+        return self._chains.get(self.key(
+            vnf_src_name, vnf_src_interface, vnf_dst_name, vnf_dst_interface))
+
+    def get_by_cookie(self, cookie):
+        """
+        :return: list of all chains installed with the given cookie
+        """
+        with self._lock:
+            return [self._chains[k] for k in self._by_cookie.get(cookie, [])]
+
+    def get_by_vnf(self, vnf_name):
+        """
+        :return: list of all chains starting or ending at the given VNF
+        """
+        with self._lock:
+            return [self._chains[k] for k in self._by_vnf.get(vnf_name, [])]
+
+    def _remove_key(self, key):
+        chain_dict = self._chains.pop(key, None)
+        if chain_dict is None:
+            return None
+        cookie = chain_dict.get('cookie')
+        self._discard(self._by_cookie, cookie, key)
+        for vnf_name in set([key[0], key[2]]):
+            self._discard(self._by_vnf, vnf_name, key)
+        return chain_dict
+
+    @staticmethod
+    def _discard(index, index_key, key):
+        keys = index.get(index_key)
+        if keys is None:
+            return
+        keys.discard(key)
+        if len(keys) == 0:
+            del index[index_key]
+
+    def remove(self, vnf_src_name, vnf_src_interface,
+               vnf_dst_name, vnf_dst_interface):
+        """
+        Remove the chain between the given interfaces.
+        :return: the removed chain dict or None
+        """
+        with self._lock:
+            return self._remove_key(self.key(
+                vnf_src_name, vnf_src_interface,
+                vnf_dst_name, vnf_dst_interface))
+
+    def remove_by_cookie(self, cookie):
+        """
+        Remove all chains installed with the given cookie.
+        :return: list of removed chain dicts
+        """
+        with self._lock:
+            return [self._remove_key(k)
+                    for k in list(self._by_cookie.get(cookie, []))]
+
+    def remove_by_vnf(self, vnf_name):
+        """
+        Remove all chains starting or ending at the given VNF.
+        :return: list of removed chain dicts
+        """
+        with self._lock:
+            return [self._remove_key(k)
+                    for k in list(self._by_vnf.get(vnf_name, []))]
+
+    def remove_if(self, predicate):
+        """
+        Remove all chains for which predicate(chain_dict) is True.
+        :return: list of removed chain dicts
+        """
+        with self._lock:
+            keys = [k for k, c in self._chains.items() if predicate(c)]
+            return [self._remove_key(k) for k in keys]
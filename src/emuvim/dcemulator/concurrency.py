@@ -0,0 +1,113 @@
+# Copyright (c) 2015 SONATA-NFV and Paderborn University
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, Paderborn University
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+import logging
+import threading
+import time
+
+LOG = logging.getLogger("dcemulator.concurrency")
+LOG.setLevel(logging.DEBUG)
+
+# default max. number of worker threads used by run_parallel
+DEFAULT_WORKERS = 8
+
+
+class TaskResult(object):
+    """
+    Outcome of a single task executed by run_parallel.
+    """
+
+    def __init__(self):
+        self.result = None
+        self.error = None
+        self.duration = 0.0
+        self.done = False
+
+
+def run_parallel(func, args_list, max_workers=DEFAULT_WORKERS, timeout=None):
+    """
+    Call func(*args) for all args in args_list on a pool of worker threads.
+    Exceptions are caught and returned with the results.
+    :param func: function to be called
+    :param args_list: list of argument tuples
+    :param max_workers: max. number of concurrent calls
+    :param timeout: max. seconds to wait for all calls (None: wait forever),
+        unfinished tasks are reported with done=False
+    :return: list of TaskResult in the order of args_list
+    """
+    results = [TaskResult() for _ in args_list]
+    if len(args_list) == 0:
+        return results
+    lock = threading.Lock()
+    tasks = list(enumerate(args_list))
+
+    def worker():
+        while True:
+            with lock:
+                if len(tasks) == 0:
+                    return
+                i, args = tasks.pop(0)
+            r = results[i]
+            t_start = time.time()
+            try:
+                r.result = func(*args)
+            except Exception as ex:
+                LOG.exception("Parallel task {0} failed.".format(args))
+                r.error = ex
+            r.duration = time.time() - t_start
+            r.done = True
+
+    workers = []
+    for _ in range(max(1, min(int(max_workers), len(args_list)))):
+        w = threading.Thread(target=worker)
+        w.daemon = True
+        w.start()
+        workers.append(w)
+    deadline = None if timeout is None else time.time() + timeout
+    for w in workers:
+        if deadline is None:
+            w.join()
+        else:
+            w.join(max(0, deadline - time.time()))
+    if deadline is not None:
+        # do not start tasks that are not running yet
+        with lock:
+            del tasks[:]
+    return results
+
+
+def wait_for_threads(threads, timeout):
+    """
+    Wait until all threads have finished, but max. timeout seconds in total.
+    :return: list of threads that are still running
+    """
+    deadline = time.time() + timeout
+    for t in threads:
+        t.join(max(0, deadline - time.time()))
+    running = [t for t in threads if t.is_alive()]
+    if len(running) > 0:
+        LOG.warning("{0} thread(s) still running after {1}s."
+                    .format(len(running), timeout))
+    return running
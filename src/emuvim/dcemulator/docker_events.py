@@ -0,0 +1,134 @@
+# Copyright (c) 2015 SONATA-NFV and Paderborn University
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, Paderborn University
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+import logging
+import threading
+import time
+import docker
+
+LOG = logging.getLogger("dcemulator.docker_events")
+LOG.setLevel(logging.DEBUG)
+
+# seconds covered by a single request to the Docker events API
+EVENT_WINDOW = 2.0
+# container events that change the state reported by getStatus
+STATUS_EVENTS = ["create", "start", "restart", "pause", "unpause",
+                 "die", "kill", "stop", "oom", "update", "rename"]
+
+
+class DockerEventWatcher(object):
+    """
+    Follows the Docker events stream of the containers managed by
+    Containernet and refreshes the cached status of the corresponding
+    compute instances (see EmulatorCompute.getStatus).
+    """
+
+    def __init__(self, net, window=EVENT_WINDOW):
+        self.net = net
+        self.window = window
+        self._running = False
+        self._thread = None
+        # container id -> compute instance
+        self._by_id = dict()
+
+    @property
+    def running(self):
+        return self._running and self._thread is not None
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._watch)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(self.window + 1)
+            self._thread = None
+
+    def _watch(self):
+        try:
+            dcli = docker.APIClient(base_url='unix://var/run/docker.sock')
+        except Exception as ex:
+            LOG.warning("Cannot follow Docker events: %r" % ex)
+            self._running = False
+            return
+        since = time.time()
+        while self._running:
+            # request the events window by window, so that no event is lost
+            # and the thread notices a stop request
+            until = since + self.window
+            try:
+                for event in dcli.events(
+                        since=since, until=until, decode=True,
+                        filters={"type": "container",
+                                 "label": "com.containernet"}):
+                    self._handle(event)
+            except Exception as ex:
+                LOG.warning("Error while reading Docker events: %r" % ex)
+                # states might be outdated, refresh them on next access
+                for c in self.net.getAllContainers():
+                    if hasattr(c, "invalidateStatus"):
+                        c.invalidateStatus()
+                time.sleep(self.window)
+            since = until
+
+    def _handle(self, event):
+        action = event.get("Action", event.get("status", ""))
+        # e.g. "exec_start: bash" -> "exec_start"
+        action = action.split(":")[0]
+        if action not in STATUS_EVENTS:
+            return
+        cid = event.get("id") or event.get("Actor", {}).get("ID")
+        c = self._find(cid)
+        if c is None:
+            return
+        LOG.debug("Docker event %r of %r" % (action, c.name))
+        if action == "update":
+            # new resource limits
+            c.invalidateStatus(network=True)
+        try:
+            c.updateStatus()
+        except docker.errors.NotFound:
+            # the container is being removed, e.g. by removeDockerBatch
+            c.invalidateStatus()
+        except Exception as ex:
+            LOG.warning("Cannot update the status of %r: %r" % (c.name, ex))
+            c.invalidateStatus()
+
+    def _find(self, cid):
+        if cid is None:
+            return None
+        c = self._by_id.get(cid)
+        if c is None or self.net.nameToNode.get(c.name) is not c:
+            # rebuild the mapping, containers might have been added or removed
+            self._by_id = dict(
+                (c.dc.get("Id"), c) for c in self.net.getAllContainers()
+                if isinstance(getattr(c, "dc", None), dict))
+            c = self._by_id.get(cid)
+        return c
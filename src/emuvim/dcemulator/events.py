@@ -0,0 +1,152 @@
+# Copyright (c) 2015 SONATA-NFV and Paderborn University
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, Paderborn University
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+import logging
+import threading
+import time
+from collections import deque
+
+LOG = logging.getLogger("dcemulator.events")
+LOG.setLevel(logging.DEBUG)
+
+# number of recent events kept to be replayed to reconnecting subscribers
+EVENT_BACKLOG = 1000
+# max. number of undelivered events per subscriber (oldest are dropped)
+SUBSCRIBER_QUEUE_SIZE = 10000
+
+# event types
+CONTAINER_START = "container_start"
+CONTAINER_STOP = "container_stop"
+LINK_ADD = "link_add"
+LINK_REMOVE = "link_remove"
+CHAIN_INSTALL = "chain_install"
+CHAIN_REMOVE = "chain_remove"
+RESOURCE_UPDATE = "resource_update"
+MONITORING_SAMPLE = "monitoring_sample"
+EVENT_TYPES = [CONTAINER_START, CONTAINER_STOP, LINK_ADD, LINK_REMOVE,
+               CHAIN_INSTALL, CHAIN_REMOVE, RESOURCE_UPDATE,
+               MONITORING_SAMPLE]
+
+
+class Subscription(object):
+    """
+    Queue of the events of a single subscriber.
+    """
+
+    def __init__(self, bus, types=None, size=SUBSCRIBER_QUEUE_SIZE):
+        self.bus = bus
+        # None = all event types
+        self.types = None if types is None else set(types)
+        self.dropped = 0
+        self._queue = deque(maxlen=size)
+        self._cond = threading.Condition()
+
+    def _put(self, event):
+        if self.types is not None and event["type"] not in self.types:
+            return
+        with self._cond:
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append(event)
+            self._cond.notify()
+
+    def poll(self):
+        """
+        Return all queued events without blocking.
+        """
+        with self._cond:
+            events = list(self._queue)
+            self._queue.clear()
+        return events
+
+    def wait(self, timeout=None):
+        """
+        Wait until at least one event is queued (max. timeout seconds).
+        :return: list of queued events (empty on timeout)
+        """
+        with self._cond:
+            if len(self._queue) == 0:
+                self._cond.wait(timeout)
+        return self.poll()
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+
+class EventBus(object):
+    """
+    Publishes typed emulator events (container start/stop, link add/remove,
+    chain install/remove, resource updates, monitoring samples) to
+    subscribers, e.g. the event stream of the REST API.
+    Publishing never blocks: each subscriber has a bounded queue.
+    """
+
+    def __init__(self, backlog=EVENT_BACKLOG):
+        self._subscribers = list()
+        self._backlog = deque(maxlen=backlog)
+        self._lock = threading.Lock()
+        self._next_id = 1
+
+    def publish(self, event_type, **data):
+        """
+        Publish an event to all subscribers.
+        :param event_type: one of EVENT_TYPES
+        :param data: event data (JSON serializable)
+        :return: event dict
+        """
+        with self._lock:
+            event = {"id": self._next_id, "type": event_type,
+                     "timestamp": time.time(), "data": data}
+            self._next_id += 1
+            self._backlog.append(event)
+            subscribers = list(self._subscribers)
+        for s in subscribers:
+            s._put(event)
+        return event
+
+    def subscribe(self, types=None, last_event_id=None):
+        """
+        Create a new subscription.
+        :param types: list of event types (default: all)
+        :param last_event_id: replay the buffered events newer than this id
+        :return: Subscription
+        """
+        s = Subscription(self, types=types)
+        with self._lock:
+            if last_event_id is not None:
+                for event in self._backlog:
+                    if event["id"] > last_event_id:
+                        s._put(event)
+            self._subscribers.append(s)
+        return s
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    @property
+    def n_subscribers(self):
+        return len(self._subscribers)
@@ -0,0 +1,254 @@
+# Copyright (c) 2015 SONATA-NFV and Paderborn University
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, Paderborn University
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+"""
+Flow-programming backends of the DCNetwork.
+
+A backend computes the flow entries of a chain (get_flow_entry) and
+installs them (push) as part of a batch (new_batch). push may be
+asynchronous, flush(batch) waits until all entries of the batch are
+installed and returns the errors. The DCNetwork selects its backend with
+the flow_backend parameter.
+"""
+import json
+import logging
+import os
+import select
+import socket
+import threading
+from collections import OrderedDict
+
+LOG = logging.getLogger("dcemulator.flow_backends")
+LOG.setLevel(logging.DEBUG)
+
+# local port of the flow RPC Ryu app (see son_emu_flow_rpc.py)
+FLOW_RPC_PORT = int(os.environ.get('SON_EMU_FLOW_RPC_PORT', 6690))
+FLOW_RPC_TIMEOUT = 30
+
+
+class FlowBackend(object):
+    """
+    Interface of all flow-programming backends.
+    """
+    name = None
+    # Ryu apps that have to be started for this backend
+    ryu_apps = []
+
+    def __init__(self, net):
+        self.net = net
+
+    def get_flow_entry(self, node, switch_inport_nr, switch_outport_nr, **kwargs):
+        """
+        Compute a flow entry without installing it.
+        :return: flow entry dict (see DCNetwork._push_flow_entries)
+        """
+        raise NotImplementedError()
+
+    def new_batch(self):
+        """
+        Start a new batch of flow entries, pass it to push() and flush().
+        """
+        return None
+
+    def push(self, node, flow_entries, batch=None):
+        """
+        Install the flow entries of a single switch (may be asynchronous).
+        """
+        raise NotImplementedError()
+
+    def flush(self, batch=None):
+        """
+        Wait until all flow entries of the batch are installed.
+        :return: list of errors
+        """
+        return []
+
+    def close(self):
+        pass
+
+
+class RyuRestBackend(FlowBackend):
+    """
+    Install flows with Ryu's ofctl_rest API.
+    """
+    name = 'ryu_rest'
+
+    def get_flow_entry(self, node, switch_inport_nr, switch_outport_nr, **kwargs):
+        return self.net._get_flow_entry_ryu_rest(
+            node, switch_inport_nr, switch_outport_nr, **kwargs)
+
+    def new_batch(self):
+        return self.net.ryu_client.new_batch()
+
+    def push(self, node, flow_entries, batch=None):
+        # ofctl_rest only accepts single flow entries, they are sent
+        # asynchronously (in order per switch), see RyuRestClient.flush()
+        for entry in flow_entries:
+            self.net.ryu_REST_async(
+                entry['prefix'], data=entry['flow'], batch=batch)
+
+    def flush(self, batch=None):
+        return self.net.ryu_client.flush(batch)
+
+
+class DpctlBackend(FlowBackend):
+    """
+    Install flows with ovs-ofctl (one call per switch and command).
+    """
+    name = 'dpctl'
+
+    def get_flow_entry(self, node, switch_inport_nr, switch_outport_nr, **kwargs):
+        return self.net._get_flow_entry_dpctl(
+            node, switch_inport_nr, switch_outport_nr, **kwargs)
+
+    def push(self, node, flow_entries, batch=None):
+        # ovs-ofctl reads all flows of a command from a single file
+        dpctl_groups = OrderedDict()
+        for entry in flow_entries:
+            key = (entry['cmd'], entry['of_option'])
+            dpctl_groups.setdefault(key, []).append(entry['ofcmd'])
+        for (cmd, of_option), ofcmds in dpctl_groups.items():
+            self.net._dpctl_bulk(node, cmd, ofcmds, of_option=of_option)
+
+
+class RyuRpcBackend(RyuRestBackend):
+    """
+    Send batches of flow entries to the son_emu_flow_rpc Ryu app, which
+    writes them directly to the datapaths. One round trip per flush
+    instead of one HTTP request per flow entry.
+    The flow entries have the same format as the ofctl_rest ones.
+    """
+    name = 'ryu_rpc'
+    ryu_apps = [os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                             'son_emu_flow_rpc.py')]
+
+    def __init__(self, net, host='127.0.0.1', port=FLOW_RPC_PORT):
+        super(RyuRpcBackend, self).__init__(net)
+        self.address = (host, port)
+        self._socket = None
+        self._file = None
+        # one request/response at a time on the shared connection
+        self._lock = threading.RLock()
+
+    def get_flow_entry(self, node, switch_inport_nr, switch_outport_nr, **kwargs):
+        entry = super(RyuRpcBackend, self).get_flow_entry(
+            node, switch_inport_nr, switch_outport_nr, **kwargs)
+        entry['backend'] = self.name
+        return entry
+
+    def new_batch(self):
+        # flow entries of the batch, sent in one request by flush()
+        return []
+
+    def push(self, node, flow_entries, batch=None):
+        flows = []
+        for entry in flow_entries:
+            # 'stats/flowentry/add' -> 'add'
+            cmd = entry['prefix'].split('/')[-1]
+            flows.append({'cmd': cmd, 'flow': entry['flow']})
+        if batch is None:
+            self.flush(flows)
+        else:
+            batch.extend(flows)
+
+    def flush(self, batch=None):
+        if not batch:
+            return []
+        flows = list(batch)
+        del batch[:]
+        try:
+            ret = self._call({'flows': flows})
+        except (socket.error, ValueError) as ex:
+            # the request might have been processed partially, do not resend it
+            LOG.error("Flow RPC failed: {0}".format(ex))
+            return ["Flow RPC failed, {0} flow entries might not be installed: {1}".format(
+                len(flows), ex)]
+        errors = ret.get('errors', [])
+        for error in errors:
+            LOG.error("Flow RPC error: {0}".format(error))
+        LOG.debug("Flow RPC installed {0} of {1} flow entries".format(
+            ret.get('installed'), len(flows)))
+        return errors
+
+    def _connect(self):
+        if self._socket is None:
+            self._socket = socket.create_connection(
+                self.address, timeout=FLOW_RPC_TIMEOUT)
+            self._file = self._socket.makefile('rb')
+
+    def _is_connected(self):
+        """
+        Check if the cached connection is still open, e.g. the controller
+        might have been restarted since the last request.
+        """
+        if self._socket is None:
+            return False
+        readable, _, _ = select.select([self._socket], [], [], 0)
+        if len(readable) > 0:
+            # the server never sends unsolicited data, readable means closed
+            return False
+        return True
+
+    def _call(self, request):
+        data = (json.dumps(request) + '\n').encode('utf-8')
+        with self._lock:
+            if not self._is_connected():
+                self.close()
+            try:
+                self._connect()
+                self._socket.sendall(data)
+            except socket.error:
+                # the request line is incomplete and thus ignored by the
+                # server: reconnect and send it once more
+                self.close()
+                self._connect()
+                self._socket.sendall(data)
+            try:
+                line = self._file.readline()
+            except socket.error:
+                self.close()
+                raise
+            if not line:
+                self.close()
+                raise socket.error("Flow RPC connection closed")
+            return json.loads(line.decode('utf-8'))
+
+    def close(self):
+        with self._lock:
+            if self._socket is not None:
+                try:
+                    self._file.close()
+                    self._socket.close()
+                except socket.error:
+                    pass
+            self._socket = None
+            self._file = None
+
+
+FLOW_BACKENDS = {
+    RyuRestBackend.name: RyuRestBackend,
+    DpctlBackend.name: DpctlBackend,
+    RyuRpcBackend.name: RyuRpcBackend
+}
@@ -0,0 +1,131 @@
+# Copyright (c) 2015 SONATA-NFV and Paderborn University
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, Paderborn University
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+import math
+from array import array
+
+# default number of samples kept per monitored metric
+HISTORY_SIZE = 600
+# default smoothing factor of the exponentially weighted moving average
+EWMA_ALPHA = 0.3
+
+
+class MetricHistory(object):
+    """
+    Fixed-size ring buffer of timestamped counter samples of one monitored
+    metric. Timestamps and values are kept in two compact double arrays,
+    the oldest sample is overwritten when the buffer is full.
+    Rates are derived from two consecutive samples (counter resets are skipped).
+    """
+
+    def __init__(self, size=HISTORY_SIZE):
+        self.size = max(2, int(size))
+        self._t = array('d', [0.0] * self.size)
+        self._v = array('d', [0.0] * self.size)
+        # index of the next sample to write
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, timestamp, value):
+        self._t[self._next] = timestamp
+        self._v[self._next] = value
+        self._next = (self._next + 1) % self.size
+        self._count = min(self._count + 1, self.size)
+
+    def samples(self, n=None):
+        """
+        :param n: number of newest samples to return (default: all)
+        :return: list of (timestamp, value), oldest first
+        """
+        count = self._count if n is None else min(int(n), self._count)
+        start = (self._next - count) % self.size
+        return [(self._t[(start + i) % self.size],
+                 self._v[(start + i) % self.size]) for i in range(count)]
+
+    def rates(self, n=None):
+        """
+        :param n: number of newest rates to return (default: all)
+        :return: list of (timestamp, rate per second), oldest first
+        """
+        samples = self.samples(None if n is None else int(n) + 1)
+        rates = []
+        for (t0, v0), (t1, v1) in zip(samples, samples[1:]):
+            # skip counter resets and samples without time difference
+            if t1 <= t0 or v1 < v0:
+                continue
+            rates.append((t1, (v1 - v0) / (t1 - t0)))
+        return rates
+
+    def rate(self):
+        """
+        :return: newest rate per second or None
+        """
+        rates = self.rates(1)
+        return rates[-1][1] if len(rates) > 0 else None
+
+    def ewma(self, alpha=EWMA_ALPHA):
+        """
+        :return: exponentially weighted moving average of the rates or None
+        """
+        avg = None
+        for _, r in self.rates():
+            avg = r if avg is None else alpha * r + (1 - alpha) * avg
+        return avg
+
+    def percentiles(self, percentiles=(50, 90, 99)):
+        """
+        :return: dict percentile -> rate (nearest-rank method)
+        """
+        rates = sorted(r for _, r in self.rates())
+        ret = {}
+        for p in percentiles:
+            if len(rates) == 0:
+                ret[p] = None
+                continue
+            rank = int(math.ceil(float(p) / 100 * len(rates))) - 1
+            ret[p] = rates[min(max(rank, 0), len(rates) - 1)]
+        return ret
+
+    def summary(self, alpha=EWMA_ALPHA, percentiles=(50, 90, 99), n_samples=0):
+        """
+        :param n_samples: number of newest raw samples to include
+        :return: dict with the derived values of this history
+        """
+        samples = self.samples(1)
+        ret = {
+            'n_samples': self._count,
+            'last_timestamp': samples[-1][0] if len(samples) > 0 else None,
+            'last_value': samples[-1][1] if len(samples) > 0 else None,
+            'rate': self.rate(),
+            'ewma': self.ewma(alpha),
+            'percentiles': dict((str(p), v) for p, v in
+                                self.percentiles(percentiles).items())
+        }
+        if n_samples:
+            ret['samples'] = self.samples(n_samples)
+        return ret
@@ -26,15 +26,24 @@
 import logging
 from mininet.node import OVSSwitch
 import ast
+import random
 import time
 from prometheus_client import Gauge, CollectorRegistry, \
-    pushadd_to_gateway, delete_from_gateway
+    push_to_gateway, generate_latest, CONTENT_TYPE_LATEST
 import threading
 from subprocess import Popen
 import os
 import docker
 import json
-from copy import deepcopy
+try:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
+from emuvim.dcemulator.ryu_client import RyuRestClient
+from emuvim.dcemulator.metric_history import MetricHistory, HISTORY_SIZE, EWMA_ALPHA
+from emuvim.dcemulator.events import MONITORING_SAMPLE
 
 logging.basicConfig()
 
@@ -43,15 +52,72 @@ class to read openflow stats from the Ryu controller of the DCNetwork
 """
 
 PUSHGATEWAY_PORT = 9091
+# port of the /metrics endpoint served by the emulator (pull mode),
+# 9092 is taken by Kafka (see api/osm/kafka.py)
+METRICS_PORT = 9191
 # we cannot use port 8080 because ryu-ofrest api  is already using that one
 CADVISOR_PORT = 8081
 
 COOKIE_MASK = 0xffffffff
 
+# seconds between two collection cycles
+MONITOR_INTERVAL = 1.0
+# random variation of the interval (fraction of the interval)
+MONITOR_JITTER = 0.1
+# max. seconds between two cycles if the controller does not answer
+MONITOR_MAX_BACKOFF = 30.0
+# number of parallel connections to the Ryu REST API used for the stats requests
+MONITOR_POOL_SIZE = 4
+
+# how the metrics are exported to Prometheus:
+# 'pull': serve them on http://<host>:METRICS_PORT/metrics
+# 'push': push them to a pushgateway container after each collection cycle
+# 'both': do both
+EXPORT_MODES = ['pull', 'push', 'both']
+
+
+class MetricsServer(ThreadingMixIn, HTTPServer):
+    """
+    HTTP server that exposes a Prometheus registry on /metrics.
+    """
+    daemon_threads = True
+
+    def __init__(self, address, registry):
+        HTTPServer.__init__(self, address, MetricsHandler)
+        self.registry = registry
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ['/', '/metrics']:
+            self.send_error(404)
+            return
+        output = generate_latest(self.server.registry)
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE_LATEST)
+        self.send_header('Content-Length', str(len(output)))
+        self.end_headers()
+        self.wfile.write(output)
+
 
 class DCNetworkMonitor():
-    def __init__(self, net):
+    def __init__(self, net, interval=MONITOR_INTERVAL, jitter=MONITOR_JITTER,
+                 max_backoff=MONITOR_MAX_BACKOFF, export_mode='push',
+                 metrics_port=METRICS_PORT, history_size=HISTORY_SIZE):
+        if export_mode not in EXPORT_MODES:
+            raise Exception("Unknown export mode: {0}".format(export_mode))
         self.net = net
+        self.export_mode = export_mode
+        self.interval = interval
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        # dedicated connections for the stats requests
+        self.ryu_client = RyuRestClient(
+            net.ryu_REST_api, pool_size=MONITOR_POOL_SIZE, timeout=interval * 5)
         self.dockercli = docker.from_env()
 
         # pushgateway address
@@ -89,20 +155,36 @@ class DCNetworkMonitor():
         self.network_metrics = []
         self.flow_metrics = []
         self.skewmon_metrics = {}
+        # sample history of the monitored metrics:
+        # (vnf_name, vnf_interface, metric, flow_id) -> MetricHistory
+        self.history_size = history_size
+        self.history = {}
 
-        # start monitoring thread
+        # start the collector thread, the metrics are exported by a separate thread
         self.start_monitoring = True
-        self.monitor_thread = threading.Thread(target=self.get_network_metrics)
+        self._stop_event = threading.Event()
+        self._export_event = threading.Event()
+        # statistics of the collector
+        self.cycles = 0
+        self.failed_cycles = 0
+        self.last_cycle_duration = 0
+        self.monitor_thread = threading.Thread(target=self.collect_metrics)
+        self.monitor_thread.daemon = True
         self.monitor_thread.start()
 
-        self.monitor_flow_thread = threading.Thread(
-            target=self.get_flow_metrics)
-        self.monitor_flow_thread.start()
-
         # helper tools
         # cAdvisor, Prometheus pushgateway are started as external container,
         # to gather monitoring metric in son-emu
-        self.pushgateway_process = self.start_PushGateway()
+        self.pushgateway_process = None
+        self.export_thread = None
+        if export_mode in ['push', 'both']:
+            self.pushgateway_process = self.start_PushGateway()
+            self.export_thread = threading.Thread(target=self.export_metrics)
+            self.export_thread.daemon = True
+            self.export_thread.start()
+        self.metrics_server = None
+        if export_mode in ['pull', 'both']:
+            self.metrics_server = self.start_MetricsServer(metrics_port)
         self.cadvisor_process = self.start_cAdvisor()
 
     # first set some parameters, before measurement can start
@@ -112,26 +194,18 @@ class DCNetworkMonitor():
 
         flow_metric = {}
 
-        # check if port is specified (vnf:port)
-        if vnf_interface is None:
-            # take first interface by default
-            connected_sw = self.net.DCNetwork_graph.neighbors(vnf_name)[0]
-            link_dict = self.net.DCNetwork_graph[vnf_name][connected_sw]
-            vnf_interface = link_dict[0]['src_port_id']
+        # find the connected switch port (first interface if not specified)
+        port = self.net.getConnectedSwitchPort(vnf_name, vnf_interface)
+        vnf_switch = None
+        if port is not None:
+            if vnf_interface is None:
+                vnf_interface = port['port_id']
+            vnf_switch = port['switch']
+            flow_metric['mon_port'] = port['switch_port_nr']
 
         flow_metric['vnf_name'] = vnf_name
         flow_metric['vnf_interface'] = vnf_interface
 
-        vnf_switch = None
-        for connected_sw in self.net.DCNetwork_graph.neighbors(vnf_name):
-            link_dict = self.net.DCNetwork_graph[vnf_name][connected_sw]
-            for link in link_dict:
-                if link_dict[link]['src_port_id'] == vnf_interface:
-                    # found the right link and connected switch
-                    vnf_switch = connected_sw
-                    flow_metric['mon_port'] = link_dict[link]['dst_port_nr']
-                    break
-
         if not vnf_switch:
             logging.exception("vnf switch of {0}:{1} not found!".format(
                 vnf_name, vnf_interface))
@@ -175,11 +249,11 @@ class DCNetworkMonitor():
         # check if port is specified (vnf:port)
         if vnf_interface is None and metric is not None:
             # take first interface by default
-            connected_sw = self.net.DCNetwork_graph.neighbors(vnf_name)[0]
-            link_dict = self.net.DCNetwork_graph[vnf_name][connected_sw]
-            vnf_interface = link_dict[0]['src_port_id']
+            port = self.net.getConnectedSwitchPort(vnf_name)
+            if port is not None:
+                vnf_interface = port['port_id']
 
-        for flow_dict in self.flow_metrics:
+        for flow_dict in list(self.flow_metrics):
             if flow_dict['vnf_name'] == vnf_name and flow_dict['vnf_interface'] == vnf_interface \
                     and flow_dict['metric_key'] == metric and flow_dict['cookie'] == cookie:
 
@@ -187,13 +261,10 @@ class DCNetworkMonitor():
 
                 self.flow_metrics.remove(flow_dict)
 
-                # set metric to NaN
-                self.prom_metrics[flow_dict['metric_key']]. \
-                    labels(vnf_name=vnf_name, vnf_interface=vnf_interface, flow_id=cookie). \
-                    set(float('nan'))
-
-                delete_from_gateway(
-                    self.pushgateway, job='sonemu-SDNcontroller')
+                # remove only this series from the exported metrics
+                self._remove_prom_metric(
+                    flow_dict['metric_key'], vnf_name, vnf_interface, cookie)
+                self.history.pop(self._history_key(flow_dict), None)
 
                 self.monitor_flow_lock.release()
 
@@ -212,23 +283,18 @@ class DCNetworkMonitor():
         network_metric = {}
 
         # check if port is specified (vnf:port)
-        if vnf_interface is None or vnf_interface == '':
-            # take first interface by default
-            connected_sw = self.net.DCNetwork_graph.neighbors(vnf_name)[0]
-            link_dict = self.net.DCNetwork_graph[vnf_name][connected_sw]
-            vnf_interface = link_dict[0]['src_port_id']
+        if vnf_interface == '':
+            vnf_interface = None
+        # find the connected switch port (first interface if not specified)
+        port = self.net.getConnectedSwitchPort(vnf_name, vnf_interface)
+        if port is not None:
+            if vnf_interface is None:
+                vnf_interface = port['port_id']
+            network_metric['mon_port'] = port['switch_port_nr']
 
         network_metric['vnf_name'] = vnf_name
         network_metric['vnf_interface'] = vnf_interface
 
-        for connected_sw in self.net.DCNetwork_graph.neighbors(vnf_name):
-            link_dict = self.net.DCNetwork_graph[vnf_name][connected_sw]
-            for link in link_dict:
-                if link_dict[link]['src_port_id'] == vnf_interface:
-                    # found the right link and connected switch
-                    network_metric['mon_port'] = link_dict[link]['dst_port_nr']
-                    break
-
         if 'mon_port' not in network_metric:
             logging.exception("vnf interface {0}:{1} not found!".format(
                 vnf_name, vnf_interface))
@@ -240,17 +306,7 @@ class DCNetworkMonitor():
             if metric is None:
                 metric = 'tx_packets'
 
-            vnf_switch = self.net.DCNetwork_graph.neighbors(str(vnf_name))
-
-            if len(vnf_switch) > 1:
-                logging.info("vnf: {0} has multiple ports".format(vnf_name))
-                return
-            elif len(vnf_switch) == 0:
-                logging.info("vnf: {0} is not connected".format(vnf_name))
-                return
-            else:
-                vnf_switch = vnf_switch[0]
-            next_node = self.net.getNodeByName(vnf_switch)
+            next_node = self.net.getNodeByName(port['switch'])
 
             if not isinstance(next_node, OVSSwitch):
                 logging.info(
@@ -281,11 +337,11 @@ class DCNetworkMonitor():
         # check if port is specified (vnf:port)
         if vnf_interface is None and metric is not None:
             # take first interface by default
-            connected_sw = self.net.DCNetwork_graph.neighbors(vnf_name)[0]
-            link_dict = self.net.DCNetwork_graph[vnf_name][connected_sw]
-            vnf_interface = link_dict[0]['src_port_id']
+            port = self.net.getConnectedSwitchPort(vnf_name)
+            if port is not None:
+                vnf_interface = port['port_id']
 
-        for metric_dict in deepcopy(self.network_metrics):
+        for metric_dict in list(self.network_metrics):
             if metric_dict['vnf_name'] == vnf_name and metric_dict['vnf_interface'] == vnf_interface \
                     and metric_dict['metric_key'] == metric:
 
@@ -293,21 +349,10 @@ class DCNetworkMonitor():
 
                 self.network_metrics.remove(metric_dict)
 
-                # set values to NaN, prometheus api currently does not support removal of metrics
-                # self.prom_metrics[metric_dict['metric_key']].labels(vnf_name, vnf_interface).set(float('nan'))
-                self.prom_metrics[metric_dict['metric_key']]. \
-                    labels(vnf_name=vnf_name, vnf_interface=vnf_interface, flow_id=None). \
-                    set(float('nan'))
-
-                # this removes the complete metric, all labels...
-                # 1 single monitor job for all metrics of the SDN controller
-                # we can only  remove from the pushgateway grouping keys(labels) which we have defined for the add_to_pushgateway
-                # we can not specify labels from the metrics to be removed
-                # if we need to remove the metrics seperatelty, we need to give
-                # them a separate grouping key, and probably a diffferent
-                # registry also
-                delete_from_gateway(
-                    self.pushgateway, job='sonemu-SDNcontroller')
+                # remove only this series from the exported metrics
+                self._remove_prom_metric(
+                    metric_dict['metric_key'], vnf_name, vnf_interface, None)
+                self.history.pop(self._history_key(metric_dict), None)
 
                 self.monitor_lock.release()
 
@@ -320,12 +365,12 @@ class DCNetworkMonitor():
             elif metric_dict['vnf_name'] == vnf_name and vnf_interface is None and metric is None:
                 self.monitor_lock.acquire()
                 self.network_metrics.remove(metric_dict)
+                self._remove_prom_metric(
+                    metric_dict['metric_key'], vnf_name, metric_dict['vnf_interface'], None)
+                self.history.pop(self._history_key(metric_dict), None)
+                self.monitor_lock.release()
                 logging.info('remove metric from monitor: vnf_name:{0} vnf_interface:{1} mon_port:{2}'.format(
                     metric_dict['vnf_name'], metric_dict['vnf_interface'], metric_dict['mon_port']))
-
-                delete_from_gateway(
-                    self.pushgateway, job='sonemu-SDNcontroller')
-                self.monitor_lock.release()
                 continue
 
         if vnf_interface is None and metric is None:
@@ -335,91 +380,167 @@ class DCNetworkMonitor():
             return 'Error stopping monitoring metric: {0} on {1}:{2}'.format(
                 metric, vnf_name, vnf_interface)
 
-    def get_flow_metrics(self):
+    def collect_metrics(self):
         """
-        Get all metrics defined in the list and export it to Prometheus.
+        Collector loop: requests the port and flow stats of all monitored
+        switches in one batched cycle per interval.
+        The requests of a cycle are sent concurrently and the registration
+        locks are never held while waiting for the controller.
+        Cycles are scheduled at fixed times (no drift), with some jitter, and
+        backed off exponentially while the controller does not answer.
         """
+        failures = 0
+        next_cycle = time.time()
         while self.start_monitoring:
-
-            self.monitor_flow_lock.acquire()
-
-            for flow_dict in self.flow_metrics:
-                data = {}
-
-                data['cookie'] = flow_dict['cookie']
-                data['cookie_mask'] = COOKIE_MASK
-
-                if 'tx' in flow_dict['metric_key']:
-                    data['match'] = {'in_port': flow_dict['mon_port']}
-                elif 'rx' in flow_dict['metric_key']:
-                    data['out_port'] = flow_dict['mon_port']
-
-                # query Ryu
-                ret = self.net.ryu_REST(
-                    'stats/flow', dpid=flow_dict['switch_dpid'], data=data)
-                if isinstance(ret, dict):
-                    flow_stat_dict = ret
-                elif isinstance(ret, str):
-                    flow_stat_dict = ast.literal_eval(ret.rstrip())
-                else:
-                    flow_stat_dict = None
-
+            t_start = time.time()
+            errors = self._collect_cycle()
+            self.cycles += 1
+            self.last_cycle_duration = time.time() - t_start
+            if len(errors) > 0:
+                failures += 1
+                self.failed_cycles += 1
+                logging.warning("Monitor cycle failed ({0} errors): {1}".format(
+                    len(errors), errors[0]))
+            else:
+                failures = 0
+            self._export_event.set()
+
+            # schedule the next cycle
+            interval = self.interval
+            if failures > 0:
+                interval = min(self.interval * (2 ** failures), self.max_backoff)
+            next_cycle += interval * \
+                (1 + random.uniform(-self.jitter, self.jitter))
+            now = time.time()
+            if next_cycle < now:
+                # cycle took longer than the interval, skip the missed ones
+                logging.debug("Monitor cycle took {0:.3f}s".format(
+                    self.last_cycle_duration))
+                next_cycle = now
+            self._stop_event.wait(next_cycle - now)
+
+    def _collect_cycle(self):
+        """
+        Do one collection cycle.
+        :return: list of errors
+        """
+        # take a snapshot of the registered metrics
+        with self.monitor_lock:
+            network_metrics = list(self.network_metrics)
+        with self.monitor_flow_lock:
+            flow_metrics = list(self.flow_metrics)
+        if len(network_metrics) == 0 and len(flow_metrics) == 0:
+            return []
+
+        port_stats = {}
+        flow_stats = []
+
+        # one port stats request per switch
+        def port_stats_callback(dpid):
+            def callback(ret):
+                port_stats[dpid] = (time.time(), self._parse_stats(ret))
+            return callback
+
+        dpid_set = set([int(metric_dict['switch_dpid'])
+                        for metric_dict in network_metrics])
+        batch = self.ryu_client.new_batch()
+        for dpid in dpid_set:
+            self.ryu_client.submit('stats/port', dpid=dpid,
+                                   callback=port_stats_callback(dpid), batch=batch)
+
+        # one flow stats request per monitored flow
+        def flow_stats_callback(flow_dict):
+            def callback(ret):
+                flow_stats.append(
+                    (flow_dict, time.time(), self._parse_stats(ret)))
+            return callback
+
+        for flow_dict in flow_metrics:
+            data = {}
+            data['cookie'] = flow_dict['cookie']
+            data['cookie_mask'] = COOKIE_MASK
+
+            if 'tx' in flow_dict['metric_key']:
+                data['match'] = {'in_port': flow_dict['mon_port']}
+            elif 'rx' in flow_dict['metric_key']:
+                data['out_port'] = flow_dict['mon_port']
+            self.ryu_client.submit('stats/flow', dpid=flow_dict['switch_dpid'],
+                                   data=data, callback=flow_stats_callback(flow_dict),
+                                   batch=batch)
+
+        errors = self.ryu_client.flush(batch, timeout=self.interval * 5)
+
+        # update the metrics that are still registered
+        with self.monitor_lock:
+            for metric_dict in self.network_metrics:
+                timestamp, port_stat_dict = port_stats.get(
+                    int(metric_dict['switch_dpid']), (None, None))
+                if port_stat_dict is not None:
+                    self.set_network_metric(
+                        metric_dict, port_stat_dict, timestamp=timestamp)
+        with self.monitor_flow_lock:
+            registered = set(id(flow_dict) for flow_dict in self.flow_metrics)
+            for flow_dict, timestamp, flow_stat_dict in flow_stats:
                 logging.debug('received flow stat:{0} '.format(flow_stat_dict))
-
-                self.set_flow_metric(flow_dict, flow_stat_dict)
-
-            try:
-                if len(self.flow_metrics) > 0:
-                    pushadd_to_gateway(
-                        self.pushgateway, job='sonemu-SDNcontroller', registry=self.registry)
-            except Exception as e:
-                logging.warning(
-                    "Pushgateway not reachable: {0} {1}".format(Exception, e))
-
-            self.monitor_flow_lock.release()
-            time.sleep(1)
-
-    def get_network_metrics(self):
+                if id(flow_dict) in registered and flow_stat_dict is not None:
+                    self.set_flow_metric(
+                        flow_dict, flow_stat_dict, timestamp=timestamp)
+        return errors
+
+    def _parse_stats(self, ret):
+        if isinstance(ret, dict):
+            return ret
+        elif isinstance(ret, str) and len(ret) > 0:
+            return ast.literal_eval(ret.rstrip())
+        return None
+
+    def export_metrics(self):
+        """
+        Export loop (push mode): pushes the metrics to the Prometheus pushgateway
+        after each collection cycle, so a slow gateway does not delay the collection.
+        The pushed registry replaces all metrics of the job, so removed series
+        disappear from the gateway while the others are kept.
+        """
+        pushed = False
         while self.start_monitoring:
-
-            self.monitor_lock.acquire()
-
-            # group metrics by dpid to optimize the rest api calls
-            dpid_list = [metric_dict['switch_dpid']
-                         for metric_dict in self.network_metrics]
-            dpid_set = set(dpid_list)
-
-            for dpid in dpid_set:
-
-                # query Ryu
-                ret = self.net.ryu_REST('stats/port', dpid=dpid)
-                if isinstance(ret, dict):
-                    port_stat_dict = ret
-                elif isinstance(ret, str):
-                    port_stat_dict = ast.literal_eval(ret.rstrip())
-                else:
-                    port_stat_dict = None
-
-                metric_list = [metric_dict for metric_dict in self.network_metrics
-                               if int(metric_dict['switch_dpid']) == int(dpid)]
-
-                for metric_dict in metric_list:
-                    self.set_network_metric(metric_dict, port_stat_dict)
-
+            self._export_event.wait()
+            self._export_event.clear()
+            if not self.start_monitoring:
+                break
+            monitored = len(self.network_metrics) > 0 or len(self.flow_metrics) > 0
+            if not monitored and not pushed:
+                continue
             try:
-                if len(self.network_metrics) > 0:
-                    pushadd_to_gateway(
-                        self.pushgateway, job='sonemu-SDNcontroller', registry=self.registry)
+                push_to_gateway(
+                    self.pushgateway, job='sonemu-SDNcontroller', registry=self.registry)
+                pushed = monitored
             except Exception as e:
                 logging.warning(
                     "Pushgateway not reachable: {0} {1}".format(Exception, e))
 
-            self.monitor_lock.release()
-            time.sleep(1)
+    def _remove_prom_metric(self, metric_key, vnf_name, vnf_interface, flow_id):
+        """
+        Remove a single series (label set) from the exported metrics.
+        """
+        try:
+            self.prom_metrics[metric_key].remove(vnf_name, vnf_interface, flow_id)
+        except KeyError:
+            # never exported
+            pass
+        # push mode: push the registry without this series
+        self._export_event.set()
+
+    def start_MetricsServer(self, port=METRICS_PORT):
+        server = MetricsServer(('', port), self.registry)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        logging.info('Serving Prometheus metrics on port {0}'.format(port))
+        return server
 
     # add metric to the list to export to Prometheus, parse the Ryu port-stats
     # reply
-    def set_network_metric(self, metric_dict, port_stat_dict):
+    def set_network_metric(self, metric_dict, port_stat_dict, timestamp=None):
         # vnf tx is the datacenter switch rx and vice-versa
         metric_key = self.switch_tx_rx(metric_dict['metric_key'])
         switch_dpid = metric_dict['switch_dpid']
@@ -427,7 +548,7 @@ class DCNetworkMonitor():
         vnf_interface = metric_dict['vnf_interface']
         previous_monitor_time = metric_dict['previous_monitor_time']
         mon_port = metric_dict['mon_port']
-        for port_stat in port_stat_dict[str(switch_dpid)]:
+        for port_stat in port_stat_dict.get(str(switch_dpid), []):
             # ovs output also gives back 'LOCAL' port
             if port_stat['port_no'] == 'LOCAL':
                 continue
@@ -441,8 +562,9 @@ class DCNetworkMonitor():
                     labels(vnf_name=vnf_name, vnf_interface=vnf_interface, flow_id=None).\
                     set(this_measurement)
 
-                # also the rate is calculated here, but not used for now
-                # (rate can be easily queried from prometheus also)
+                # keep the sample to derive rates (see get_history)
+                self._add_sample(metric_dict, timestamp, this_measurement)
+
                 if previous_monitor_time <= 0 or previous_monitor_time >= port_uptime:
                     metric_dict['previous_measurement'] = int(
                         port_stat[metric_key])
@@ -465,7 +587,7 @@ class DCNetworkMonitor():
         return 'metric {0} not found on {1}:{2}'.format(
             metric_key, vnf_name, vnf_interface)
 
-    def set_flow_metric(self, metric_dict, flow_stat_dict):
+    def set_flow_metric(self, metric_dict, flow_stat_dict, timestamp=None):
         # vnf tx is the datacenter switch rx and vice-versa
         metric_key = metric_dict['metric_key']
         switch_dpid = metric_dict['switch_dpid']
@@ -474,7 +596,7 @@ class DCNetworkMonitor():
         cookie = metric_dict['cookie']
 
         counter = 0
-        for flow_stat in flow_stat_dict[str(switch_dpid)]:
+        for flow_stat in flow_stat_dict.get(str(switch_dpid), []):
             if 'bytes' in metric_key:
                 counter += flow_stat['byte_count']
             elif 'packet' in metric_key:
@@ -488,6 +610,72 @@ class DCNetworkMonitor():
             labels(vnf_name=vnf_name, vnf_interface=vnf_interface, flow_id=cookie). \
             set(counter)
 
+        # keep the sample to derive rates (see get_history)
+        self._add_sample(metric_dict, timestamp, counter)
+
+    def _history_key(self, metric_dict):
+        return (metric_dict['vnf_name'], metric_dict['vnf_interface'],
+                metric_dict['metric_key'], metric_dict.get('cookie'))
+
+    def _add_sample(self, metric_dict, timestamp, value):
+        key = self._history_key(metric_dict)
+        history = self.history.get(key)
+        if history is None:
+            history = MetricHistory(self.history_size)
+            self.history[key] = history
+        if timestamp is None:
+            timestamp = time.time()
+        history.append(timestamp, value)
+        # only build the event if somebody listens
+        if self.net.events.n_subscribers > 0:
+            self.net.events.publish(
+                MONITORING_SAMPLE, vnf_name=key[0], vnf_interface=key[1],
+                metric=key[2], cookie=key[3], timestamp=timestamp, value=value)
+
+    def get_history(self, vnf_name=None, vnf_interface=None, metric=None, cookie=None,
+                    alpha=None, percentiles=(50, 90, 99), n_samples=0):
+        """
+        Get the derived values (rates per second, EWMA of the rates, percentiles of the rates)
+        and optionally the raw samples of all monitored metrics matching the given filters.
+        :param cookie: only flow metrics with this cookie (default: all metrics)
+        :param alpha: smoothing factor of the EWMA
+        :param n_samples: number of newest raw samples to include
+        :return: list of dicts
+        """
+        ret = []
+        for key, history in list(self.history.items()):
+            h_vnf_name, h_vnf_interface, h_metric, h_cookie = key
+            if (vnf_name is not None and h_vnf_name != vnf_name) or \
+                    (vnf_interface is not None and h_vnf_interface != vnf_interface) or \
+                    (metric is not None and h_metric != metric) or \
+                    (cookie is not None and str(h_cookie) != str(cookie)):
+                continue
+            entry = history.summary(
+                alpha=alpha or EWMA_ALPHA, percentiles=percentiles, n_samples=n_samples)
+            entry['vnf_name'] = h_vnf_name
+            entry['vnf_interface'] = h_vnf_interface
+            entry['metric'] = h_metric
+            entry['cookie'] = h_cookie
+            ret.append(entry)
+        return ret
+
+    def get_interface_rates(self):
+        """
+        Get the newest rates per second of all monitored interface metrics.
+        :return: dict (vnf_name, vnf_interface) -> {metric: rate}
+        """
+        ret = {}
+        for key, history in list(self.history.items()):
+            h_vnf_name, h_vnf_interface, h_metric, h_cookie = key
+            if h_cookie is not None:
+                # flow metric
+                continue
+            rate = history.rate()
+            if rate is None:
+                continue
+            ret.setdefault((h_vnf_name, h_vnf_interface), {})[h_metric] = rate
+        return ret
+
     def start_Prometheus(self, port=9090):
         # prometheus.yml configuration file is located in the same directory as
         # this file
@@ -539,10 +727,17 @@ class DCNetworkMonitor():
         return Popen(cmd)
 
     def stop(self):
-        # stop the monitoring thread
+        # stop the monitoring threads
         self.start_monitoring = False
+        self._stop_event.set()
+        self._export_event.set()
         self.monitor_thread.join()
-        self.monitor_flow_thread.join()
+        if self.export_thread is not None:
+            self.export_thread.join()
+        self.ryu_client.close()
+        if self.metrics_server is not None:
+            self.metrics_server.shutdown()
+            self.metrics_server.server_close()
 
         # these containers are used for monitoring but are started now outside
         # of son-emu
@@ -26,10 +26,12 @@
 import logging
 import time
 import re
-import requests
 import os
 import json
+import tempfile
+import threading
 import networkx as nx
+from collections import OrderedDict
 from subprocess import Popen
 # from gevent import monkey
 from mininet.net import Containernet
@@ -40,6 +42,14 @@ from mininet.clean import cleanup
 from emuvim.dcemulator.monitoring import DCNetworkMonitor
 from emuvim.dcemulator.node import Datacenter, EmulatorCompute
 from emuvim.dcemulator.resourcemodel import ResourceModelRegistrar
+from emuvim.dcemulator.vlan import VlanAllocator
+from emuvim.dcemulator.chains import ChainRegistry
+from emuvim.dcemulator.ryu_client import RyuRestClient
+from emuvim.dcemulator.flow_backends import FLOW_BACKENDS
+from emuvim.dcemulator.concurrency import run_parallel
+from emuvim.dcemulator.docker_events import DockerEventWatcher
+from emuvim.dcemulator.topology import TopologySnapshots
+from emuvim.dcemulator import events
 
 # ensure correct functionality of all gevent based REST servers
 # monkey.patch_all()
@@ -56,6 +66,9 @@ DEFAULT_PRIORITY = 1000
 # default cookie number for new flow-rules
 DEFAULT_COOKIE = 10
 
+# default max. number of containers created at the same time by startComputeBatch
+DEFAULT_STARTUP_WORKERS = 8
+
 
 class DCNetwork(Containernet):
     """
@@ -72,22 +85,42 @@ class DCNetwork(Containernet):
                  # functionality
                  dc_emulation_max_cpu=1.0,  # fraction of overall CPU time for emulation
                  dc_emulation_max_mem=512,  # emulation max mem in MB
+                 flow_backend=None,
+                 monitor_interval=1.0,  # seconds between two collections of the monitored metrics
+                 monitor_export='push',  # export metrics via pushgateway ('push'), /metrics endpoint ('pull') or 'both'
                  **kwargs):
         """
         Create an extended version of a Containernet network
         :param dc_emulation_max_cpu: max. CPU time used by containers in data centers
+        :param flow_backend: how chain flows are installed: 'ryu_rest' (default for RemoteController),
+            'dpctl' (ovs-ofctl, default otherwise) or 'ryu_rpc' (batches sent to a native Ryu app)
         :param kwargs: path through for Mininet parameters
         :return:
         """
         # members
         self.dcs = {}
+        # index of all running compute instances: name -> (dc, container)
+        self._containers = OrderedDict()
+        # versioned read-only copies of the topology (see getTopologySnapshot)
+        self.topology = TopologySnapshots(self)
+        # feed of topology and deployment events (e.g. for the REST API)
+        self.events = events.EventBus()
         self.ryu_process = None
         # list of deployed nsds.E_Lines and E_LANs (uploaded from the dummy
         # gatekeeper)
         self.deployed_nsds = []
         self.deployed_elines = []
         self.deployed_elans = []
-        self.installed_chains = []
+        # registry of the installed chains (see setChain)
+        self.installed_chains = ChainRegistry()
+        # flow entries collected between startFlowBatch() and commitFlowBatch(),
+        # kept per thread so that concurrent deployments do not mix their flows
+        self._flow_batches = threading.local()
+        # flow entries are installed by one thread at a time
+        self._flow_install_lock = threading.RLock()
+        # serializes changes of the Containernet and the graph (nodes, links, chains),
+        # e.g. of stack operations running in parallel
+        self.topology_lock = threading.RLock()
 
         # always cleanup environment before we start the emulator
         self.killRyu()
@@ -105,32 +138,56 @@ class DCNetwork(Containernet):
         else:
             self.failMode = 'secure'
 
+        # flow-programming backend
+        if flow_backend is None:
+            flow_backend = 'ryu_rest' if controller == RemoteController else 'dpctl'
+        if flow_backend not in FLOW_BACKENDS:
+            raise Exception("Unknown flow backend: %s" % flow_backend)
+        if flow_backend != 'dpctl' and controller != RemoteController:
+            raise Exception(
+                "Flow backend %s needs the RemoteController." % flow_backend)
+
         # Ryu management
         if controller == RemoteController:
             # start Ryu controller
-            self.startRyu(learning_switch=enable_ryu_learning)
+            self.startRyu(learning_switch=enable_ryu_learning,
+                          extra_apps=FLOW_BACKENDS[flow_backend].ryu_apps)
 
         # add the specified controller
         self.addController('c0', controller=controller)
 
         # graph of the complete DC network
         self.DCNetwork_graph = nx.MultiDiGraph()
+        # index of all link end points: (node name, port id or port name) -> port dict
+        self._port_index = {}
+        # node name -> port dicts of this node in the order the links were added
+        self._node_ports = OrderedDict()
+        # cached shortest paths: (weight, src, dst) -> path
+        self._path_cache = {}
+        # node name -> keys of all cached paths that contain this node
+        self._path_cache_index = {}
 
         # initialize pool of vlan tags to setup the SDN paths
-        self.vlans = list(range(1, 4095))[::-1]
+        self.vlans = VlanAllocator()
 
         # link to Ryu REST_API
         ryu_ip = 'localhost'
         ryu_port = '8080'
         self.ryu_REST_api = 'http://{0}:{1}'.format(ryu_ip, ryu_port)
-        self.RyuSession = requests.Session()
+        # pooled keep-alive connections, flow mods can be sent asynchronously
+        self.ryu_client = RyuRestClient(self.ryu_REST_api)
+        self.flow_backend = FLOW_BACKENDS[flow_backend](self)
 
         # monitoring agent
         if monitor:
-            self.monitor_agent = DCNetworkMonitor(self)
+            self.monitor_agent = DCNetworkMonitor(
+                self, interval=monitor_interval, export_mode=monitor_export)
         else:
             self.monitor_agent = None
 
+        # refreshes the cached container states on Docker events
+        self.docker_events = DockerEventWatcher(self)
+
         # initialize resource model registrar
         self.rm_registrar = ResourceModelRegistrar(
             dc_emulation_max_cpu, dc_emulation_max_mem)
@@ -147,6 +204,7 @@ class DCNetwork(Containernet):
         dc.net = self  # set reference to network
         self.dcs[label] = dc
         dc.create()  # finally create the data center in our Mininet instance
+        self.topology.changed()
         LOG.info("added data center: %s" % label)
         return dc
 
@@ -158,126 +216,419 @@ class DCNetwork(Containernet):
         assert node1 is not None
         assert node2 is not None
 
-        # ensure type of node1
-        if isinstance(node1, str):
-            if node1 in self.dcs:
-                node1 = self.dcs[node1].switch
-        if isinstance(node1, Datacenter):
-            node1 = node1.switch
-        # ensure type of node2
-        if isinstance(node2, str):
-            if node2 in self.dcs:
-                node2 = self.dcs[node2].switch
-        if isinstance(node2, Datacenter):
-            node2 = node2.switch
-        # try to give containers a default IP
-        if isinstance(node1, Docker):
-            if "params1" not in params:
-                params["params1"] = {}
-            if "ip" not in params["params1"]:
-                params["params1"]["ip"] = self.getNextIp()
-        if isinstance(node2, Docker):
-            if "params2" not in params:
-                params["params2"] = {}
-            if "ip" not in params["params2"]:
-                params["params2"]["ip"] = self.getNextIp()
-        # ensure that we allow TCLinks between data centers
-        # TODO this is not optimal, we use cls=Link for containers and TCLink for data centers
-        # see Containernet issue:
-        # https://github.com/mpeuster/containernet/issues/3
-        if "cls" not in params:
-            params["cls"] = TCLink
-
-        link = Containernet.addLink(self, node1, node2, **params)
-
-        # try to give container interfaces a default id
-        node1_port_id = node1.ports[link.intf1]
-        if isinstance(node1, Docker):
-            if "id" in params["params1"]:
-                node1_port_id = params["params1"]["id"]
-        node1_port_name = link.intf1.name
-
-        node2_port_id = node2.ports[link.intf2]
-        if isinstance(node2, Docker):
-            if "id" in params["params2"]:
-                node2_port_id = params["params2"]["id"]
-        node2_port_name = link.intf2.name
-
-        # add edge and assigned port number to graph in both directions between node1 and node2
-        # port_id: id given in descriptor (if available, otherwise same as port)
-        # port: portnumber assigned by Containernet
-
-        attr_dict = {}
-        # possible weight metrics allowed by TClink class:
-        weight_metrics = ['bw', 'delay', 'jitter', 'loss']
-        edge_attributes = [p for p in params if p in weight_metrics]
-        for attr in edge_attributes:
-            # if delay: strip ms (need number as weight in graph)
-            match = re.search('([0-9]*\.?[0-9]+)', str(params[attr]))
-            if match:
-                attr_number = match.group(1)
-            else:
-                attr_number = None
-            attr_dict[attr] = attr_number
-
-        attr_dict2 = {'src_port_id': node1_port_id, 'src_port_nr': node1.ports[link.intf1],
-                      'src_port_name': node1_port_name,
-                      'dst_port_id': node2_port_id, 'dst_port_nr': node2.ports[link.intf2],
-                      'dst_port_name': node2_port_name}
-        attr_dict2.update(attr_dict)
-        self.DCNetwork_graph.add_edge(
-            node1.name, node2.name, **attr_dict2)
-
-        attr_dict2 = {'src_port_id': node2_port_id, 'src_port_nr': node2.ports[link.intf2],
-                      'src_port_name': node2_port_name,
-                      'dst_port_id': node1_port_id, 'dst_port_nr': node1.ports[link.intf1],
-                      'dst_port_name': node1_port_name}
-        attr_dict2.update(attr_dict)
-        self.DCNetwork_graph.add_edge(
-            node2.name, node1.name, **attr_dict2)
-
-        LOG.debug("addLink: n1={0} intf1={1} -- n2={2} intf2={3}".format(
-            str(node1), node1_port_name, str(node2), node2_port_name))
-
-        return link
+        with self.topology_lock:
+            # ensure type of node1
+            if isinstance(node1, str):
+                if node1 in self.dcs:
+                    node1 = self.dcs[node1].switch
+            if isinstance(node1, Datacenter):
+                node1 = node1.switch
+            # ensure type of node2
+            if isinstance(node2, str):
+                if node2 in self.dcs:
+                    node2 = self.dcs[node2].switch
+            if isinstance(node2, Datacenter):
+                node2 = node2.switch
+            # try to give containers a default IP
+            if isinstance(node1, Docker):
+                if "params1" not in params:
+                    params["params1"] = {}
+                if "ip" not in params["params1"]:
+                    params["params1"]["ip"] = self.getNextIp()
+            if isinstance(node2, Docker):
+                if "params2" not in params:
+                    params["params2"] = {}
+                if "ip" not in params["params2"]:
+                    params["params2"]["ip"] = self.getNextIp()
+            # ensure that we allow TCLinks between data centers
+            # TODO this is not optimal, we use cls=Link for containers and TCLink for data centers
+            # see Containernet issue:
+            # https://github.com/mpeuster/containernet/issues/3
+            if "cls" not in params:
+                params["cls"] = TCLink
+
+            link = Containernet.addLink(self, node1, node2, **params)
+            self._invalidate_network_status(node1, node2)
+
+            # try to give container interfaces a default id
+            node1_port_id = node1.ports[link.intf1]
+            if isinstance(node1, Docker):
+                if "id" in params["params1"]:
+                    node1_port_id = params["params1"]["id"]
+            node1_port_name = link.intf1.name
+
+            node2_port_id = node2.ports[link.intf2]
+            if isinstance(node2, Docker):
+                if "id" in params["params2"]:
+                    node2_port_id = params["params2"]["id"]
+            node2_port_name = link.intf2.name
+
+            # add edge and assigned port number to graph in both directions between node1 and node2
+            # port_id: id given in descriptor (if available, otherwise same as port)
+            # port: portnumber assigned by Containernet
+
+            attr_dict = {}
+            # possible weight metrics allowed by TClink class:
+            weight_metrics = ['bw', 'delay', 'jitter', 'loss']
+            edge_attributes = [p for p in params if p in weight_metrics]
+            for attr in edge_attributes:
+                # if delay: strip ms (need number as weight in graph)
+                match = re.search('([0-9]*\.?[0-9]+)', str(params[attr]))
+                if match:
+                    attr_number = match.group(1)
+                else:
+                    attr_number = None
+                attr_dict[attr] = attr_number
+
+            attr_dict2 = {'src_port_id': node1_port_id, 'src_port_nr': node1.ports[link.intf1],
+                          'src_port_name': node1_port_name,
+                          'dst_port_id': node2_port_id, 'dst_port_nr': node2.ports[link.intf2],
+                          'dst_port_name': node2_port_name}
+            attr_dict2.update(attr_dict)
+            self.DCNetwork_graph.add_edge(
+                node1.name, node2.name, **attr_dict2)
+
+            attr_dict2 = {'src_port_id': node2_port_id, 'src_port_nr': node2.ports[link.intf2],
+                          'src_port_name': node2_port_name,
+                          'dst_port_id': node1_port_id, 'dst_port_nr': node1.ports[link.intf1],
+                          'dst_port_name': node1_port_name}
+            attr_dict2.update(attr_dict)
+            self.DCNetwork_graph.add_edge(
+                node2.name, node1.name, **attr_dict2)
+
+            self._update_path_cache_on_link_add(node1.name, node2.name)
+            self._add_port_index(
+                node1.name, node1_port_id, node1.ports[link.intf1], node1_port_name,
+                node2.name, node2.ports[link.intf2], node2_port_name)
+            self._add_port_index(
+                node2.name, node2_port_id, node2.ports[link.intf2], node2_port_name,
+                node1.name, node1.ports[link.intf1], node1_port_name)
+
+            self.topology.changed()
+            self.events.publish(
+                events.LINK_ADD, src=node1.name, src_port_name=node1_port_name,
+                dst=node2.name, dst_port_name=node2_port_name)
+            LOG.debug("addLink: n1={0} intf1={1} -- n2={2} intf2={3}".format(
+                str(node1), node1_port_name, str(node2), node2_port_name))
+
+            return link
+
+    @staticmethod
+    def _invalidate_network_status(*nodes):
+        """
+        Drop the cached network status of containers whose links have changed.
+        """
+        for n in nodes:
+            if isinstance(n, EmulatorCompute):
+                n.invalidateStatus(network=True)
 
     def removeLink(self, link=None, node1=None, node2=None):
         """
         Remove the link from the Containernet and the networkx graph
         """
-        if link is not None:
-            node1 = link.intf1.node
-            node2 = link.intf2.node
-        assert node1 is not None
-        assert node2 is not None
-        Containernet.removeLink(self, link=link, node1=node1, node2=node2)
-        # TODO we might decrease the loglevel to debug:
-        try:
-            self.DCNetwork_graph.remove_edge(node2.name, node1.name)
-        except BaseException:
-            LOG.warning("%s, %s not found in DCNetwork_graph." %
-                        ((node2.name, node1.name)))
-        try:
-            self.DCNetwork_graph.remove_edge(node1.name, node2.name)
-        except BaseException:
-            LOG.warning("%s, %s not found in DCNetwork_graph." %
-                        ((node1.name, node2.name)))
+        with self.topology_lock:
+            if link is not None:
+                node1 = link.intf1.node
+                node2 = link.intf2.node
+            assert node1 is not None
+            assert node2 is not None
+            if link is None:
+                # find the link Containernet will remove to update our port index
+                link = self._find_link(node1, node2)
+            if link is not None:
+                self._remove_port_index(link.intf1.node.name, link.intf1.name)
+                self._remove_port_index(link.intf2.node.name, link.intf2.name)
+                self._publish_link_remove(link)
+            Containernet.removeLink(self, link=link, node1=node1, node2=node2)
+            self._invalidate_network_status(node1, node2)
+            self._invalidate_cached_paths(edge=(node1.name, node2.name))
+            # TODO we might decrease the loglevel to debug:
+            try:
+                self.DCNetwork_graph.remove_edge(node2.name, node1.name)
+            except BaseException:
+                LOG.warning("%s, %s not found in DCNetwork_graph." %
+                            ((node2.name, node1.name)))
+            try:
+                self.DCNetwork_graph.remove_edge(node1.name, node2.name)
+            except BaseException:
+                LOG.warning("%s, %s not found in DCNetwork_graph." %
+                            ((node1.name, node2.name)))
+            self.topology.changed()
+
+    def removeLinks(self, node, peer=None):
+        """
+        Remove all links of a node (or all links between node and peer)
+        from the Containernet and the networkx graph in one pass.
+        The OVS ports of each switch are removed in a single ovs-vsctl transaction.
+        :param node: node, e.g. a container
+        :param peer: only remove the links to this node (default: all links)
+        :return: number of removed links
+        """
+        with self.topology_lock:
+            links = []
+            for link in self.links:
+                n1, n2 = link.intf1.node, link.intf2.node
+                if n1 == node and (peer is None or n2 == peer):
+                    links.append(link)
+                elif n2 == node and (peer is None or n1 == peer):
+                    links.append(link)
+            # remove the switch ports (one transaction per switch)
+            switch_ports = OrderedDict()
+            for link in links:
+                for intf in (link.intf1, link.intf2):
+                    if isinstance(intf.node, OVSSwitch):
+                        switch_ports.setdefault(intf.node, []).append(intf.name)
+            for switch, ports in switch_ports.items():
+                self._del_switch_ports(switch, ports)
+            # remove the links
+            neighbours = set()
+            for link in links:
+                n1, n2 = link.intf1.node, link.intf2.node
+                neighbours.add(n2 if n1 == node else n1)
+                self._remove_port_index(n1.name, link.intf1.name)
+                self._remove_port_index(n2.name, link.intf2.name)
+                self._publish_link_remove(link)
+                Containernet.removeLink(self, link=link)
+                self._invalidate_network_status(n1, n2)
+            # remove all graph edges in both directions
+            G = self.DCNetwork_graph
+            for n in neighbours:
+                for u, v in [(node.name, n.name), (n.name, node.name)]:
+                    if G.has_edge(u, v):
+                        G.remove_edges_from([(u, v, k) for k in list(G[u][v])])
+                self._invalidate_cached_paths(edge=(node.name, n.name))
+            self.topology.changed()
+            LOG.debug("removeLinks: n={0} removed {1} links".format(
+                str(node), len(links)))
+            return len(links)
+
+    def _publish_link_remove(self, link):
+        self.events.publish(
+            events.LINK_REMOVE,
+            src=link.intf1.node.name, src_port_name=link.intf1.name,
+            dst=link.intf2.node.name, dst_port_name=link.intf2.name)
+
+    @staticmethod
+    def _del_switch_ports(switch, ports):
+        """
+        Delete multiple ports of a switch in a single ovs-vsctl transaction.
+        """
+        args = []
+        for port in ports:
+            if len(args) > 0:
+                args.append('--')
+            args += ['--if-exists', 'del-port', switch.name, port]
+        switch.vsctl(*args)
 
     def addDocker(self, label, **params):
         """
         Wrapper for addDocker method to use custom container class.
         """
-        self.DCNetwork_graph.add_node(label, type=params.get('type', 'docker'))
-        return Containernet.addDocker(
-            self, label, cls=EmulatorCompute, **params)
+        with self.topology_lock:
+            # a new node without links does not change any cached path
+            self.DCNetwork_graph.add_node(label, type=params.get('type', 'docker'))
+            self.topology.changed()
+            node = self._claimPooledDocker(label, params)
+            if node is not None:
+                return self._addPrebuiltDocker(label, node)
+            return Containernet.addDocker(
+                self, label, cls=EmulatorCompute, **params)
+
+    def _claimPooledDocker(self, label, params):
+        """
+        Take a warm container from the pool of the target data center.
+        :return: container or None
+        """
+        pool = getattr(params.get('datacenter'), 'container_pool', None)
+        if pool is None:
+            return None
+        return pool.claim(label, params)
+
+    def _addPrebuiltDocker(self, label, node):
+        """
+        Register an already created container in the network.
+        """
+        def prebuilt(name, **defaults):
+            # add the default parameters Mininet's addHost would have passed
+            for k, v in defaults.items():
+                node.params.setdefault(k, v)
+            return node
+        return Containernet.addDocker(self, label, cls=prebuilt)
+
+    def addDockerBatch(self, docker_list, max_workers=DEFAULT_STARTUP_WORKERS):
+        """
+        Create multiple containers concurrently. The container creation
+        (image, docker create/start, shell setup) runs on a pool of worker threads,
+        the containers are registered in the network afterwards one by one.
+        :param docker_list: list of (label, params) as for addDocker
+        :param max_workers: max. number of containers created at the same time
+        :return: list of TaskResult (result: container, error: exception, duration: creation time)
+        """
+        def create(label, params):
+            node = self._claimPooledDocker(label, params)
+            if node is None:
+                node = EmulatorCompute(label, **params)
+            return node
+
+        results = run_parallel(create, docker_list, max_workers=max_workers)
+        with self.topology_lock:
+            for (label, params), r in zip(docker_list, results):
+                if r.error is not None:
+                    continue
+                self.DCNetwork_graph.add_node(
+                    label, type=params.get('type', 'docker'))
+                self.topology.changed()
+                self._addPrebuiltDocker(label, r.result)
+        return results
+
+    def startComputeBatch(self, compute_list, max_workers=None):
+        """
+        Start multiple compute instances, e.g. all VNFs of a service, in one or more data centers.
+        The containers are created concurrently, then they are connected to their
+        data centers one after another, so the startup takes roughly as long
+        as the slowest container.
+        :param compute_list: list of dicts with the arguments of Datacenter.startCompute
+            and the target 'datacenter' (Datacenter object or label), e.g.
+            [{"datacenter": "dc1", "name": "vnf1", "image": "ubuntu:trusty", "network": [...]}, ...]
+        :param max_workers: max. number of containers created at the same time
+        :return: list of result dicts in the order of compute_list:
+            {"name":, "datacenter":, "container": container or None, "error": message or None,
+             "timings": {"create": seconds, "connect": seconds}}
+        """
+        if max_workers is None:
+            max_workers = DEFAULT_STARTUP_WORKERS
+        results = []
+        jobs = []
+        names = set()
+        # check all requests and prepare the container parameters
+        for c in compute_list:
+            c = dict(c)
+            dc = c.pop("datacenter", None)
+            if not isinstance(dc, Datacenter):
+                dc = self.dcs.get(dc)
+            name = c.pop("name", None)
+            result = {"name": name, "datacenter": dc.label if dc else None,
+                      "container": None, "error": None, "timings": {}}
+            results.append(result)
+            try:
+                if dc is None:
+                    raise Exception("Data center of %s not found." % name)
+                if name in names:
+                    raise Exception(
+                        "Container with name %s already exists." % name)
+                docker_params, network = dc._prepareCompute(name, **c)
+                names.add(name)
+                jobs.append((result, dc, str(name), docker_params, network))
+            except Exception as ex:
+                LOG.error("Cannot start compute instance {0}: {1}".format(
+                    name, ex))
+                result["error"] = str(ex)
+
+        # create all containers concurrently
+        created = self.addDockerBatch(
+            [(name, docker_params) for _, _, name, docker_params, _ in jobs],
+            max_workers=max_workers)
+
+        # connect the containers one by one
+        for (result, dc, _, _, network), r in zip(jobs, created):
+            result["timings"]["create"] = r.duration
+            if r.error is not None:
+                result["error"] = str(r.error)
+                continue
+            t_start = time.time()
+            try:
+                result["container"] = dc._connectCompute(r.result, network)
+                if result["container"] is None:
+                    result["error"] = "Allocation blocked by resource model."
+            except Exception as ex:
+                LOG.exception("Cannot connect compute instance {0}".format(
+                    result["name"]))
+                result["error"] = str(ex)
+            result["timings"]["connect"] = time.time() - t_start
+            LOG.info("Started compute instance {0} in {1}: {2}".format(
+                result["name"], result["datacenter"], result["timings"]))
+        return results
 
     def removeDocker(self, label, **params):
         """
         Wrapper for removeDocker method to update graph.
         """
-        self.DCNetwork_graph.remove_node(label)
+        self._remove_graph_node(label)
         return Containernet.removeDocker(self, label, **params)
 
+    def _remove_graph_node(self, label):
+        with self.topology_lock:
+            if not self.DCNetwork_graph.has_node(label):
+                # already removed, e.g. by a failed removeDockerBatch
+                return
+            self.DCNetwork_graph.remove_node(label)
+            self._invalidate_cached_paths(node=label)
+            self._remove_port_index(label)
+            self.topology.changed()
+
+    def removeDockerBatch(self, labels, max_workers=DEFAULT_STARTUP_WORKERS):
+        """
+        Remove multiple containers concurrently. The graph is updated first,
+        the containers are then stopped and removed on a pool of worker threads.
+        :param labels: list of container names
+        :param max_workers: max. number of containers removed at the same time
+        :return: list of TaskResult
+        """
+        for label in labels:
+            self._remove_graph_node(label)
+        return run_parallel(
+            lambda label: Containernet.removeDocker(self, label),
+            [(label,) for label in labels], max_workers=max_workers)
+
+    def stopComputeBatch(self, names, max_workers=None):
+        """
+        Stop and remove multiple compute instances, e.g. all VNFs of a service.
+        The containers are disconnected from their data centers one after
+        another and then removed concurrently.
+        :param names: list of container names
+        :param max_workers: max. number of containers removed at the same time
+        :return: list of result dicts in the order of names:
+            {"name":, "datacenter":, "error": message or None,
+             "timings": {"disconnect": seconds, "remove": seconds}}
+        """
+        if max_workers is None:
+            max_workers = DEFAULT_STARTUP_WORKERS
+        results = []
+        jobs = []
+        # disconnect the containers one by one
+        for name in names:
+            dc = self.getDatacenterOfContainer(name)
+            result = {"name": name, "datacenter": dc.label if dc else None,
+                      "error": None, "timings": {}}
+            results.append(result)
+            if dc is None:
+                result["error"] = "Container with name %s not found." % name
+                continue
+            t_start = time.time()
+            try:
+                dc._disconnectCompute(name)
+                jobs.append((result, dc, name))
+            except Exception as ex:
+                LOG.exception("Cannot disconnect compute instance {0}".format(
+                    name))
+                result["error"] = str(ex)
+            result["timings"]["disconnect"] = time.time() - t_start
+
+        # remove all containers concurrently
+        removed = self.removeDockerBatch(
+            [name for _, _, name in jobs], max_workers=max_workers)
+        for (result, dc, name), r in zip(jobs, removed):
+            result["timings"]["remove"] = r.duration
+            if r.error is not None:
+                # the container might still be running: keep it in the index,
+                # stopCompute can be called again to remove it
+                result["error"] = str(r.error)
+                continue
+            dc._forgetCompute(name)
+            LOG.info("Stopped compute instance {0} in {1}: {2}".format(
+                name, result["datacenter"], result["timings"]))
+        return results
+
     def addExtSAP(self, sap_name, sap_ip, **params):
         """
         Wrapper for addExtSAP method to store SAP  also in graph.
@@ -285,13 +636,18 @@ class DCNetwork(Containernet):
         # make sure that 'type' is set
         params['type'] = params.get('type', 'sap_ext')
         self.DCNetwork_graph.add_node(sap_name, type=params['type'])
-        return Containernet.addExtSAP(self, sap_name, sap_ip, **params)
+        sap = Containernet.addExtSAP(self, sap_name, sap_ip, **params)
+        self.topology.changed()
+        return sap
 
     def removeExtSAP(self, sap_name, **params):
         """
         Wrapper for removeExtSAP method to remove SAP  also from graph.
         """
         self.DCNetwork_graph.remove_node(sap_name)
+        self._invalidate_cached_paths(node=sap_name)
+        self._remove_port_index(sap_name)
+        self.topology.changed()
         return Containernet.removeExtSAP(self, sap_name)
 
     def addSwitch(self, name, add_to_graph=True, **params):
@@ -312,23 +668,195 @@ class DCNetwork(Containernet):
 
         s = Containernet.addSwitch(
             self, name, protocols='OpenFlow10,OpenFlow12,OpenFlow13', failMode=failMode, **params)
+        self.topology.changed()
 
         return s
 
+    def getConnectedSwitchPort(self, node_name, intf=None):
+        """
+        Return the port a node interface is connected to.
+        :param node_name: name of the node, e.g., a VNF
+        :param intf: port id (e.g. from a descriptor) or interface name,
+                     the first interface of the node is used if None
+        :return: dict with keys 'node', 'port_id', 'port_nr', 'port_name',
+                 'switch', 'switch_port_nr', 'switch_port_name' or None if not found
+        """
+        if intf is None:
+            ports = self._node_ports.get(node_name)
+            if not ports:
+                return None
+            # take first interface by default
+            return ports[0]
+        return self._port_index.get((node_name, intf))
+
+    def _add_port_index(self, node_name, port_id, port_nr, port_name,
+                        peer_name, peer_port_nr, peer_port_name):
+        port = {'node': node_name, 'port_id': port_id, 'port_nr': port_nr,
+                'port_name': port_name, 'switch': peer_name,
+                'switch_port_nr': peer_port_nr,
+                'switch_port_name': peer_port_name}
+        self._node_ports.setdefault(node_name, []).append(port)
+        # we might also get interface names, e.g, from a son-emu-cli call
+        self._port_index[(node_name, port_id)] = port
+        self._port_index[(node_name, port_name)] = port
+
+    def _remove_port_index(self, node_name, port_name=None):
+        """
+        Remove a single interface (or all interfaces if port_name is None)
+        of a node from the port index.
+        """
+        ports = self._node_ports.get(node_name, [])
+        removed = [p for p in ports
+                   if port_name is None or p['port_name'] == port_name]
+        for port in removed:
+            ports.remove(port)
+            for key in [(node_name, port['port_id']),
+                        (node_name, port['port_name'])]:
+                if self._port_index.get(key) is port:
+                    del self._port_index[key]
+        if len(ports) == 0:
+            self._node_ports.pop(node_name, None)
+
+    def _find_link(self, node1, node2):
+        """
+        Find the (first) link between two nodes.
+        """
+        for link in self.links:
+            if ((link.intf1.node == node1 and link.intf2.node == node2) or
+                    (link.intf1.node == node2 and link.intf2.node == node1)):
+                return link
+        return None
+
+    def getShortestPath(self, src, dst, weight=None):
+        """
+        Return the shortest path between two nodes of the DCNetwork_graph.
+        Paths are cached per weight metric and only invalidated if the
+        graph changes in a way that might affect them.
+        Raises the networkx exceptions if no path can be found.
+        :param src: name of the source node (usually a switch)
+        :param dst: name of the destination node (usually a switch)
+        :param weight: edge attribute used as weight, e.g., 'bw', 'delay'
+        :return: list of node names
+        """
+        key = (weight, src, dst)
+        path = self._path_cache.get(key)
+        if path is None:
+            # returns the first found shortest path
+            # if all shortest paths are wanted, use: all_shortest_paths
+            path = nx.shortest_path(
+                self.DCNetwork_graph, src, dst, weight=weight)
+            self._path_cache[key] = path
+            for node in path:
+                self._path_cache_index.setdefault(node, set()).add(key)
+        # callers might modify the returned path
+        return list(path)
+
+    def _update_path_cache_on_link_add(self, node1_name, node2_name):
+        """
+        A new link can only shorten existing paths if both end points
+        are connected to other nodes as well. Links of leaf nodes, like
+        containers attached to their DC switch, can never be part of a path
+        between other nodes. Only paths starting or ending at the leaf node
+        itself are affected (e.g. by a parallel link).
+        """
+        g = self.DCNetwork_graph
+        if len(set(g.neighbors(node1_name))) <= 1:
+            self._invalidate_cached_paths(node=node1_name)
+        elif len(set(g.neighbors(node2_name))) <= 1:
+            self._invalidate_cached_paths(node=node2_name)
+        else:
+            self._path_cache.clear()
+            self._path_cache_index.clear()
+
+    def _invalidate_cached_paths(self, node=None, edge=None):
+        """
+        Remove all cached paths that contain the given node or
+        traverse the given edge (in any direction).
+        :param node: node name
+        :param edge: tuple of node names
+        """
+        if node is not None:
+            keys = set(self._path_cache_index.get(node, set()))
+        elif edge is not None:
+            u, v = edge
+            keys = set()
+            for key in (self._path_cache_index.get(u, set()) &
+                        self._path_cache_index.get(v, set())):
+                path = self._path_cache[key]
+                hops = set(zip(path, path[1:]))
+                if (u, v) in hops or (v, u) in hops:
+                    keys.add(key)
+        else:
+            keys = set(self._path_cache.keys())
+        for key in keys:
+            path = self._path_cache.pop(key)
+            for n in path:
+                node_keys = self._path_cache_index.get(n)
+                if node_keys is not None:
+                    node_keys.discard(key)
+                    if len(node_keys) == 0:
+                        del self._path_cache_index[n]
+
     def getAllContainers(self):
         """
         Returns a list with all containers within all data centers.
         """
-        all_containers = []
-        for dc in self.dcs.values():
-            all_containers += dc.listCompute()
-        return all_containers
+        return [c for _, c in self._containers.values()]
+
+    def getContainerByName(self, name):
+        """
+        Returns the compute instance with the given name or None.
+        """
+        entry = self._containers.get(name)
+        return None if entry is None else entry[1]
+
+    def getDatacenterOfContainer(self, name):
+        """
+        Returns the data center of the compute instance with the given name or None.
+        """
+        entry = self._containers.get(name)
+        return None if entry is None else entry[0]
+
+    def _registerContainer(self, dc, container):
+        """
+        Add a started compute instance to the container index.
+        Called by Datacenter.startCompute.
+        """
+        if container.name in self._containers:
+            raise Exception(
+                "Container with name %s already exists." % container.name)
+        self._containers[container.name] = (dc, container)
+        self.topology.changed()
+        self.events.publish(events.CONTAINER_START, name=container.name,
+                            datacenter=dc.label)
+
+    def _unregisterContainer(self, name):
+        """
+        Remove a compute instance from the container index.
+        Called by Datacenter.stopCompute.
+        """
+        entry = self._containers.pop(name, None)
+        self.topology.changed()
+        if entry is not None:
+            self.events.publish(events.CONTAINER_STOP, name=name,
+                                datacenter=entry[0].label)
+
+    def getTopologySnapshot(self):
+        """
+        Returns a read-only copy of the current topology (graph, data centers,
+        containers). The copy is only rebuilt if the topology has changed,
+        so it is cheap to call this for every request.
+        :return: TopologySnapshot
+        """
+        return self.topology.get()
 
     def start(self):
         # start
         for dc in self.dcs.values():
             dc.start()
         Containernet.start(self)
+        # keep the cached container states up to date
+        self.docker_events.start()
 
     def stop(self):
 
@@ -336,54 +864,60 @@ class DCNetwork(Containernet):
         if self.monitor_agent is not None:
             self.monitor_agent.stop()
 
+        # stop following Docker events
+        self.docker_events.stop()
+
+        # remove the warm containers
+        for dc in self.dcs.values():
+            dc.disableContainerPool()
+
         # stop emulator net
         Containernet.stop(self)
 
-        # stop Ryu controller
+        # finish pending Ryu requests and stop Ryu controller
+        self.flow_backend.close()
+        self.ryu_client.close()
         self.killRyu()
 
     def CLI(self):
         CLI(self)
 
-    def setLAN(self, vnf_list):
+    def setLAN(self, vnf_list, owner=None):
         """
         setup an E-LAN network by assigning the same VLAN tag to each DC interface of the VNFs in the E-LAN
 
         :param vnf_list: names of the VNFs in this E-LAN  [{name:,interface:},...]
-        :return:
+        :param owner: owner of the allocated vlan tag, e.g. a service instance uuid
+            (default: the E-LAN itself). Release it with releaseVlanTags(owner)
+        :return: vlan tag of this E-LAN
         """
-        src_sw = None
-        src_sw_inport_name = None
-
         # get a vlan tag for this E-LAN
-        vlan = self.vlans.pop()
+        if owner is None:
+            owner = ('elan', tuple((vnf['name'], vnf['interface'])
+                                   for vnf in vnf_list))
+        vlan = self.vlans.allocate(owner=owner)
 
         for vnf in vnf_list:
             vnf_src_name = vnf['name']
             vnf_src_interface = vnf['interface']
 
-            # check if port is specified (vnf:port)
+            # find the connected switch port (first interface if not specified)
+            port = self.getConnectedSwitchPort(vnf_src_name, vnf_src_interface)
+            if port is None:
+                LOG.warning('E-LAN: interface {0}:{1} not found'.format(
+                    vnf_src_name, vnf_src_interface))
+                continue
             if vnf_src_interface is None:
-                # take first interface by default
-                connected_sw = self.DCNetwork_graph.neighbors(vnf_src_name)[0]
-                link_dict = self.DCNetwork_graph[vnf_src_name][connected_sw]
-                vnf_src_interface = link_dict[0]['src_port_id']
-
-            for connected_sw in self.DCNetwork_graph.neighbors(vnf_src_name):
-                link_dict = self.DCNetwork_graph[vnf_src_name][connected_sw]
-                for link in link_dict:
-                    if (link_dict[link]['src_port_id'] == vnf_src_interface or
-                            link_dict[link]['src_port_name'] == vnf_src_interface):  # Fix: we might also get interface names, e.g, from a son-emu-cli call
-                        # found the right link and connected switch
-                        src_sw = connected_sw
-                        src_sw_inport_name = link_dict[link]['dst_port_name']
-                        break
+                vnf_src_interface = port['port_id']
+            src_sw = port['switch']
+            src_sw_inport_name = port['switch_port_name']
 
             # set the tag on the dc switch interface
             LOG.debug('set E-LAN: vnf name: {0} interface: {1} tag: {2}'.format(
                 vnf_src_name, vnf_src_interface, vlan))
             switch_node = self.getNodeByName(src_sw)
             self._set_vlan_tag(switch_node, src_sw_inport_name, vlan)
+        return vlan
 
     def getNodeByName(self, name):
         """
@@ -421,51 +955,31 @@ class DCNetwork(Containernet):
         LOG.debug("call AddMonitorFlow vnf_src_name=%r, vnf_src_interface=%r, vnf_dst_name=%r, vnf_dst_interface=%r",
                   vnf_src_name, vnf_src_interface, vnf_dst_name, vnf_dst_interface)
 
-        # check if port is specified (vnf:port)
-        if vnf_src_interface is None:
-            # take first interface by default
-            connected_sw = self.DCNetwork_graph.neighbors(vnf_src_name)[0]
-            link_dict = self.DCNetwork_graph[vnf_src_name][connected_sw]
-            vnf_src_interface = link_dict[0]['src_port_id']
-
-        for connected_sw in self.DCNetwork_graph.neighbors(vnf_src_name):
-            link_dict = self.DCNetwork_graph[vnf_src_name][connected_sw]
-            for link in link_dict:
-                if (link_dict[link]['src_port_id'] == vnf_src_interface or
-                        link_dict[link]['src_port_name'] == vnf_src_interface):  # Fix: we might also get interface names, e.g, from a son-emu-cli call
-                    # found the right link and connected switch
-                    src_sw = connected_sw
-                    src_sw_inport_nr = link_dict[link]['dst_port_nr']
-                    src_sw_inport_name = link_dict[link]['dst_port_name']
-                    break
-
-        if vnf_dst_interface is None:
-            # take first interface by default
-            connected_sw = self.DCNetwork_graph.neighbors(vnf_dst_name)[0]
-            link_dict = self.DCNetwork_graph[connected_sw][vnf_dst_name]
-            vnf_dst_interface = link_dict[0]['dst_port_id']
+        # find the connected switch ports (first interface if not specified)
+        src_port = self.getConnectedSwitchPort(vnf_src_name, vnf_src_interface)
+        if src_port is not None:
+            if vnf_src_interface is None:
+                vnf_src_interface = src_port['port_id']
+            src_sw = src_port['switch']
+            src_sw_inport_nr = src_port['switch_port_nr']
+            src_sw_inport_name = src_port['switch_port_name']
 
         vnf_dst_name = vnf_dst_name.split(':')[0]
-        for connected_sw in self.DCNetwork_graph.neighbors(vnf_dst_name):
-            link_dict = self.DCNetwork_graph[connected_sw][vnf_dst_name]
-            for link in link_dict:
-                if link_dict[link]['dst_port_id'] == vnf_dst_interface or \
-                        link_dict[link]['dst_port_name'] == vnf_dst_interface:  # Fix: we might also get interface names, e.g, from a son-emu-cli call
-                    # found the right link and connected switch
-                    dst_sw = connected_sw
-                    dst_sw_outport_nr = link_dict[link]['src_port_nr']
-                    dst_sw_outport_name = link_dict[link]['src_port_name']
-                    break
+        dst_port = self.getConnectedSwitchPort(vnf_dst_name, vnf_dst_interface)
+        if dst_port is not None:
+            if vnf_dst_interface is None:
+                vnf_dst_interface = dst_port['port_id']
+            dst_sw = dst_port['switch']
+            dst_sw_outport_nr = dst_port['switch_port_nr']
+            dst_sw_outport_name = dst_port['switch_port_name']
 
         if not tag >= 0:
             LOG.exception('tag not valid: {0}'.format(tag))
 
         # get shortest path
         try:
-            # returns the first found shortest path
-            # if all shortest paths are wanted, use: all_shortest_paths
-            path = nx.shortest_path(
-                self.DCNetwork_graph, src_sw, dst_sw, weight=kwargs.get('weight'))
+            path = self.getShortestPath(
+                src_sw, dst_sw, weight=kwargs.get('weight'))
         except BaseException:
             LOG.exception("No path could be found between {0} and {1} using src_sw={2} and dst_sw={3}".format(
                 vnf_src_name, vnf_dst_name, src_sw, dst_sw))
@@ -531,14 +1045,9 @@ class DCNetwork(Containernet):
                     LOG.exception(
                         'invalid monitor command: {0}'.format(monitor_placement))
 
-                if self.controller == RemoteController and insert_flow:
-                    # set flow entry via ryu rest api
-                    self._set_flow_entry_ryu_rest(
-                        current_node, switch_inport_nr, switch_outport_nr, **kwargs)
-                    break
-                elif insert_flow:
-                    # set flow entry via ovs-ofctl
-                    self._set_flow_entry_dpctl(
+                if insert_flow:
+                    # set flow entry via the flow backend
+                    self._set_flow_entry(
                         current_node, switch_inport_nr, switch_outport_nr, **kwargs)
                     break
 
@@ -556,6 +1065,8 @@ class DCNetwork(Containernet):
         Chain 2 vnf interfaces together by installing the flowrules in the switches along their path.
         Currently the path is found using the default networkx shortest path function.
         Each chain gets a unique vlan id , so different chains wil not interfere.
+        The flowrules of both directions are computed first and then installed per switch in one batch
+        (see startFlowBatch() to batch multiple chains).
 
         :param vnf_src_name: vnf name (string)
         :param vnf_dst_name: vnf name (string)
@@ -567,6 +1078,8 @@ class DCNetwork(Containernet):
         :param priority: custom flowrule priority
         :param monitor: boolean to indicate whether this chain is a monitoring chain
         :param tag: vlan tag to be used for this chain (pre-defined or new one if none is specified)
+        :param owner: owner of a newly allocated vlan tag, e.g. a service instance uuid (default: the chain itself).
+            The tag is released when the chain is deleted or with releaseVlanTags(owner)
         :param skip_vlan_tag: boolean to indicate if a vlan tag should be appointed to this flow or not
         :param path: custom path between the two VNFs (list of switches)
         :return: output log string
@@ -576,18 +1089,15 @@ class DCNetwork(Containernet):
         if kwargs.get('monitor'):
 
             # check if chain already exists
-            found_chains = [chain_dict for chain_dict in self.installed_chains if
-                            (chain_dict['vnf_src_name'] == vnf_src_name and
-                             chain_dict['vnf_src_interface'] == vnf_src_interface and
-                             chain_dict['vnf_dst_name'] == vnf_dst_name and
-                             chain_dict['vnf_dst_interface'] == vnf_dst_interface)]
+            found_chain = self.installed_chains.get(
+                vnf_src_name, vnf_src_interface, vnf_dst_name, vnf_dst_interface)
 
-            if len(found_chains) > 0:
+            if found_chain is not None:
                 # this chain exists, so need an extra monitoring flow
-                # assume only 1 chain per vnf/interface pair
+                # only 1 chain per vnf/interface pair
                 LOG.debug('*** installing monitoring chain on top of pre-defined chain from {0}:{1} -> {2}:{3}'.
                           format(vnf_src_name, vnf_src_interface, vnf_dst_name, vnf_dst_interface))
-                tag = found_chains[0]['tag']
+                tag = found_chain['tag']
                 ret = self._addMonitorFlow(vnf_src_name, vnf_dst_name, vnf_src_interface, vnf_dst_interface,
                                            tag=tag, table_id=0, **kwargs)
                 return ret
@@ -599,20 +1109,147 @@ class DCNetwork(Containernet):
 
         cmd = kwargs.get('cmd', 'add-flow')
         if cmd == 'add-flow' or cmd == 'del-flows':
-            ret = self._chainAddFlow(
-                vnf_src_name, vnf_dst_name, vnf_src_interface, vnf_dst_interface, **kwargs)
-            if kwargs.get('bidirectional'):
-                if kwargs.get('path') is not None:
-                    kwargs['path'] = list(reversed(kwargs.get('path')))
-                ret = ret + '\n' + \
-                    self._chainAddFlow(
-                        vnf_dst_name, vnf_src_name, vnf_dst_interface, vnf_src_interface, **kwargs)
+            with self.topology_lock:
+                # install the flows of both directions in one batch
+                self.startFlowBatch()
+                try:
+                    ret = self._chainAddFlow(
+                        vnf_src_name, vnf_dst_name, vnf_src_interface, vnf_dst_interface, **kwargs)
+                    if kwargs.get('bidirectional'):
+                        if kwargs.get('path') is not None:
+                            kwargs['path'] = list(reversed(kwargs.get('path')))
+                        ret = ret + '\n' + \
+                            self._chainAddFlow(
+                                vnf_dst_name, vnf_src_name, vnf_dst_interface, vnf_src_interface, **kwargs)
+                except Exception:
+                    # do not install the flows of a partially computed chain
+                    self.discardFlowBatch()
+                    raise
+                self.commitFlowBatch()
 
         else:
             ret = "Command unknown"
 
         return ret
 
+    def _releaseChainTags(self, chains, delete_flows=True):
+        """
+        Return the vlan tags allocated by the given (removed) chains to the pool.
+
+        :param chains: list of removed chain dicts
+        :param delete_flows: delete the flows of the chains before their tags are
+            reused (False if the chains were already removed with 'del-flows')
+        """
+        for chain_dict in chains:
+            if chain_dict is not None and chain_dict.get('allocated_tag'):
+                if not delete_flows or self._deleteChainFlows(chain_dict):
+                    self.vlans.release(chain_dict['tag'])
+            self._publish_chain(events.CHAIN_REMOVE, chain_dict)
+        return chains
+
+    def _deleteChainFlows(self, chain_dict):
+        """
+        Delete the flow entries a chain installed along its path, so that
+        no stale flow matches its vlan tag once the tag is reused.
+
+        :param chain_dict: chain dict of installed_chains
+        :return: True if the flows were deleted
+        """
+        flow_entries = []
+        try:
+            for sw_name, inport_nr, outport_nr, index in chain_dict.get('hops', []):
+                match = chain_dict.get('match')
+                if index > 0:
+                    # all but the first switch match the vlan tag of the chain
+                    vlan_match = 'dl_vlan=%s' % chain_dict['tag']
+                    match = vlan_match if not match else ','.join(
+                        [match, vlan_match])
+                flow_entries.append(self.flow_backend.get_flow_entry(
+                    self.getNodeByName(sw_name), inport_nr, outport_nr,
+                    cmd='del-flows', cookie=chain_dict.get('cookie'),
+                    match=match))
+            self._install_flow_entries(flow_entries)
+        except Exception:
+            LOG.exception("Could not delete the flows of vlan tag {0}, the tag is not reused.".format(
+                chain_dict['tag']))
+            return False
+        return True
+
+    def _chainInstalled(self, chain_dict, register=True):
+        """
+        Register a chain once its flows are installed. A chain
+        between the same interfaces is replaced and its tag released.
+
+        :param chain_dict: chain dict computed by _chainAddFlow
+        :param register: False for monitoring flows, only their tag is kept
+        """
+        if not register:
+            return
+        replaced = self.installed_chains.add(chain_dict)
+        if replaced is not None:
+            if (replaced.get('cookie'), replaced.get('match')) == \
+                    (chain_dict.get('cookie'), chain_dict.get('match')):
+                # the first flow of the new chain overwrote the untagged
+                # first flow of the replaced chain, do not delete it
+                replaced['hops'] = [hop for hop in replaced.get('hops', [])
+                                    if hop[3] > 0]
+            self._releaseChainTags([replaced])
+        self._publish_chain(events.CHAIN_INSTALL, chain_dict)
+
+    def _chainFailed(self, chain_dict, pushed):
+        """
+        Return the tag allocated for a chain whose flows could not be installed.
+
+        :param chain_dict: chain dict computed by _chainAddFlow
+        :param pushed: True if some of the flows may have been installed
+        """
+        if not chain_dict.get('allocated_tag'):
+            return
+        if not pushed or self._deleteChainFlows(chain_dict):
+            self.vlans.release(chain_dict['tag'])
+
+    def _publish_chain(self, event_type, chain_dict):
+        if chain_dict is None:
+            return
+        self.events.publish(
+            event_type,
+            vnf_src_name=chain_dict['vnf_src_name'],
+            vnf_src_interface=chain_dict['vnf_src_interface'],
+            vnf_dst_name=chain_dict['vnf_dst_name'],
+            vnf_dst_interface=chain_dict['vnf_dst_interface'],
+            tag=chain_dict.get('tag'),
+            cookie=chain_dict.get('cookie'))
+
+    def removeChainsOfVnf(self, vnf_name):
+        """
+        Forget all chains starting or ending at the given VNF and return
+        their vlan tags to the pool, e.g. when the VNF is stopped.
+
+        :param vnf_name: vnf name (string)
+        :return: list of removed chain dicts
+        """
+        return self._releaseChainTags(
+            self.installed_chains.remove_by_vnf(vnf_name))
+
+    def releaseVlanTags(self, owner):
+        """
+        Return all vlan tags of the given owner (e.g. a service instance uuid
+        passed to setChain or setLAN) to the pool and forget the chains using them.
+
+        :param owner: owner used to allocate the tags
+        :return: list of released vlan tags
+        """
+        tags = set(self.vlans.get_tags(owner))
+        if len(tags) > 0:
+            removed = self.installed_chains.remove_if(
+                lambda chain_dict: chain_dict.get('allocated_tag') and
+                chain_dict['tag'] in tags)
+            self._releaseChainTags(removed)
+            # tags without chains, e.g. E-LAN tags set on the switch ports
+            for tag in tags.difference(c['tag'] for c in removed):
+                self.vlans.release(tag)
+        return sorted(t for t in tags if not self.vlans.is_allocated(t))
+
     def _chainAddFlow(self, vnf_src_name, vnf_dst_name,
                       vnf_src_interface=None, vnf_dst_interface=None, **kwargs):
 
@@ -626,50 +1263,30 @@ class DCNetwork(Containernet):
         LOG.debug("call chainAddFlow vnf_src_name=%r, vnf_src_interface=%r, vnf_dst_name=%r, vnf_dst_interface=%r",
                   vnf_src_name, vnf_src_interface, vnf_dst_name, vnf_dst_interface)
 
-        # check if port is specified (vnf:port)
-        if vnf_src_interface is None:
-            # take first interface by default
-            connected_sw = list(self.DCNetwork_graph.neighbors(vnf_src_name))[0]
-            link_dict = self.DCNetwork_graph[vnf_src_name][connected_sw]
-            vnf_src_interface = link_dict[0]['src_port_id']
-
-        for connected_sw in self.DCNetwork_graph.neighbors(vnf_src_name):
-            link_dict = self.DCNetwork_graph[vnf_src_name][connected_sw]
-            for link in link_dict:
-                if (link_dict[link]['src_port_id'] == vnf_src_interface or
-                        link_dict[link]['src_port_name'] == vnf_src_interface):  # Fix: we might also get interface names, e.g, from a son-emu-cli call
-                    # found the right link and connected switch
-                    src_sw = connected_sw
-                    src_sw_inport_nr = link_dict[link]['dst_port_nr']
-                    src_sw_inport_name = link_dict[link]['dst_port_name']
-                    break
-
-        if vnf_dst_interface is None:
-            # take first interface by default
-            connected_sw = list(self.DCNetwork_graph.neighbors(vnf_dst_name))[0]
-            link_dict = self.DCNetwork_graph[connected_sw][vnf_dst_name]
-            vnf_dst_interface = link_dict[0]['dst_port_id']
+        # find the connected switch ports (first interface if not specified)
+        src_port = self.getConnectedSwitchPort(vnf_src_name, vnf_src_interface)
+        if src_port is not None:
+            if vnf_src_interface is None:
+                vnf_src_interface = src_port['port_id']
+            src_sw = src_port['switch']
+            src_sw_inport_nr = src_port['switch_port_nr']
+            src_sw_inport_name = src_port['switch_port_name']
 
         vnf_dst_name = vnf_dst_name.split(':')[0]
-        for connected_sw in self.DCNetwork_graph.neighbors(vnf_dst_name):
-            link_dict = self.DCNetwork_graph[connected_sw][vnf_dst_name]
-            for link in link_dict:
-                if link_dict[link]['dst_port_id'] == vnf_dst_interface or \
-                        link_dict[link]['dst_port_name'] == vnf_dst_interface:  # Fix: we might also get interface names, e.g, from a son-emu-cli call
-                    # found the right link and connected switch
-                    dst_sw = connected_sw
-                    dst_sw_outport_nr = link_dict[link]['src_port_nr']
-                    dst_sw_outport_name = link_dict[link]['src_port_name']
-                    break
+        dst_port = self.getConnectedSwitchPort(vnf_dst_name, vnf_dst_interface)
+        if dst_port is not None:
+            if vnf_dst_interface is None:
+                vnf_dst_interface = dst_port['port_id']
+            dst_sw = dst_port['switch']
+            dst_sw_outport_nr = dst_port['switch_port_nr']
+            dst_sw_outport_name = dst_port['switch_port_name']
 
         path = kwargs.get('path')
         if path is None:
             # get shortest path
             try:
-                # returns the first found shortest path
-                # if all shortest paths are wanted, use: all_shortest_paths
-                path = nx.shortest_path(
-                    self.DCNetwork_graph, src_sw, dst_sw, weight=kwargs.get('weight'))
+                path = self.getShortestPath(
+                    src_sw, dst_sw, weight=kwargs.get('weight'))
             except BaseException:
                 LOG.exception("No path could be found between {0} and {1} using src_sw={2} and dst_sw={3}".format(
                     vnf_src_name, vnf_dst_name, src_sw, dst_sw))
@@ -689,24 +1306,37 @@ class DCNetwork(Containernet):
         # choose free vlan
         cmd = kwargs.get('cmd')
         vlan = None
+        allocated_tag = False
         if cmd == 'add-flow':
             if kwargs.get('tag'):
                 # use pre-defined tag
                 vlan = kwargs.get('tag')
             else:
-                vlan = self.vlans.pop()
-
-        # store the used vlan tag to identify this chain
-        if not kwargs.get('monitor'):
+                owner = kwargs.get('owner')
+                if owner is None:
+                    owner = ('chain', vnf_src_name, vnf_src_interface,
+                             vnf_dst_name, vnf_dst_interface)
+                vlan = self.vlans.allocate(owner=owner)
+                allocated_tag = True
+
+        # store the used vlan tag to identify this chain,
+        # the chain is registered once its flows are installed
+        chain_dict = None
+        if cmd == 'add-flow':
             chain_dict = {}
             chain_dict['vnf_src_name'] = vnf_src_name
             chain_dict['vnf_dst_name'] = vnf_dst_name
             chain_dict['vnf_src_interface'] = vnf_src_interface
             chain_dict['vnf_dst_interface'] = vnf_dst_interface
             chain_dict['tag'] = vlan
-            self.installed_chains.append(chain_dict)
-
-        # iterate through the path to install the flow-entries
+            chain_dict['allocated_tag'] = allocated_tag
+            chain_dict['cookie'] = kwargs.get('cookie')
+            chain_dict['match'] = kwargs.get('match')
+            # (switch, in port, out port, path index) of each flow, filled below
+            chain_dict['hops'] = []
+
+        # compute all flow-entries along the path, install them afterwards
+        flow_entries = []
         for i in range(0, len(path)):
             current_node = self.getNodeByName(current_hop)
 
@@ -723,6 +1353,9 @@ class DCNetwork(Containernet):
                 LOG.debug("end node reached: {0}".format(vnf_dst_name))
             elif not isinstance(next_node, OVSSwitch):
                 LOG.info("Next node: {0} is not a switch".format(next_hop))
+                if allocated_tag:
+                    # no flow was installed yet
+                    self.vlans.release(vlan)
                 return "Next node: {0} is not a switch".format(next_hop)
             else:
                 # take first link between switches by default
@@ -738,20 +1371,33 @@ class DCNetwork(Containernet):
                 kwargs['switch_outport_name'] = dst_sw_outport_name
                 kwargs['pathindex'] = i
 
-                if self.controller == RemoteController:
-                    # set flow entry via ryu rest api
-                    self._set_flow_entry_ryu_rest(
-                        current_node, switch_inport_nr, switch_outport_nr, **kwargs)
-                else:
-                    # set flow entry via ovs-ofctl
-                    self._set_flow_entry_dpctl(
-                        current_node, switch_inport_nr, switch_outport_nr, **kwargs)
+                flow_entries.append(self.flow_backend.get_flow_entry(
+                    current_node, switch_inport_nr, switch_outport_nr, **kwargs))
+                if chain_dict is not None:
+                    chain_dict['hops'].append(
+                        (current_hop, switch_inport_nr, switch_outport_nr, i))
 
             # take first link between switches by default
             if isinstance(next_node, OVSSwitch):
                 switch_inport_nr = self.DCNetwork_graph[current_hop][next_hop][0]['dst_port_nr']
                 current_hop = next_hop
 
+        if cmd == 'add-flow':
+            self._install_flow_entries(
+                flow_entries,
+                on_success=lambda: self._chainInstalled(
+                    chain_dict, register=not kwargs.get('monitor')),
+                on_failure=lambda pushed: self._chainFailed(chain_dict, pushed))
+        elif cmd == 'del-flows' and not kwargs.get('monitor'):
+            # forget the chain and reuse its tag once its flows are gone
+            self._install_flow_entries(
+                flow_entries,
+                on_success=lambda: self._releaseChainTags([self.installed_chains.remove(
+                    vnf_src_name, vnf_src_interface, vnf_dst_name, vnf_dst_interface)],
+                    delete_flows=False))
+        else:
+            self._install_flow_entries(flow_entries)
+
         flow_options = {
             'priority': kwargs.get('priority', DEFAULT_PRIORITY),
             'cookie': kwargs.get('cookie', DEFAULT_COOKIE),
@@ -765,8 +1411,20 @@ class DCNetwork(Containernet):
         return "success: {2} between {0} and {1} with options: {3}".format(
             vnf_src_name, vnf_dst_name, cmd, flow_options_str)
 
-    def _set_flow_entry_ryu_rest(
+    def _set_flow_entry(
             self, node, switch_inport_nr, switch_outport_nr, **kwargs):
+        """
+        Install a single flow entry via the flow backend.
+        """
+        self._install_flow_entries([self.flow_backend.get_flow_entry(
+            node, switch_inport_nr, switch_outport_nr, **kwargs)])
+
+    def _get_flow_entry_ryu_rest(
+            self, node, switch_inport_nr, switch_outport_nr, **kwargs):
+        """
+        Compute a flow entry for the Ryu REST API without installing it.
+        :return: flow entry dict, see _push_flow_entries
+        """
         match = 'in_port=%s' % switch_inport_nr
 
         cookie = kwargs.get('cookie')
@@ -800,6 +1458,8 @@ class DCNetwork(Containernet):
         flow['table_id'] = table_id
 
         flow['actions'] = []
+        # vlan tags to be set on the switch ports
+        vlan_tags = []
 
         # possible Ryu actions, match fields:
         # http://ryu.readthedocs.io/en/latest/app/ofctl_rest.html#add-a-flow-entry
@@ -810,7 +1470,7 @@ class DCNetwork(Containernet):
                     # set vlan tag in ovs instance (to isolate E-LANs)
                     if not skip_vlan_tag:
                         in_port_name = kwargs.get('switch_inport_name')
-                        self._set_vlan_tag(node, in_port_name, vlan)
+                        vlan_tags.append((in_port_name, vlan))
                     # set vlan push action if more than 1 switch in the path
                     if len(path) > 1:
                         action = {}
@@ -832,7 +1492,7 @@ class DCNetwork(Containernet):
                     # set vlan tag in ovs instance (to isolate E-LANs)
                     if not skip_vlan_tag:
                         out_port_name = kwargs.get('switch_outport_name')
-                        self._set_vlan_tag(node, out_port_name, vlan)
+                        vlan_tags.append((out_port_name, vlan))
                     # set vlan pop action if more than 1 switch in the path
                     if len(path) > 1:
                         match += ',dl_vlan=%s' % vlan
@@ -869,16 +1529,35 @@ class DCNetwork(Containernet):
             flow['actions'].append(action)
 
         flow['match'] = self._parse_match(match)
-        self.ryu_REST(prefix, data=flow)
+        return {'switch': node, 'backend': 'ryu_rest', 'prefix': prefix,
+                'flow': flow, 'vlan_tags': vlan_tags}
 
     def _set_vlan_tag(self, node, switch_port, tag):
         node.vsctl('set', 'port {0} tag={1}'.format(switch_port, tag))
         LOG.debug("set vlan in switch: {0} in_port: {1} vlan tag: {2}".format(
             node.name, switch_port, tag))
 
-    def _set_flow_entry_dpctl(
+    def _set_vlan_tags(self, node, port_tags):
+        """
+        Set the vlan tags of multiple ports in a single ovs-vsctl transaction.
+        :param node: switch node
+        :param port_tags: list of (port_name, tag)
+        """
+        args = []
+        for switch_port, tag in port_tags:
+            if len(args) > 0:
+                args.append('--')
+            args += ['set', 'port {0} tag={1}'.format(switch_port, tag)]
+        node.vsctl(*args)
+        LOG.debug("set vlans in switch: {0} port tags: {1}".format(
+            node.name, port_tags))
+
+    def _get_flow_entry_dpctl(
             self, node, switch_inport_nr, switch_outport_nr, **kwargs):
-
+        """
+        Compute a flow entry for ovs-ofctl without installing it.
+        :return: flow entry dict, see _push_flow_entries
+        """
         match = 'in_port=%s' % switch_inport_nr
 
         cookie = kwargs.get('cookie')
@@ -887,6 +1566,8 @@ class DCNetwork(Containernet):
         path = kwargs.get('path')
         index = kwargs.get('pathindex')
         vlan = kwargs.get('vlan')
+        # some actions need a newer OpenFlow version than ovs-ofctl's default
+        of_option = None
 
         s = ','
         if cookie:
@@ -900,7 +1581,7 @@ class DCNetwork(Containernet):
                 if index == 0:  # first node
                     action = ('action=mod_vlan_vid:%s' % vlan) + \
                         (',output=%s' % switch_outport_nr)
-                    match = '-O OpenFlow13 ' + match
+                    of_option = '-O OpenFlow13'
                 elif index == len(path) - 1:  # last node
                     match += ',dl_vlan=%s' % vlan
                     action = 'action=strip_vlan,output=%s' % switch_outport_nr
@@ -912,12 +1593,163 @@ class DCNetwork(Containernet):
         else:
             ofcmd = ''
 
-        node.dpctl(cmd, ofcmd)
-        LOG.info("{3} in switch: {0} in_port: {1} out_port: {2}".format(node.name, switch_inport_nr,
-                                                                        switch_outport_nr, cmd))
+        LOG.debug("{3} in switch: {0} in_port: {1} out_port: {2}".format(node.name, switch_inport_nr,
+                                                                         switch_outport_nr, cmd))
+        return {'switch': node, 'backend': 'dpctl', 'cmd': cmd,
+                'of_option': of_option, 'ofcmd': ofcmd, 'vlan_tags': []}
+
+    def _current_flow_batch(self):
+        """
+        :return: the flow batch of the calling thread or None
+        """
+        return getattr(self._flow_batches, 'batch', None)
+
+    def startFlowBatch(self):
+        """
+        Start collecting flow entries instead of installing them directly.
+        All entries computed until the matching commitFlowBatch() call
+        are pushed per switch in one bulk operation.
+        Batches are kept per thread. Calls can be nested,
+        only the outermost commit installs the flows.
+        """
+        batch = self._current_flow_batch()
+        if batch is None:
+            batch = {'entries': [], 'callbacks': [], 'marks': []}
+            self._flow_batches.batch = batch
+        # remember where this (nested) batch starts
+        batch['marks'].append(
+            (len(batch['entries']), len(batch['callbacks'])))
+
+    def commitFlowBatch(self):
+        """
+        Install all flow entries collected since startFlowBatch().
+        :return: number of installed flow entries
+        """
+        batch = self._current_flow_batch()
+        if batch is None:
+            raise Exception("No flow batch started.")
+        batch['marks'].pop()
+        if len(batch['marks']) > 0:
+            return 0
+        self._flow_batches.batch = None
+        self._install_flow_entries(
+            batch['entries'], callbacks=batch['callbacks'])
+        return len(batch['entries'])
+
+    def discardFlowBatch(self):
+        """
+        Drop all flow entries collected since the matching startFlowBatch(),
+        e.g., because computing the flows failed. Nothing is installed.
+        """
+        batch = self._current_flow_batch()
+        if batch is None:
+            raise Exception("No flow batch started.")
+        num_entries, num_callbacks = batch['marks'].pop()
+        discarded = batch['callbacks'][num_callbacks:]
+        del batch['entries'][num_entries:]
+        del batch['callbacks'][num_callbacks:]
+        if len(batch['marks']) == 0:
+            self._flow_batches.batch = None
+        for on_success, on_failure in reversed(discarded):
+            if on_failure is not None:
+                on_failure(False)
+
+    def _install_flow_entries(self, flow_entries, on_success=None,
+                              on_failure=None, callbacks=None):
+        """
+        Install a list of flow entries, grouped by switch.
+        If a flow batch is active, the entries are only collected.
+        :param flow_entries: list of flow entry dicts
+        :param on_success: called without arguments once the entries are installed
+        :param on_failure: called if the entries are not installed, with True if
+            they were (possibly partially) pushed to the switches, False if
+            they were dropped together with a discarded flow batch
+        :param callbacks: list of (on_success, on_failure) tuples of a committed batch
+        """
+        callbacks = list(callbacks or [])
+        if on_success is not None or on_failure is not None:
+            callbacks.append((on_success, on_failure))
+        batch = self._current_flow_batch()
+        if batch is not None:
+            batch['entries'].extend(flow_entries)
+            batch['callbacks'].extend(callbacks)
+            return
+        installed = False
+        try:
+            self._push_all_flow_entries(flow_entries)
+            installed = True
+        finally:
+            if not installed:
+                for _, failed in reversed(callbacks):
+                    if failed is not None:
+                        failed(True)
+        for succeeded, _ in callbacks:
+            if succeeded is not None:
+                succeeded()
+
+    def _push_all_flow_entries(self, flow_entries):
+        """
+        Push a list of flow entries per switch and wait until all are installed.
+        :param flow_entries: list of flow entry dicts
+        """
+        # keep the order of the entries per switch
+        switch_entries = OrderedDict()
+        for entry in flow_entries:
+            switch_entries.setdefault(
+                entry['switch'].name, []).append(entry)
+        with self._flow_install_lock:
+            batch = self.flow_backend.new_batch()
+            for entries in switch_entries.values():
+                self._push_flow_entries(entries[0]['switch'], entries, batch)
+            # backends may push asynchronously, wait for all switches
+            errors = self.flow_backend.flush(batch)
+        if len(errors) > 0:
+            raise Exception("Could not install flow entries ({0} errors): {1}".format(
+                len(errors), errors[0]))
+
+    def _push_flow_entries(self, node, flow_entries, batch=None):
+        """
+        Push all flow entries of a single switch.
+        Flow entry dicts contain:
+        'switch': the switch node
+        'backend': name of the flow backend, see flow_backends.py
+        'vlan_tags': list of (port_name, tag) to be set on the switch ports
+        'prefix', 'flow': Ryu REST endpoint and payload (ryu_rest and ryu_rpc backends)
+        'cmd', 'of_option', 'ofcmd': ovs-ofctl command and flow (dpctl backend)
+        :param node: switch node
+        :param flow_entries: list of flow entry dicts
+        :param batch: batch of the flow backend, see FlowBackend.new_batch()
+        """
+        vlan_tags = [t for e in flow_entries for t in e['vlan_tags']]
+        if len(vlan_tags) > 0:
+            self._set_vlan_tags(node, vlan_tags)
+
+        self.flow_backend.push(node, flow_entries, batch)
+
+    def _dpctl_bulk(self, node, cmd, ofcmds, of_option=None):
+        """
+        Execute one ovs-ofctl call for a list of flows.
+        :param node: switch node
+        :param cmd: 'add-flow' or 'del-flows'
+        :param ofcmds: list of flow strings
+        :param of_option: optional OpenFlow version option, e.g., '-O OpenFlow13'
+        """
+        with tempfile.NamedTemporaryFile(
+                mode='w', prefix='son-emu-', suffix='.flows',
+                delete=False) as f:
+            f.write('\n'.join(ofcmds) + '\n')
+        try:
+            if of_option:
+                node.dpctl(cmd, of_option, '-', '<', f.name)
+            else:
+                node.dpctl(cmd, '-', '<', f.name)
+        finally:
+            os.remove(f.name)
+        LOG.info("{0} in switch: {1} number of flows: {2}".format(
+            cmd, node.name, len(ofcmds)))
 
     # start Ryu Openflow controller as Remote Controller for the DCNetwork
-    def startRyu(self, learning_switch=True):
+    def startRyu(self, learning_switch=True, extra_apps=None):
         # start Ryu controller with rest-API
 
         # ryu default learning switch
@@ -939,6 +1771,9 @@ class DCNetwork(Containernet):
         else:
             # no learning switch, but with rest api
             args = [ryu_cmd, ryu_rest_app, ryu_option, ryu_of_port]
+        # additional apps, e.g., of the flow backend
+        if extra_apps:
+            args[1:1] = list(extra_apps)
         self.ryu_process = Popen(args, stdout=FNULL, stderr=FNULL)
         LOG.debug('starting ryu-controller with %s' % args)
         time.sleep(1)
@@ -959,36 +1794,30 @@ class DCNetwork(Containernet):
         Popen(['pkill', '-f', 'ryu-manager'])
 
     def ryu_REST(self, prefix, dpid=None, data=None):
+        """
+        Send a request to the Ryu REST API and wait for the answer.
+        POST if data is given, GET otherwise.
+        :return: parsed json or response text
+        """
+        return self.ryu_client.request(prefix, dpid=dpid, data=data)
 
-        if dpid:
-            url = self.ryu_REST_api + '/' + str(prefix) + '/' + str(dpid)
-        else:
-            url = self.ryu_REST_api + '/' + str(prefix)
+    def ryu_REST_async(self, prefix, dpid=None, data=None, batch=None):
+        """
+        Send a request to the Ryu REST API without waiting for the answer.
+        Use self.ryu_client.flush(batch) to wait for the requests of a batch
+        (see self.ryu_client.new_batch()).
+        """
+        self.ryu_client.submit(prefix, dpid=dpid, data=data, batch=batch)
 
-        LOG.debug('sending RYU command: %s, payload: %s', url, data)
-        if data:
-            req = self.RyuSession.post(url, json=data)
-        else:
-            req = self.RyuSession.get(url)
-
-        # do extra logging if status code is not 200 (OK)
-        if req.status_code is not requests.codes.ok:
-            LOG.info(
-                'type {0}  encoding: {1} text: {2} headers: {3} history: {4}'.format(req.headers['content-type'],
-                                                                                     req.encoding, req.text,
-                                                                                     req.headers, req.history))
-            LOG.info('url: {0}'.format(str(url)))
-            if data:
-                LOG.info('POST: {0}'.format(str(data)))
-            LOG.info('status: {0} reason: {1}'.format(
-                req.status_code, req.reason))
-
-        if 'json' in req.headers['content-type']:
-            ret = req.json()
-            return ret
-
-        ret = req.text.rstrip()
-        return ret
+    def ryu_REST_flush(self, batch):
+        """
+        Wait for the requests of a batch sent with ryu_REST_async.
+        Raises an exception if any of them failed.
+        """
+        errors = self.ryu_client.flush(batch)
+        if len(errors) > 0:
+            raise Exception("{0} Ryu REST requests failed: {1}".format(
+                len(errors), errors[0]))
 
     # need to respect that some match fields must be integers
     # http://ryu.readthedocs.io/en/latest/app/ofctl_rest.html#description-of-match-and-actions
@@ -1010,18 +1839,6 @@ class DCNetwork(Containernet):
     def find_connected_dc_interface(
             self, vnf_src_name, vnf_src_interface=None):
 
-        if vnf_src_interface is None:
-            # take first interface by default
-            connected_sw = self.DCNetwork_graph.neighbors(vnf_src_name)[0]
-            link_dict = self.DCNetwork_graph[vnf_src_name][connected_sw]
-            vnf_src_interface = link_dict[0]['src_port_id']
-
-        for connected_sw in self.DCNetwork_graph.neighbors(vnf_src_name):
-            link_dict = self.DCNetwork_graph[vnf_src_name][connected_sw]
-            for link in link_dict:
-                if (link_dict[link]['src_port_id'] == vnf_src_interface or
-                        link_dict[link]['src_port_name'] == vnf_src_interface):
-                    # Fix: we might also get interface names, e.g, from a son-emu-cli call
-                    # found the right link and connected switch
-                    src_sw_inport_name = link_dict[link]['dst_port_name']
-                    return src_sw_inport_name
+        port = self.getConnectedSwitchPort(vnf_src_name, vnf_src_interface)
+        if port is not None:
+            return port['switch_port_name']
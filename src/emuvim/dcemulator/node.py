@@ -26,7 +26,11 @@
 from mininet.node import Docker
 from mininet.link import Link
 from emuvim.dcemulator.resourcemodel import NotEnoughResourcesAvailable
+from emuvim.dcemulator.pool import ContainerPool, POOL_SIZE, POOL_IDLE_TIMEOUT
+from emuvim.dcemulator.events import RESOURCE_UPDATE
 import logging
+import threading
+import time
 
 
 LOG = logging.getLogger("dcemulator.node")
@@ -35,6 +39,9 @@ LOG.setLevel(logging.DEBUG)
 
 DCDPID_BASE = 1000  # start of switch dpid's used for data center switches
 EXTSAPDPID_BASE = 2000  # start of switch dpid's used for external SAP switches
+# max. age (seconds) of a cached container status if the status is
+# refreshed by Docker events (otherwise the status is not cached)
+STATUS_MAX_AGE = 30
 
 
 class EmulatorCompute(Docker):
@@ -51,6 +58,10 @@ class EmulatorCompute(Docker):
         self.datacenter = kwargs.get("datacenter")  # pointer to current DC
         self.flavor_name = kwargs.get("flavor_name")
         self._network_state_cache = None
+        # cached result of inspect_container and its timestamp
+        self._inspect_cache = None
+        self._inspect_time = 0
+        self._status_lock = threading.Lock()
         LOG.debug("Starting compute instance %r in data center %r" %
                   (name, str(self.datacenter)))
         # call original Docker.__init__
@@ -74,19 +85,84 @@ class EmulatorCompute(Docker):
             networkStatusList.append(intf_dict)
         return networkStatusList
 
-    def getStatus(self):
+    def updateStatus(self):
+        """
+        Refresh the cached container state (called on Docker events).
+        """
+        cinspect = self.dcli.inspect_container(self.dc)
+        with self._status_lock:
+            self._inspect_cache = cinspect
+            self._inspect_time = time.time()
+        return cinspect
+
+    def invalidateStatus(self, network=False):
+        """
+        Drop the cached container state.
+        :param network: also drop the cached network status, e.g. after
+            the links or resource limits of this container have changed
+        """
+        with self._status_lock:
+            self._inspect_cache = None
+            if network:
+                self._network_state_cache = None
+
+    def _getStatusMaxAge(self):
+        # the cached state can only be trusted if Docker events are followed
+        watcher = getattr(getattr(self.datacenter, "net", None),
+                          "docker_events", None)
+        if watcher is not None and watcher.running:
+            return STATUS_MAX_AGE
+        return 0
+
+    def _resourcesUpdated(self, **limits):
+        self.invalidateStatus(network=True)
+        net = getattr(self.datacenter, "net", None)
+        if net is not None:
+            net.events.publish(
+                RESOURCE_UPDATE, name=self.name,
+                datacenter=self.datacenter.label,
+                limits=limits)
+
+    def updateCpuLimit(self, *args, **kwargs):
+        result = Docker.updateCpuLimit(self, *args, **kwargs)
+        self._resourcesUpdated(**kwargs)
+        return result
+
+    def updateMemoryLimit(self, *args, **kwargs):
+        result = Docker.updateMemoryLimit(self, *args, **kwargs)
+        self._resourcesUpdated(**kwargs)
+        return result
+
+    def update_resources(self, **kwargs):
+        result = Docker.update_resources(self, **kwargs)
+        self._resourcesUpdated(**kwargs)
+        return result
+
+    def getStatus(self, max_age=None):
         """
         Helper method to receive information about this compute instance.
+        :param max_age: max. age (seconds) of a cached container state,
+            0 = always inspect the container
+            (default: STATUS_MAX_AGE if Docker events are followed, else 0)
         """
+        if max_age is None:
+            max_age = self._getStatusMaxAge()
         # inspect container
-        cinspect = self.dcli.inspect_container(self.dc)
-        # inspect networking (slow, so do only once)
-        if self._network_state_cache is None:
-            self._network_state_cache = self.getNetworkStatus()
+        with self._status_lock:
+            cinspect = self._inspect_cache
+            if time.time() - self._inspect_time > max_age:
+                cinspect = None
+        if cinspect is None:
+            cinspect = self.updateStatus()
+        # inspect networking (slow, so only if something has changed)
+        network_status = self._network_state_cache
+        if network_status is None:
+            network_status = self.getNetworkStatus()
+            self._network_state_cache = network_status
         # build status
         status = {}
         status["name"] = self.name
-        status["network"] = self._network_state_cache
+        status["network"] = network_status
         status["docker_network"] = self.dcinfo['NetworkSettings']['IPAddress']
         status["image"] = self.dimage
         status["flavor_name"] = self.flavor_name
@@ -194,10 +270,14 @@ class Datacenter(object):
         self.switch = None
         # keep track of running containers
         self.containers = {}
+        # containers that are disconnected but could not be removed
+        self._disconnected = set()
         # keep track of attached external access points
         self.extSAPs = {}
         # pointer to assigned resource model
         self._resource_model = None
+        # warm containers (None = disabled)
+        self.container_pool = None
 
     def __repr__(self):
         return self.label
@@ -235,10 +315,39 @@ class Datacenter(object):
         :param properties: dictionary of properties (key-value) that will be passed as environment variables
         :return:
         """
+        docker_params, network = self._prepareCompute(
+            name, image=image, command=command, network=network,
+            flavor_name=flavor_name, properties=properties, **params)
+        # create the container
+        d = self.net.addDocker(str(name), **docker_params)
+        return self._connectCompute(d, network)
+
+    def startComputeBatch(self, compute_list, max_workers=None):
+        """
+        Create multiple containers in this data center. The containers are
+        created concurrently, their links are added afterwards one by one.
+        :param compute_list: list of dicts with the arguments of startCompute, e.g.
+            [{"name": "vnf1", "image": "ubuntu:trusty", "network": [...]}, ...]
+        :param max_workers: max. number of containers created at the same time
+        :return: list of result dicts, see DCNetwork.startComputeBatch
+        """
+        batch = []
+        for c in compute_list:
+            c = dict(c)
+            c["datacenter"] = self
+            batch.append(c)
+        return self.net.startComputeBatch(batch, max_workers=max_workers)
+
+    def _prepareCompute(self, name, image=None, command=None, network=None,
+                        flavor_name="tiny", properties=dict(), **params):
+        """
+        Check and complete the arguments of startCompute.
+        :return: (parameters for DCNetwork.addDocker, list of networks)
+        """
         assert name is not None
         default_net = {"id": "emu0"}
         # no duplications
-        if name in [c.name for c in self.net.getAllContainers()]:
+        if self.net.getContainerByName(name) is not None:
             raise Exception("Container with name %s already exists." % name)
         # set default parameter
         if image is None:
@@ -264,9 +373,7 @@ class Datacenter(object):
 
         env = properties
         properties['VNF_NAME'] = name
-        # create the container
-        d = self.net.addDocker(
-            str(name),
+        docker_params = dict(
             dimage=image,
             dcmd=command,
             datacenter=self,
@@ -274,66 +381,164 @@ class Datacenter(object):
             environment=env,
             **params
         )
+        return docker_params, network
 
-        # apply resource limits to container if a resource model is defined
-        if self._resource_model is not None:
+    def _connectCompute(self, d, network):
+        """
+        Apply the resource limits to a new container and connect it
+        to this data center.
+        :param d: container created by DCNetwork.addDocker
+        :param network: list of networks, see startCompute
+        :return: the container or None if blocked by the resource model
+        """
+        with self.net.topology_lock:
+            name = d.name
+            allocated = False
             try:
-                self._resource_model.allocate(d)
-                self._resource_model.write_allocation_log(
-                    d, self.resource_log_path)
-            except NotEnoughResourcesAvailable as ex:
-                LOG.warning(
-                    "Allocation of container %r was blocked by resource model." % name)
-                LOG.info(ex.message)
-                # ensure that we remove the container
-                self.net.removeDocker(name)
-                return None
-
-        # connect all given networks
-        # if no --net option is given, network = [{}], so 1 empty dict in the list
-        # this results in 1 default interface with a default ip address
-        for nw in network:
-            # clean up network configuration (e.g. RTNETLINK does not allow ':'
-            # in intf names
-            if nw.get("id") is not None:
-                nw["id"] = self._clean_ifname(nw["id"])
-            # TODO we cannot use TCLink here (see:
-            # https://github.com/mpeuster/containernet/issues/3)
-            self.net.addLink(d, self.switch, params1=nw,
-                             cls=Link, intfName1=nw.get('id'))
-        # do bookkeeping
-        self.containers[name] = d
-        return d  # we might use UUIDs for naming later on
+                # apply resource limits to container if a resource model is defined
+                if self._resource_model is not None:
+                    try:
+                        self._resource_model.allocate(d)
+                        allocated = True
+                        self._resource_model.write_allocation_log(
+                            d, self.resource_log_path)
+                    except NotEnoughResourcesAvailable as ex:
+                        LOG.warning(
+                            "Allocation of container %r was blocked by resource model." % name)
+                        LOG.info(ex.message)
+                        # ensure that we remove the container
+                        self.net.removeDocker(name)
+                        return None
+
+                # connect all given networks
+                # if no --net option is given, network = [{}], so 1 empty dict in the list
+                # this results in 1 default interface with a default ip address
+                for nw in network:
+                    # clean up network configuration (e.g. RTNETLINK does not allow ':'
+                    # in intf names
+                    if nw.get("id") is not None:
+                        nw["id"] = self._clean_ifname(nw["id"])
+                    # TODO we cannot use TCLink here (see:
+                    # https://github.com/mpeuster/containernet/issues/3)
+                    self.net.addLink(d, self.switch, params1=nw,
+                                     cls=Link, intfName1=nw.get('id'))
+            except Exception:
+                # do not leave a half connected container behind
+                self._removeUnconnectedCompute(d, allocated)
+                raise
+            # do bookkeeping
+            self.containers[name] = d
+            self.net._registerContainer(self, d)
+            return d  # we might use UUIDs for naming later on
+
+    def _removeUnconnectedCompute(self, d, allocated):
+        """
+        Remove a container whose connection to this data center failed.
+        :param d: the container
+        :param allocated: True if the resource model allocated resources for it
+        """
+        try:
+            if allocated:
+                self._resource_model.free(d)
+            self.net.removeLinks(d)
+            self.net.removeDocker(d.name)
+        except Exception:
+            LOG.exception("Cannot remove compute instance %r" % d.name)
 
     def stopCompute(self, name):
         """
         Stop and remove a container from this data center.
         """
-        assert name is not None
-        if name not in self.containers:
-            raise Exception("Container with name %s not found." % name)
-        LOG.debug("Stopping compute instance %r in data center %r" %
-                  (name, str(self)))
-
-        #  stop the monitored metrics
-        if self.net.monitor_agent is not None:
-            self.net.monitor_agent.stop_metric(name)
+        self._disconnectCompute(name)
+        # remove container
+        self.net.removeDocker("%s" % (name))
+        self._forgetCompute(name)
+        return True
 
-        # call resource model and free resources
-        if self._resource_model is not None:
-            self._resource_model.free(self.containers[name])
-            self._resource_model.write_free_log(
-                self.containers[name], self.resource_log_path)
+    def stopComputeBatch(self, names, max_workers=None):
+        """
+        Stop and remove multiple containers from this data center.
+        The containers are disconnected one by one and removed concurrently.
+        :param names: list of container names
+        :param max_workers: max. number of containers removed at the same time
+        :return: list of result dicts, see DCNetwork.stopComputeBatch
+        """
+        for name in names:
+            if name not in self.containers:
+                raise Exception("Container with name %s not found." % name)
+        return self.net.stopComputeBatch(names, max_workers=max_workers)
 
-        # remove links
-        self.net.removeLink(
-            link=None, node1=self.containers[name], node2=self.switch)
+    def _disconnectCompute(self, name):
+        """
+        Free the resources of a container and remove its links and chains.
+        """
+        with self.net.topology_lock:
+            assert name is not None
+            if name not in self.containers:
+                raise Exception("Container with name %s not found." % name)
+            LOG.debug("Stopping compute instance %r in data center %r" %
+                      (name, str(self)))
+            if name in self._disconnected:
+                # a previous removal of the container failed
+                return
+
+            #  stop the monitored metrics
+            if self.net.monitor_agent is not None:
+                self.net.monitor_agent.stop_metric(name)
+
+            # call resource model and free resources
+            if self._resource_model is not None:
+                self._resource_model.free(self.containers[name])
+                self._resource_model.write_free_log(
+                    self.containers[name], self.resource_log_path)
+
+            # forget the chains of this container and free their vlan tags
+            self.net.removeChainsOfVnf(name)
+
+            # remove all links (and interfaces) of the container
+            self.net.removeLinks(self.containers[name])
+            self._disconnected.add(name)
+
+    def _forgetCompute(self, name):
+        """
+        Bookkeeping after a container was removed.
+        """
+        with self.net.topology_lock:
+            self._disconnected.discard(name)
+            del self.containers[name]
+            self.net._unregisterContainer(name)
 
-        # remove container
-        self.net.removeDocker("%s" % (name))
-        del self.containers[name]
+    def enableContainerPool(self, image, flavor_name="tiny", size=POOL_SIZE,
+                            idle_timeout=POOL_IDLE_TIMEOUT):
+        """
+        Keep pre-started containers of the given image and flavor in this
+        data center. startCompute calls with this image and flavor (and
+        without a custom command or extra Docker options) use one
+        of them instead of creating a new container.
+        :param image: image name (string)
+        :param flavor_name: name of the flavor
+        :param size: number of warm containers
+        :param idle_timeout: seconds without startCompute call after which
+            the warm containers are removed (None: never)
+        """
+        if self.container_pool is None:
+            self.container_pool = ContainerPool(self)
+        self.container_pool.enable(
+            image, flavor_name=flavor_name, size=size,
+            idle_timeout=idle_timeout)
 
-        return True
+    def disableContainerPool(self, image=None, flavor_name="tiny"):
+        """
+        Remove the warm containers of the given image and flavor
+        or of all images if image is None.
+        """
+        if self.container_pool is None:
+            return
+        if image is None:
+            self.container_pool.stop()
+            self.container_pool = None
+        else:
+            self.container_pool.disable(image, flavor_name=flavor_name)
 
     def attachExternalSAP(self, sap_name, sap_net, **params):
         extSAP = EmulatorExtSAP(sap_name, sap_net, self, **params)
@@ -376,7 +581,9 @@ class Datacenter(object):
             "n_running_containers": len(self.containers),
             "metadata": self.metadata,
             "vnf_list": container_list,
-            "ext SAP list": ext_saplist
+            "ext SAP list": ext_saplist,
+            "container_pool": (None if self.container_pool is None
+                               else self.container_pool.get_status())
         }
 
     def assignResourceModel(self, rm):
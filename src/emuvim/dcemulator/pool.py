@@ -0,0 +1,306 @@
+# Copyright (c) 2015 SONATA-NFV and Paderborn University
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, Paderborn University
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+import logging
+import threading
+import time
+from collections import deque
+try:
+    from shlex import quote
+except ImportError:  # Python 2
+    from pipes import quote
+
+LOG = logging.getLogger("dcemulator.pool")
+LOG.setLevel(logging.DEBUG)
+
+# default number of warm containers kept per (image, flavor)
+POOL_SIZE = 2
+# seconds after which an unused pool is emptied
+POOL_IDLE_TIMEOUT = 300
+# seconds between two refill/eviction runs
+POOL_REFILL_INTERVAL = 1.0
+# startCompute parameters that can be applied to a warm container
+POOL_RESOURCE_PARAMS = ["cpu_quota", "cpu_period", "cpuset_cpus",
+                        "mem_limit", "cpu_percent"]
+
+
+class ContainerPool(object):
+    """
+    Pool of pre-started (warm) containers of a data center.
+    For each enabled (image, flavor) a number of containers is created
+    ahead of time without any data-plane links. A matching startCompute
+    call claims one of them instead of creating a new container:
+    The container is renamed, the resource limits are applied and the
+    environment is exported to its shell. A background thread refills
+    the pools and empties pools that were not used for a while.
+    """
+
+    def __init__(self, datacenter, interval=POOL_REFILL_INTERVAL):
+        self.datacenter = datacenter
+        self.interval = interval
+        # (image, flavor_name) -> pool dict
+        self._pools = dict()
+        self._lock = threading.Lock()
+        self._counter = 0
+        self._wakeup = threading.Event()
+        self._running = False
+        self._thread = None
+        # statistics
+        self.hits = 0
+        self.misses = 0
+
+    def enable(self, image, flavor_name="tiny", size=POOL_SIZE,
+               idle_timeout=POOL_IDLE_TIMEOUT):
+        """
+        Keep warm containers of the given image and flavor.
+        :param image: image name (string)
+        :param flavor_name: flavor of the containers
+        :param size: number of warm containers
+        :param idle_timeout: seconds without any claim after which the
+            warm containers are removed (None: never)
+        """
+        key = (image, flavor_name)
+        with self._lock:
+            pool = self._pools.setdefault(key, {
+                "containers": deque(),
+                "creating": 0,
+                "last_used": time.time()})
+            pool["size"] = int(size)
+            pool["idle_timeout"] = idle_timeout
+        LOG.info("Container pool %r of %r: size=%d idle_timeout=%r" %
+                 (key, self.datacenter, size, idle_timeout))
+        self._start()
+        self._wakeup.set()
+
+    def disable(self, image, flavor_name="tiny"):
+        """
+        Stop keeping warm containers of the given image and flavor.
+        """
+        with self._lock:
+            pool = self._pools.pop((image, flavor_name), None)
+        if pool is not None:
+            self._terminate(pool["containers"])
+
+    def claim(self, name, params):
+        """
+        Take a warm container for a new compute instance.
+        :param name: name of the new compute instance
+        :param params: container parameters (see Datacenter.startCompute)
+        :return: the renamed container or None if there is no matching one
+        """
+        key = (params.get("dimage"), params.get("flavor_name"))
+        if not self._is_compatible(params):
+            return None
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                return None
+            pool["last_used"] = time.time()
+            if len(pool["containers"]) < 1:
+                self.misses += 1
+                node = None
+            else:
+                self.hits += 1
+                node = pool["containers"].popleft()[0]
+        self._wakeup.set()
+        if node is None:
+            return None
+        try:
+            self._prepare(node, name, params)
+        except Exception as ex:
+            LOG.warning("Cannot use warm container %r for %r: %r" %
+                        (node.name, name, ex))
+            self._terminate([(node, None)])
+            return None
+        LOG.debug("Claimed warm container for %r from pool %r" % (name, key))
+        return node
+
+    def get_status(self):
+        """
+        Return a dict with the state of all pools of this data center.
+        """
+        with self._lock:
+            pools = list()
+            for (image, flavor_name), pool in self._pools.items():
+                pools.append({
+                    "image": image,
+                    "flavor_name": flavor_name,
+                    "size": pool["size"],
+                    "idle_timeout": pool["idle_timeout"],
+                    "available": len(pool["containers"]),
+                    "last_used": pool["last_used"]})
+            return {"pools": pools, "hits": self.hits, "misses": self.misses}
+
+    def stop(self):
+        """
+        Stop the refill thread and remove all warm containers.
+        """
+        self._running = False
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            self._terminate(pool["containers"])
+
+    @staticmethod
+    def _is_compatible(params):
+        """
+        Only containers with the default command and without extra
+        Docker options (ports, volumes, devices, ...) can be pooled.
+        """
+        if params.get("dcmd") is not None:
+            return False
+        if params.get("type", "docker") != "docker":
+            return False
+        for k, v in params.items():
+            if k in ["dimage", "dcmd", "datacenter", "flavor_name",
+                     "environment", "type"] + POOL_RESOURCE_PARAMS:
+                continue
+            if v:
+                return False
+        return True
+
+    @staticmethod
+    def _prepare(node, name, params):
+        """
+        Turn a warm container into the requested compute instance.
+        """
+        # rename the Docker container
+        node.dcli.rename(node.dc, "%s.%s" % (
+            getattr(node, "dnameprefix", "mn"), name))
+        node.name = name
+        node.dcinfo = node.dcli.inspect_container(node.dc)
+        # apply resource limits
+        if (params.get("cpu_quota") is not None or
+                params.get("cpuset_cpus") is not None):
+            limits = dict(cpu_period=int(params.get("cpu_period", -1)),
+                          cpu_quota=int(params.get("cpu_quota", -1)))
+            if params.get("cpuset_cpus") is not None:
+                limits["cores"] = params.get("cpuset_cpus")
+            node.updateCpuLimit(**limits)
+        if params.get("mem_limit") is not None:
+            node.updateMemoryLimit(mem_limit=params.get("mem_limit"))
+        # inject the environment into the container's shell and
+        # into the container info used by the gatekeepers
+        env = params.get("environment") or dict()
+        for k, v in env.items():
+            node.cmd("export %s=%s" % (k, quote(str(v))))
+        node.dcinfo.setdefault("Config", dict())
+        node.dcinfo["Config"]["Env"] = (
+            (node.dcinfo["Config"].get("Env") or list()) +
+            ["%s=%s" % (k, v) for k, v in env.items()])
+        node.params["environment"] = env
+
+    def _start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._refill)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _refill(self):
+        """
+        Background loop: remove idle pools and create missing containers.
+        """
+        while self._running:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            evicted = list()
+            missing = list()
+            with self._lock:
+                now = time.time()
+                for key, pool in self._pools.items():
+                    timeout = pool["idle_timeout"]
+                    if (timeout is not None and
+                            now - pool["last_used"] > timeout):
+                        # idle: empty the pool until it is used again
+                        while len(pool["containers"]) > 0:
+                            evicted.append(pool["containers"].popleft())
+                        continue
+                    if (len(pool["containers"]) + pool["creating"] <
+                            pool["size"]):
+                        pool["creating"] += 1
+                        self._counter += 1
+                        missing.append((key, self._counter))
+            if len(evicted) > 0:
+                LOG.debug("Removing %d idle warm containers from %r" %
+                          (len(evicted), self.datacenter))
+                self._terminate(evicted)
+            created = 0
+            for key, n in missing:
+                if self._running and self._create(key, n):
+                    created += 1
+                else:
+                    with self._lock:
+                        if key in self._pools:
+                            self._pools[key]["creating"] -= 1
+            if created > 0:
+                # continue until all pools are full
+                self._wakeup.set()
+
+    def _create(self, key, n):
+        """
+        Create a warm container and add it to its pool.
+        :return: True if the container was created
+        """
+        # imported here to avoid a circular import with node.py
+        from emuvim.dcemulator.node import EmulatorCompute
+        image, flavor_name = key
+        node = None
+        try:
+            node = EmulatorCompute(
+                "%s.pool%d" % (self.datacenter.name, n),
+                dimage=image,
+                dcmd=None,
+                datacenter=self.datacenter,
+                flavor_name=flavor_name,
+                environment=dict())
+        except Exception as ex:
+            LOG.error("Cannot create warm container of %r: %r" % (key, ex))
+            return False
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is not None:
+                pool["creating"] -= 1
+                if self._running:
+                    pool["containers"].append((node, time.time()))
+                    return True
+        # pool was disabled in the meantime
+        self._terminate([(node, None)])
+        return True
+
+    @staticmethod
+    def _terminate(containers):
+        for node, _ in list(containers):
+            try:
+                node.terminate()
+            except Exception as ex:
+                LOG.warning("Cannot remove warm container %r: %r" %
+                            (node.name, ex))
@@ -38,6 +38,9 @@ class ResourceModelRegistrar(object):
         self.e_mem = dc_emulation_max_mem
         # pointer to all resource models assigned to DCs
         self._resource_models = dict()
+        # cached totals over all registered resource models
+        self.total_max_cu = 0
+        self.total_max_mu = 0
         LOG.info("Resource model registrar created with dc_emulation_max_cpu=%r and dc_emulation_max_mem=%r"
                  % (dc_emulation_max_cpu, dc_emulation_max_mem))
 
@@ -54,8 +57,20 @@ class ResourceModelRegistrar(object):
         self._resource_models[dc] = rm
         rm.registrar = self
         rm.dcs.append(dc)
+        self._update_totals()
         LOG.info("Registrar: Added resource model: %r" % rm)
 
+    def _update_totals(self):
+        """
+        Recalculate the global number of compute and memory units.
+        Only changes when a resource model is registered, so the resource
+        models do not have to sum them up on each allocation.
+        :return: None
+        """
+        rms = self.resource_models
+        self.total_max_cu = sum([getattr(rm, "dc_max_cu", 0) for rm in rms])
+        self.total_max_mu = sum([getattr(rm, "dc_max_mu", 0) for rm in rms])
+
     @property
     def resource_models(self):
         """
@@ -26,6 +26,7 @@
 import time
 import json
 import logging
+from emuvim.dcemulator.concurrency import run_parallel
 from emuvim.dcemulator.resourcemodel import BaseResourceModel, NotEnoughResourcesAvailable
 
 LOG = logging.getLogger("rm.upb.simple")
@@ -139,34 +140,80 @@ class UpbSimpleCloudDcRM(BaseResourceModel):
         Recalculate real resource limits for all allocated containers and apply them
         to their cgroups.
         We have to recalculate for all containers to allow e.g. over provisioning models.
+        The limits of all containers are calculated in one pass, only the
+        changed limits are applied (in parallel).
         :return:
         """
-        for d in self._allocated_compute_instances.values():
-            if not self.deactivate_cpu_limit:
-                self._apply_cpu_limits(d)
-            if not self.deactivate_mem_limit:
-                self._apply_mem_limits(d)
+        instances = list(self._allocated_compute_instances.values())
+        if len(instances) < 1:
+            return
+        cpu_limits = [None] * len(instances)
+        mem_limits = [None] * len(instances)
+        if not self.deactivate_cpu_limit:
+            cpu_limits = self._calculate_cpu_limits(instances)
+        if not self.deactivate_mem_limit:
+            mem_limits = self._calculate_mem_limits(instances)
+        # only touch containers with changed limits
+        updates = list()
+        for d, cpu, mem in zip(instances, cpu_limits, mem_limits):
+            if cpu is not None and (d.resources['cpu_period'] == cpu[0] and
+                                    d.resources['cpu_quota'] == cpu[1]):
+                cpu = None
+            if mem is not None and d.resources['mem_limit'] == mem:
+                mem = None
+            if cpu is not None or mem is not None:
+                updates.append((d, cpu, mem))
+        if len(updates) == 1:
+            self._update_limits(*updates[0])
+            return
+        results = run_parallel(self._update_limits, updates)
+        failed = list()
+        for (d, cpu, mem), r in zip(updates, results):
+            if r.error is not None:
+                LOG.error("Could not update the limits of {0} (cpu={1}, mem={2}): {3}".format(
+                    d.name, cpu, mem, r.error))
+                failed.append(d.name)
+        if len(failed) > 0:
+            LOG.error("Updated the limits of: {0}".format(
+                [d.name for d, _, _ in updates if d.name not in failed]))
+            raise Exception("Could not update the limits of {0} containers: {1}".format(
+                len(failed), failed))
 
-    def _apply_cpu_limits(self, d):
+    def _update_limits(self, d, cpu, mem):
         """
-        Calculate real CPU limit (CFS bandwidth) and apply.
+        Apply new limits to a single container.
         :param d: container
+        :param cpu: (cpu_period, cpu_quota) or None if unchanged
+        :param mem: mem_limit or None if unchanged
         :return:
         """
-        number_cu = self._get_flavor(d).get("compute")
+        if cpu is not None:
+            LOG.debug("Setting CPU limit for %r: cpu_period = %d, cpu_quota = %d (op_factor=%f)" % (
+                      d.name, cpu[0], cpu[1], self.cpu_op_factor))
+            d.updateCpuLimit(cpu_period=cpu[0], cpu_quota=cpu[1])
+        if mem is not None:
+            LOG.debug("Setting MEM limit for %r: mem_limit = %f MB (op_factor=%f)" %
+                      (d.name, float(mem) / 1024 / 1024, self.mem_op_factor))
+            d.updateMemoryLimit(mem_limit=mem)
+
+    def _calculate_cpu_limits(self, instances):
+        """
+        Calculate real CPU limits (CFS bandwidth) for the given containers.
+        :param instances: list of containers
+        :return: list of (cpu_period, cpu_quota) tuples
+        """
+        compute_units = [self._get_flavor(d).get("compute") for d in instances]
         # calculate cpu time fraction of a single compute unit
         self.single_cu = self._compute_single_cu()
-        # calculate cpu time fraction for container with given flavor
-        cpu_time_percentage = self.single_cu * number_cu
-        # calculate input values for CFS scheduler bandwidth limitation
-        cpu_period, cpu_quota = self._calculate_cpu_cfs_values(
-            cpu_time_percentage)
-        # apply limits to container if changed
-        if d.resources['cpu_period'] != cpu_period or d.resources['cpu_quota'] != cpu_quota:
-            LOG.debug("Setting CPU limit for %r: cpu_quota = cpu_period * limit = %f * %f = %f (op_factor=%f)" % (
-                      d.name, cpu_period, cpu_time_percentage, cpu_quota, self.cpu_op_factor))
-            d.updateCpuLimit(cpu_period=int(cpu_period),
-                             cpu_quota=int(cpu_quota))
+        limits = list()
+        for number_cu in compute_units:
+            # calculate cpu time fraction for container with given flavor
+            cpu_time_percentage = self.single_cu * number_cu
+            # calculate input values for CFS scheduler bandwidth limitation
+            cpu_period, cpu_quota = self._calculate_cpu_cfs_values(
+                cpu_time_percentage)
+            limits.append((int(cpu_period), int(cpu_quota)))
+        return limits
 
     def _compute_single_cu(self):
         """
@@ -176,8 +223,7 @@ class UpbSimpleCloudDcRM(BaseResourceModel):
         # get cpu time fraction for entire emulation
         e_cpu = self.registrar.e_cpu
         # calculate
-        return float(
-            e_cpu) / sum([rm.dc_max_cu for rm in list(self.registrar.resource_models)])
+        return float(e_cpu) / self.registrar.total_max_cu
 
     def _calculate_cpu_cfs_values(self, cpu_time_percentage):
         """
@@ -197,26 +243,20 @@ class UpbSimpleCloudDcRM(BaseResourceModel):
             LOG.warning("Increased CPU quota to avoid system error.")
         return cpu_period, cpu_quota
 
-    def _apply_mem_limits(self, d):
+    def _calculate_mem_limits(self, instances):
         """
-        Calculate real mem limit and apply.
-        :param d: container
-        :return:
+        Calculate real mem limits for the given containers.
+        :param instances: list of containers
+        :return: list of mem limits
         """
-        number_mu = self._get_flavor(d).get("memory")
+        memory_units = [self._get_flavor(d).get("memory") for d in instances]
         # get memory amount for entire emulation
         e_mem = self.registrar.e_mem
         # calculate amount of memory for a single mu
-        self.single_mu = float(
-            e_mem) / sum([rm.dc_max_mu for rm in list(self.registrar.resource_models)])
-        # calculate mem for given flavor
-        mem_limit = self.single_mu * number_mu
-        mem_limit = self._calculate_mem_limit_value(mem_limit)
-        # apply to container if changed
-        if d.resources['mem_limit'] != mem_limit:
-            LOG.debug("Setting MEM limit for %r: mem_limit = %f MB (op_factor=%f)" %
-                      (d.name, mem_limit / 1024 / 1024, self.mem_op_factor))
-            d.updateMemoryLimit(mem_limit=mem_limit)
+        self.single_mu = float(e_mem) / self.registrar.total_max_mu
+        # calculate mem for given flavors
+        return [self._calculate_mem_limit_value(self.single_mu * number_mu)
+                for number_mu in memory_units]
 
     def _calculate_mem_limit_value(self, mem_limit):
         """
@@ -319,8 +359,7 @@ class UpbOverprovisioningCloudDcRM(UpbSimpleCloudDcRM):
         self.cpu_op_factor = float(self.dc_max_cu) / \
             (max(self.dc_max_cu, self.dc_alloc_cu))
         # calculate
-        return float(e_cpu) / sum([rm.dc_max_cu for rm in list(
-            self.registrar.resource_models)]) * self.cpu_op_factor
+        return float(e_cpu) / self.registrar.total_max_cu * self.cpu_op_factor
 
 
 class UpbDummyRM(UpbSimpleCloudDcRM):
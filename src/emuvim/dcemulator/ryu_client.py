@@ -0,0 +1,246 @@
+# Copyright (c) 2015 SONATA-NFV and Paderborn University
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, Paderborn University
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+import logging
+import threading
+import time
+import requests
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+LOG = logging.getLogger("dcemulator.ryu_client")
+LOG.setLevel(logging.DEBUG)
+
+# number of keep-alive connections to the Ryu REST API
+DEFAULT_POOL_SIZE = 4
+
+
+class RyuRequestBatch(object):
+    """
+    Ticket of a group of submitted requests, e.g. the flow mods of one chain.
+    RyuRestClient.flush(batch) waits only for these requests and returns
+    only their errors.
+    """
+
+    def __init__(self):
+        self.pending = 0
+        self.errors = []
+
+
+class RyuRestClient(object):
+    """
+    Client for Ryu's ofctl_rest API.
+
+    Requests can be done synchronously (request) or fire-and-forget
+    (submit). Submitted requests are processed by a bounded pool of worker
+    threads, each owning one keep-alive session. Requests of the same switch
+    (dpid) are always handled by the same worker, so flow mods of a switch
+    keep their order while the flow mods of different switches overlap.
+    Requests can be grouped in a batch (new_batch), flush(batch) blocks
+    until all requests of the batch are done and returns their errors.
+
+    We use plain threads instead of gevent/asyncio: the emulator does not
+    monkey patch the standard library and still supports Python 2.
+    """
+
+    def __init__(self, base_url, pool_size=DEFAULT_POOL_SIZE, timeout=None):
+        self.base_url = base_url
+        self.pool_size = max(1, int(pool_size))
+        self.timeout = timeout
+        # sessions used for synchronous requests
+        self._sessions = queue.Queue()
+        for _ in range(self.pool_size):
+            self._sessions.put(requests.Session())
+        self._queues = [queue.Queue() for _ in range(self.pool_size)]
+        self._workers = []
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+        self._pending = 0
+        self._closed = False
+
+    def _url(self, prefix, dpid=None):
+        if dpid:
+            return self.base_url + '/' + str(prefix) + '/' + str(dpid)
+        return self.base_url + '/' + str(prefix)
+
+    def _send(self, session, prefix, dpid=None, data=None, check_status=False):
+        """
+        :param check_status: raise an exception if the status code is not 200 (OK)
+        """
+        url = self._url(prefix, dpid)
+        LOG.debug('sending RYU command: %s, payload: %s', url, data)
+        if data:
+            req = session.post(url, json=data, timeout=self.timeout)
+        else:
+            req = session.get(url, timeout=self.timeout)
+
+        # do extra logging if status code is not 200 (OK)
+        if req.status_code != requests.codes.ok:
+            LOG.info(
+                'type {0}  encoding: {1} text: {2} headers: {3} history: {4}'.format(
+                    req.headers.get('content-type'), req.encoding, req.text,
+                    req.headers, req.history))
+            LOG.info('url: {0}'.format(str(url)))
+            if data:
+                LOG.info('POST: {0}'.format(str(data)))
+            LOG.info('status: {0} reason: {1}'.format(
+                req.status_code, req.reason))
+            if check_status:
+                raise Exception("Ryu REST request {0} failed with status {1}: {2}".format(
+                    url, req.status_code, req.reason))
+
+        if 'json' in req.headers.get('content-type', ''):
+            return req.json()
+        return req.text.rstrip()
+
+    def request(self, prefix, dpid=None, data=None):
+        """
+        Send a request and wait for the answer.
+        POST if data is given, GET otherwise.
+        :return: parsed json or response text
+        """
+        session = self._sessions.get()
+        try:
+            return self._send(session, prefix, dpid=dpid, data=data)
+        finally:
+            self._sessions.put(session)
+
+    def new_batch(self):
+        """
+        Start a new group of requests, pass it to submit() and flush().
+        :return: RyuRequestBatch
+        """
+        return RyuRequestBatch()
+
+    def submit(self, prefix, dpid=None, data=None, callback=None, batch=None):
+        """
+        Send a request without waiting for the answer (fire-and-forget).
+        Failed requests and answers other than 200 (OK) are errors of the batch.
+        :param callback: optional function called with the result
+        :param batch: RyuRequestBatch the request belongs to, errors of requests
+            without batch are only logged
+        """
+        # the ofctl_rest flow mods carry the dpid in their payload
+        shard = dpid
+        if shard is None and isinstance(data, dict):
+            shard = data.get('dpid')
+        with self._lock:
+            if self._closed:
+                raise Exception("Ryu REST client is closed.")
+            if len(self._workers) == 0:
+                self._start_workers()
+            self._pending += 1
+            if batch is not None:
+                batch.pending += 1
+        self._queues[hash(shard) % self.pool_size].put(
+            (prefix, dpid, data, callback, batch))
+
+    def flush(self, batch=None, timeout=None):
+        """
+        Barrier: wait until the requests of the batch (all submitted requests
+        if batch is None) are done.
+        :param batch: RyuRequestBatch returned by new_batch()
+        :param timeout: max. seconds to wait (None: wait forever)
+        :return: list of exceptions raised by the requests of the batch
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._done:
+            while self._pending_of(batch) > 0:
+                if deadline is None:
+                    self._done.wait()
+                    continue
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    LOG.warning("Ryu REST flush timed out with %d pending requests."
+                                % self._pending_of(batch))
+                    if batch is not None:
+                        batch.errors.append(Exception(
+                            "Ryu REST flush timed out with %d pending requests."
+                            % batch.pending))
+                    break
+                self._done.wait(remaining)
+            errors = []
+            if batch is not None:
+                errors = batch.errors
+                batch.errors = []
+        return errors
+
+    def _pending_of(self, batch):
+        if batch is None:
+            return self._pending
+        return batch.pending
+
+    def close(self):
+        """
+        Finish all submitted requests and stop the workers.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            workers = self._workers
+        for q in self._queues:
+            q.put(None)
+        for w in workers:
+            w.join()
+        while not self._sessions.empty():
+            self._sessions.get().close()
+
+    def _start_workers(self):
+        for i in range(self.pool_size):
+            w = threading.Thread(target=self._worker, args=(self._queues[i],),
+                                 name="ryu-rest-%d" % i)
+            w.daemon = True
+            w.start()
+            self._workers.append(w)
+
+    def _worker(self, q):
+        session = requests.Session()
+        while True:
+            item = q.get()
+            if item is None:
+                break
+            prefix, dpid, data, callback, batch = item
+            try:
+                # e.g. a rejected flow mod is an error of the batch
+                ret = self._send(session, prefix, dpid=dpid, data=data,
+                                 check_status=True)
+                if callback is not None:
+                    callback(ret)
+            except Exception as ex:
+                LOG.error("Ryu REST request failed: %r" % ex)
+                if batch is not None:
+                    with self._lock:
+                        batch.errors.append(ex)
+            finally:
+                with self._done:
+                    self._pending -= 1
+                    if batch is not None:
+                        batch.pending -= 1
+                    if self._pending == 0 or (batch is not None and batch.pending == 0):
+                        self._done.notify_all()
+        session.close()
@@ -0,0 +1,137 @@
+# Copyright (c) 2015 SONATA-NFV and Paderborn University
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, Paderborn University
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+"""
+Ryu app that receives batches of flow entries from the DCNetwork
+(RyuRpcBackend) over a local socket and writes them directly to the
+datapaths, bypassing the HTTP stack of ofctl_rest.
+
+Protocol: one JSON object per line.
+request:  {"flows": [{"cmd": "add"|"delete"|..., "flow": <ofctl_rest flow>}, ...]}
+response: {"installed": <number of flow entries>, "errors": [<msg>, ...]}
+
+The response is sent once every switch of the batch answered a barrier
+request, i.e. processed all flow mods of the batch.
+"""
+import json
+import os
+
+from ryu.base import app_manager
+from ryu.controller import dpset
+from ryu.controller import ofp_event
+from ryu.controller.handler import MAIN_DISPATCHER
+from ryu.controller.handler import set_ev_cls
+from ryu.lib import hub
+from ryu.lib import ofctl_v1_3
+from ryu.ofproto import ofproto_v1_3
+
+FLOW_RPC_HOST = '127.0.0.1'
+FLOW_RPC_PORT = int(os.environ.get('SON_EMU_FLOW_RPC_PORT', 6690))
+# max. seconds to wait for the barrier reply of a switch
+BARRIER_TIMEOUT = 10
+
+
+class SonEmuFlowRpc(app_manager.RyuApp):
+    OFP_VERSIONS = [ofproto_v1_3.OFP_VERSION]
+    # same context as ofctl_rest, so both apps share the datapath set
+    _CONTEXTS = {'dpset': dpset.DPSet}
+
+    def __init__(self, *args, **kwargs):
+        super(SonEmuFlowRpc, self).__init__(*args, **kwargs)
+        self.dpset = kwargs['dpset']
+        # (dpid, xid) -> event set by the barrier reply
+        self.barriers = {}
+        self.server = hub.StreamServer(
+            (FLOW_RPC_HOST, FLOW_RPC_PORT), self._handle_connection)
+        self.server_thread = hub.spawn(self.server.serve_forever)
+        self.logger.info('flow RPC listening on %s:%d' %
+                         (FLOW_RPC_HOST, FLOW_RPC_PORT))
+
+    def _handle_connection(self, sock, address):
+        f = sock.makefile('rb')
+        try:
+            while True:
+                line = f.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line.decode('utf-8'))
+                    response = self._mod_flows(request.get('flows', []))
+                except ValueError as ex:
+                    response = {'installed': 0, 'errors': [str(ex)]}
+                sock.sendall((json.dumps(response) + '\n').encode('utf-8'))
+        finally:
+            f.close()
+            sock.close()
+
+    def _mod_flows(self, flows):
+        cmds = {
+            'add': ofproto_v1_3.OFPFC_ADD,
+            'modify': ofproto_v1_3.OFPFC_MODIFY,
+            'modify_strict': ofproto_v1_3.OFPFC_MODIFY_STRICT,
+            'delete': ofproto_v1_3.OFPFC_DELETE,
+            'delete_strict': ofproto_v1_3.OFPFC_DELETE_STRICT,
+        }
+        installed = 0
+        errors = []
+        datapaths = {}
+        for intent in flows:
+            flow = intent.get('flow', {})
+            dpid = flow.get('dpid')
+            dp = self.dpset.get(dpid)
+            if dp is None:
+                errors.append('datapath {0} not found'.format(dpid))
+                continue
+            cmd = cmds.get(intent.get('cmd'))
+            if cmd is None:
+                errors.append('unknown command {0}'.format(intent.get('cmd')))
+                continue
+            try:
+                ofctl_v1_3.mod_flow_entry(dp, flow, cmd)
+                datapaths[dpid] = dp
+                installed += 1
+            except Exception as ex:
+                errors.append('{0}: {1}'.format(flow, ex))
+        # wait until each switch processed the flow mods of the batch
+        waiting = []
+        for dpid, dp in datapaths.items():
+            msg = dp.ofproto_parser.OFPBarrierRequest(dp)
+            dp.set_xid(msg)
+            ev = hub.Event()
+            self.barriers[(dpid, msg.xid)] = ev
+            dp.send_msg(msg)
+            waiting.append((dpid, msg.xid, ev))
+        for dpid, xid, ev in waiting:
+            if not ev.wait(timeout=BARRIER_TIMEOUT):
+                errors.append('datapath {0}: no barrier reply'.format(dpid))
+            self.barriers.pop((dpid, xid), None)
+        return {'installed': installed, 'errors': errors}
+
+    @set_ev_cls(ofp_event.EventOFPBarrierReply, MAIN_DISPATCHER)
+    def _barrier_reply_handler(self, ev):
+        msg = ev.msg
+        waiter = self.barriers.get((msg.datapath.id, msg.xid))
+        if waiter is not None:
+            waiter.set()
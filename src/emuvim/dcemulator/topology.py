@@ -0,0 +1,168 @@
+# Copyright (c) 2015 SONATA-NFV and Paderborn University
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, Paderborn University
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+import logging
+import threading
+import time
+from collections import OrderedDict
+from mininet.node import OVSSwitch
+
+LOG = logging.getLogger("dcemulator.topology")
+LOG.setLevel(logging.DEBUG)
+
+# max. number of attempts to copy the topology while it is modified
+SNAPSHOT_RETRIES = 10
+
+
+class TopologySnapshot(object):
+    """
+    Immutable copy of the emulated topology at a given version.
+    Used by read-only consumers (e.g. the REST APIs) that must not iterate
+    the live graph while it is modified by deployments.
+    Readers must not modify the contained data. Renderings derived from
+    the snapshot (e.g. JSON documents) are computed once per version
+    and cached, see render().
+    """
+
+    def __init__(self, version, nodes, edges, switches, datacenters,
+                 containers):
+        self.version = version
+        self.created_at = time.time()
+        # node name -> attribute dict
+        self.nodes = nodes
+        # list of (src, dst, key, attribute dict), both directions
+        self.edges = edges
+        # names of all switch nodes (incl. data center switches)
+        self.switches = switches
+        # data center label -> status dict (see Datacenter.getStatus)
+        self.datacenters = datacenters
+        # container name -> data center label
+        self.containers = containers
+        self._renderings = dict()
+
+    def render(self, name, func):
+        """
+        Return a cached rendering of this snapshot.
+        :param name: unique name of the rendering
+        :param func: function that computes the rendering from the snapshot
+        :return: func(snapshot)
+        """
+        r = self._renderings.get(name)
+        if r is None:
+            # concurrent readers might compute it twice, that is fine
+            r = func(self)
+            self._renderings[name] = r
+        return r
+
+    def neighbors(self, node_name):
+        """
+        Names of all nodes with an edge starting at node_name.
+        """
+        result = list()
+        for src, dst, _, _ in self.edges:
+            if src == node_name and dst not in result:
+                result.append(dst)
+        return result
+
+
+class TopologySnapshots(object):
+    """
+    Keeps the version of the topology of a DCNetwork and builds
+    snapshots of it lazily: The first reader after a modification
+    copies the topology, all further readers get the same snapshot
+    without locking.
+    """
+
+    def __init__(self, net):
+        self.net = net
+        self.version = 0
+        self._snapshot = None
+        self._build_lock = threading.Lock()
+
+    def changed(self):
+        """
+        Called by DCNetwork after each modification of the topology.
+        """
+        self.version += 1
+
+    def get(self):
+        """
+        Return the snapshot of the current topology version.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self.version:
+            return snapshot
+        with self._build_lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.version == self.version:
+                return snapshot
+            snapshot = self._build()
+            self._snapshot = snapshot
+            return snapshot
+
+    def _build(self):
+        # copy the live topology; if it is modified during the copy, try again
+        for _ in range(SNAPSHOT_RETRIES):
+            version = self.version
+            try:
+                snapshot = self._copy(version)
+            except RuntimeError as ex:
+                # e.g. "dictionary changed size during iteration"
+                LOG.debug("Topology changed while copying it: %r" % ex)
+                continue
+            if version == self.version:
+                return snapshot
+        LOG.warning("Topology keeps changing, using a possibly "
+                    "inconsistent snapshot.")
+        return self._copy(version)
+
+    def _copy(self, version):
+        net = self.net
+        G = net.DCNetwork_graph
+        nodes = OrderedDict()
+        for n, attrs in list(G.nodes(data=True)):
+            nodes[n] = dict(attrs)
+        edges = list()
+        for u, v, k, attrs in list(G.edges(keys=True, data=True)):
+            edges.append((u, v, k, dict(attrs)))
+        switches = frozenset(
+            n for n in nodes
+            if isinstance(net.nameToNode.get(n), OVSSwitch))
+        datacenters = OrderedDict()
+        for label, dc in list(net.dcs.items()):
+            status = {
+                "label": dc.label,
+                "internalname": dc.name,
+                "switch": dc.switch.name if dc.switch else None,
+                "metadata": dict(dc.metadata),
+                "vnf_list": list(dc.containers),
+                "ext SAP list": list(dc.extSAPs)}
+            status["n_running_containers"] = len(status["vnf_list"])
+            datacenters[label] = status
+        containers = dict()
+        for name, (dc, _) in list(net._containers.items()):
+            containers[name] = dc.label
+        return TopologySnapshot(version, nodes, tuple(edges), switches,
+                                datacenters, containers)
@@ -0,0 +1,158 @@
+# Copyright (c) 2015 SONATA-NFV and Paderborn University
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, Paderborn University
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+import logging
+import threading
+from collections import deque
+
+LOG = logging.getLogger("dcemulator.vlan")
+LOG.setLevel(logging.DEBUG)
+
+# valid 802.1Q vlan ids (0 and 4095 are reserved)
+VLAN_MIN = 1
+VLAN_MAX = 4094
+
+
+class VlanAllocator(object):
+    """
+    Pool of vlan tags used to isolate the SDN paths (chains, E-LANs).
+    Allocation and release are O(1): Free tags are kept in a FIFO queue,
+    so that released tags are reused as late as possible, and a bitmap
+    marks the allocated tags.
+    Each allocated tag belongs to an owner (e.g. a chain, an E-LAN or a
+    service instance) so that all tags of an owner can be released at once.
+    """
+
+    def __init__(self, vlan_min=VLAN_MIN, vlan_max=VLAN_MAX):
+        self.vlan_min = vlan_min
+        self.vlan_max = vlan_max
+        self._free = deque(range(vlan_min, vlan_max + 1))
+        self._bitmap = bytearray((vlan_max >> 3) + 1)
+        # tag -> owner
+        self._owner = dict()
+        # owner -> set of tags
+        self._owned = dict()
+        self._lock = threading.Lock()
+        # statistics
+        self.allocations = 0
+        self.releases = 0
+        self.peak_allocated = 0
+
+    def __len__(self):
+        """
+        Number of allocated tags.
+        """
+        return len(self._owner)
+
+    def _is_set(self, tag):
+        return self._bitmap[tag >> 3] & (1 << (tag & 7)) != 0
+
+    def is_allocated(self, tag):
+        """
+        Check if the given tag is currently allocated.
+        """
+        if tag is None or tag < self.vlan_min or tag > self.vlan_max:
+            return False
+        return self._is_set(tag)
+
+    def allocate(self, owner=None):
+        """
+        Allocate a free vlan tag.
+        :param owner: hashable object that identifies the owner of the tag
+        :return: vlan tag (int)
+        """
+        with self._lock:
+            if len(self._free) < 1:
+                raise Exception("No free vlan tags left (%d allocated)."
+                                % len(self._owner))
+            tag = self._free.popleft()
+            self._bitmap[tag >> 3] |= (1 << (tag & 7))
+            self._owner[tag] = owner
+            self._owned.setdefault(owner, set()).add(tag)
+            self.allocations += 1
+            self.peak_allocated = max(self.peak_allocated, len(self._owner))
+        LOG.debug("Allocated vlan tag %d for %r" % (tag, owner))
+        return tag
+
+    def release(self, tag):
+        """
+        Return a vlan tag to the pool.
+        :param tag: vlan tag (int)
+        :return: True if the tag was allocated before
+        """
+        with self._lock:
+            if not self.is_allocated(tag):
+                LOG.warning("Vlan tag %r is not allocated." % tag)
+                return False
+            self._bitmap[tag >> 3] &= ~(1 << (tag & 7)) & 0xff
+            owner = self._owner.pop(tag)
+            tags = self._owned.get(owner)
+            tags.discard(tag)
+            if len(tags) == 0:
+                del self._owned[owner]
+            self._free.append(tag)
+            self.releases += 1
+        LOG.debug("Released vlan tag %d of %r" % (tag, owner))
+        return True
+
+    def release_owner(self, owner):
+        """
+        Return all vlan tags of the given owner to the pool.
+        :param owner: owner used during allocation
+        :return: list of released tags
+        """
+        with self._lock:
+            tags = list(self._owned.get(owner, set()))
+        for tag in tags:
+            self.release(tag)
+        return tags
+
+    def get_owner(self, tag):
+        return self._owner.get(tag)
+
+    def get_tags(self, owner):
+        """
+        Return the vlan tags allocated by the given owner.
+        """
+        with self._lock:
+            return sorted(self._owned.get(owner, set()))
+
+    def get_status(self):
+        """
+        Return a dict with usage statistics of this pool.
+        """
+        with self._lock:
+            size = self.vlan_max - self.vlan_min + 1
+            allocated = len(self._owner)
+            return {
+                "size": size,
+                "allocated": allocated,
+                "free": len(self._free),
+                "utilization": float(allocated) / size,
+                "peak_allocated": self.peak_allocated,
+                "allocations": self.allocations,
+                "releases": self.releases,
+                "n_owners": len(self._owned)
+            }
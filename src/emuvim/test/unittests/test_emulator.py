@@ -23,6 +23,7 @@
 # the Horizon 2020 and 5G-PPP programmes. The authors would like to
 # acknowledge the contributions of their colleagues of the SONATA
 # partner consortium (www.sonata-nfv.eu).
+import time
 import unittest
 from emuvim.dcemulator.node import EmulatorCompute
 from emuvim.test.base import SimpleTestTopology
@@ -57,6 +58,34 @@ class testEmulatorTopology(SimpleTestTopology):
         # stop Mininet network
         self.stopNet()
 
+    def testTopologySnapshot(self):
+        """
+        Check that the topology snapshot is reused until the
+        topology changes.
+        """
+        # create network
+        self.createNet(nswitches=0, ndatacenter=1, nhosts=0, ndockers=0)
+        # start Mininet network
+        self.startNet()
+        t1 = self.net.getTopologySnapshot()
+        self.assertTrue(t1 is self.net.getTopologySnapshot())
+        self.assertTrue(self.dc[0].switch.name in t1.switches)
+        self.assertEqual(t1.datacenters["datacenter0"]["vnf_list"], [])
+        # add compute resources
+        self.dc[0].startCompute("vnf1")
+        t2 = self.net.getTopologySnapshot()
+        self.assertTrue(t2.version > t1.version)
+        self.assertTrue("vnf1" in t2.nodes)
+        self.assertEqual(t2.containers["vnf1"], "datacenter0")
+        self.assertEqual(t2.datacenters["datacenter0"]["vnf_list"], ["vnf1"])
+        # the old snapshot is not modified
+        self.assertFalse("vnf1" in t1.nodes)
+        # renderings are cached per version
+        self.assertTrue(t2.render("n", lambda t: [len(t.nodes)]) is
+                        t2.render("n", lambda t: [len(t.nodes)]))
+        # stop Mininet network
+        self.stopNet()
+
     # @unittest.skip("disabled to test if CI fails because this is the first test.")
     def testMultipleDatacenterDirect(self):
         """
@@ -280,6 +309,144 @@ class testEmulatorNetworking(SimpleTestTopology):
         # stop Mininet network
         self.stopNet()
 
+    def testSDNChainingFlowBatch(self):
+        """
+        Setup 2 services in a single flow batch and check that the
+        flows are only installed when the batch is committed.
+        """
+        # create network
+        self.createNet(
+            nswitches=3, ndatacenter=2, nhosts=0, ndockers=0,
+            autolinkswitches=True,
+            controller=RemoteController,
+            enable_learning=False)
+        # setup links
+        self.net.addLink(self.dc[0], self.s[0])
+        self.net.addLink(self.s[2], self.dc[1])
+        # start Mininet network
+        self.startNet()
+        # add compute resources
+        vnf1 = self.dc[0].startCompute(
+            "vnf1", network=[{'id': 'intf1', 'ip': '10.0.10.1/24'}])
+        vnf2 = self.dc[1].startCompute(
+            "vnf2", network=[{'id': 'intf2', 'ip': '10.0.10.2/24'}])
+        vnf11 = self.dc[0].startCompute(
+            "vnf11", network=[{'id': 'intf1', 'ip': '10.0.20.1/24'}])
+        vnf22 = self.dc[1].startCompute(
+            "vnf22", network=[{'id': 'intf2', 'ip': '10.0.20.2/24'}])
+        # setup links in one batch
+        self.net.startFlowBatch()
+        self.net.setChain('vnf1', 'vnf2', 'intf1', 'intf2',
+                          bidirectional=True, cmd='add-flow', cookie=1)
+        self.net.setChain('vnf11', 'vnf22', 'intf1', 'intf2',
+                          bidirectional=True, cmd='add-flow', cookie=2)
+        # a discarded nested batch does not touch the outer one
+        self.net.startFlowBatch()
+        self.net.setChain('vnf1', 'vnf22', 'intf1', 'intf2',
+                          bidirectional=True, cmd='add-flow', cookie=3)
+        self.net.discardFlowBatch()
+        # nothing installed yet
+        self.assertTrue(self.net.ping([vnf1, vnf2]) > 0.0)
+        # 2 chains * 2 directions * 5 switches
+        self.assertEqual(self.net.commitFlowBatch(), 20)
+        # check connectivity by using ping
+        self.assertTrue(self.net.ping([vnf1, vnf2]) <= 0.0)
+        self.assertTrue(self.net.ping([vnf11, vnf22]) <= 0.0)
+        # check first service cannot ping second service
+        self.assertTrue(self.net.ping([vnf1, vnf22]) > 0.0)
+        # stop Mininet network
+        self.stopNet()
+
+    def testSDNChainingFlowRpc(self):
+        """
+        Setup a chain with the native Ryu flow RPC backend.
+        """
+        # create network
+        self.createNet(
+            nswitches=3, ndatacenter=2, nhosts=0, ndockers=0,
+            autolinkswitches=True,
+            controller=RemoteController,
+            enable_learning=False,
+            flow_backend='ryu_rpc')
+        # setup links
+        self.net.addLink(self.dc[0], self.s[0])
+        self.net.addLink(self.s[2], self.dc[1])
+        # start Mininet network
+        self.startNet()
+        # add compute resources
+        vnf1 = self.dc[0].startCompute(
+            "vnf1", network=[{'id': 'intf1', 'ip': '10.0.10.1/24'}])
+        vnf2 = self.dc[1].startCompute(
+            "vnf2", network=[{'id': 'intf2', 'ip': '10.0.10.2/24'}])
+        # should be not not yet connected
+        self.assertTrue(self.net.ping([vnf1, vnf2]) > 0.0)
+        # setup links
+        self.net.setChain('vnf1', 'vnf2', 'intf1', 'intf2',
+                          bidirectional=True, cmd='add-flow', cookie=1)
+        # check connectivity by using ping
+        self.assertTrue(self.net.ping([vnf1, vnf2]) <= 0.0)
+        # remove links
+        self.net.setChain('vnf1', 'vnf2', 'intf1', 'intf2',
+                          bidirectional=True, cmd='del-flows', cookie=1)
+        self.assertTrue(self.net.ping([vnf1, vnf2]) > 0.0)
+        # stop Mininet network
+        self.stopNet()
+
+    def testSDNChainingVlanRelease(self):
+        """
+        Check that the vlan tags of a chain are returned to the pool
+        when the chain is deleted or its owner is released.
+        """
+        # create network
+        self.createNet(
+            nswitches=1, ndatacenter=2, nhosts=0, ndockers=0,
+            autolinkswitches=True,
+            controller=RemoteController,
+            enable_learning=False)
+        # setup links
+        self.net.addLink(self.dc[0], self.s[0])
+        self.net.addLink(self.s[0], self.dc[1])
+        # start Mininet network
+        self.startNet()
+        # add compute resources
+        self.dc[0].startCompute(
+            "vnf1", network=[{'id': 'intf1', 'ip': '10.0.10.1/24'}])
+        self.dc[1].startCompute(
+            "vnf2", network=[{'id': 'intf2', 'ip': '10.0.10.2/24'}])
+        self.net.setChain('vnf1', 'vnf2', 'intf1', 'intf2',
+                          bidirectional=True, cmd='add-flow', cookie=1)
+        self.assertEqual(len(self.net.vlans), 2)
+        # replacing a chain releases the tags of the replaced one
+        self.net.setChain('vnf1', 'vnf2', 'intf1', 'intf2',
+                          bidirectional=True, cmd='add-flow', cookie=1)
+        self.assertEqual(len(self.net.vlans), 2)
+        self.assertEqual(len(self.net.installed_chains), 2)
+        self.net.setChain('vnf1', 'vnf2', 'intf1', 'intf2',
+                          bidirectional=True, cmd='del-flows', cookie=1)
+        self.assertEqual(len(self.net.vlans), 0)
+        self.assertEqual(len(self.net.installed_chains), 0)
+        # release all tags of a service instance at once
+        self.net.setChain('vnf1', 'vnf2', 'intf1', 'intf2',
+                          bidirectional=True, cmd='add-flow', cookie=1,
+                          owner='service1')
+        self.net.setLAN([{'name': 'vnf1', 'interface': 'intf1'},
+                         {'name': 'vnf2', 'interface': 'intf2'}],
+                        owner='service1')
+        self.assertEqual(len(self.net.vlans.get_tags('service1')), 3)
+        self.assertEqual(len(self.net.releaseVlanTags('service1')), 3)
+        self.assertEqual(len(self.net.vlans), 0)
+        self.assertEqual(len(self.net.installed_chains), 0)
+        # stopping a VNF removes its chains
+        self.net.setChain('vnf1', 'vnf2', 'intf1', 'intf2',
+                          bidirectional=True, cmd='add-flow', cookie=2)
+        self.assertEqual(len(self.net.installed_chains.get_by_cookie(2)), 2)
+        self.assertEqual(len(self.net.installed_chains.get_by_vnf('vnf2')), 2)
+        self.dc[0].stopCompute("vnf1")
+        self.assertEqual(len(self.net.installed_chains), 0)
+        self.assertEqual(len(self.net.vlans), 0)
+        # stop Mininet network
+        self.stopNet()
+
 # @unittest.skip("disabled compute tests for development")
 
 
@@ -336,6 +503,9 @@ class testEmulatorCompute(SimpleTestTopology):
         self.assertTrue(len(self.net.switches) == 1)
         # check compute list result
         self.assertTrue(len(self.dc[0].listCompute()) == 1)
+        # check container index
+        self.assertTrue(self.net.getContainerByName("vnf1") is vnf1)
+        self.assertTrue(self.net.getDatacenterOfContainer("vnf1") is self.dc[0])
         # check connectivity by using ping
         self.assertTrue(self.net.ping([self.h[0], vnf1]) <= 0.0)
         # remove compute resources
@@ -346,6 +516,42 @@ class testEmulatorCompute(SimpleTestTopology):
         self.assertTrue(len(self.net.switches) == 1)
         # check compute list result
         self.assertTrue(len(self.dc[0].listCompute()) == 0)
+        self.assertTrue(self.net.getContainerByName("vnf1") is None)
+        # stop Mininet network
+        self.stopNet()
+
+    def testRemoveMultiInterfaceComputeSingleDC(self):
+        """
+        Check that all links of a compute instance with multiple
+        interfaces are removed when it is stopped.
+        """
+        # create network
+        self.createNet(nswitches=0, ndatacenter=1, nhosts=1, ndockers=0)
+        # setup links
+        self.net.addLink(self.dc[0], self.h[0])
+        # start Mininet network
+        self.startNet()
+        n_links = len(self.net.links)
+        # add compute resources
+        self.dc[0].startCompute("vnf1", network=[
+            {"id": "intf1", "ip": "10.0.10.1/24"},
+            {"id": "intf2", "ip": "10.0.11.1/24"},
+            {"id": "intf3", "ip": "10.0.12.1/24"}])
+        self.assertEqual(len(self.net.links), n_links + 3)
+        switch_ports = [link.intf2.name for link in self.net.links
+                        if link.intf1.node.name == "vnf1"]
+        self.assertEqual(len(switch_ports), 3)
+        # remove compute resources
+        self.dc[0].stopCompute("vnf1")
+        self.assertEqual(len(self.net.links), n_links)
+        self.assertFalse("vnf1" in self.net.DCNetwork_graph)
+        self.assertEqual(
+            len(self.net.DCNetwork_graph.edges(self.dc[0].switch.name)), 1)
+        # the switch ports are removed as well
+        ports = self.dc[0].switch.vsctl(
+            "list-ports", self.dc[0].switch.name).split()
+        for p in switch_ports:
+            self.assertFalse(p in ports)
         # stop Mininet network
         self.stopNet()
 
@@ -409,6 +615,122 @@ class testEmulatorCompute(SimpleTestTopology):
         # stop Mininet network
         self.stopNet()
 
+    def testStartComputeBatchMultiDC(self):
+        """
+        Start multiple compute instances in different data centers
+        at once and check that they are able to talk to each other.
+        """
+        # create network
+        self.createNet(
+            nswitches=3, ndatacenter=2, nhosts=0, ndockers=0,
+            autolinkswitches=True)
+        # setup links
+        self.net.addLink(self.dc[0], self.s[0])
+        self.net.addLink(self.dc[1], self.s[2])
+        # start Mininet network
+        self.startNet()
+        # add compute resources
+        results = self.net.startComputeBatch([
+            {"datacenter": self.dc[0], "name": "vnf1"},
+            {"datacenter": "datacenter1", "name": "vnf2"},
+            {"datacenter": self.dc[0], "name": "vnf3"},
+            {"datacenter": self.dc[0], "name": "vnf1"}])
+        # the duplicate name is rejected, the others are started
+        self.assertEqual([r["name"] for r in results],
+                         ["vnf1", "vnf2", "vnf3", "vnf1"])
+        self.assertTrue(all(r["container"] is not None for r in results[:3]))
+        self.assertTrue(results[3]["container"] is None)
+        self.assertTrue(results[3]["error"] is not None)
+        self.assertTrue("create" in results[0]["timings"])
+        self.assertTrue("connect" in results[0]["timings"])
+        # check number of running nodes
+        self.assertTrue(len(self.getContainernetContainers()) == 3)
+        self.assertTrue(len(self.dc[0].listCompute()) == 2)
+        self.assertTrue(len(self.dc[1].listCompute()) == 1)
+        # check connectivity by using ping
+        self.assertTrue(self.net.ping(
+            [r["container"] for r in results[:3]]) <= 0.0)
+        # stop Mininet network
+        self.stopNet()
+
+    def testStopComputeBatchMultiDC(self):
+        """
+        Stop multiple compute instances in different data centers at once.
+        """
+        # create network
+        self.createNet(
+            nswitches=3, ndatacenter=2, nhosts=0, ndockers=0,
+            autolinkswitches=True)
+        # setup links
+        self.net.addLink(self.dc[0], self.s[0])
+        self.net.addLink(self.dc[1], self.s[2])
+        # start Mininet network
+        self.startNet()
+        # add compute resources
+        self.dc[0].startCompute("vnf1")
+        self.dc[1].startCompute("vnf2")
+        self.dc[0].startCompute("vnf3")
+        self.assertTrue(len(self.getContainernetContainers()) == 3)
+        # remove compute resources, unknown names are reported
+        results = self.net.stopComputeBatch(["vnf1", "vnf2", "vnf4"])
+        self.assertEqual([r["name"] for r in results],
+                         ["vnf1", "vnf2", "vnf4"])
+        self.assertTrue(all(r["error"] is None for r in results[:2]))
+        self.assertTrue(results[2]["error"] is not None)
+        self.assertTrue("remove" in results[0]["timings"])
+        # check number of running nodes, graph and container index
+        self.assertTrue(len(self.getContainernetContainers()) == 1)
+        self.assertTrue(len(self.dc[0].listCompute()) == 1)
+        self.assertTrue(len(self.dc[1].listCompute()) == 0)
+        self.assertTrue(self.net.getContainerByName("vnf1") is None)
+        self.assertFalse(self.net.DCNetwork_graph.has_node("vnf2"))
+        self.assertTrue(self.net.getContainerByName("vnf3") is not None)
+        # removeDockerBatch removes containers without data center
+        self.net.addDocker("d1", dimage="ubuntu:trusty")
+        removed = self.net.removeDockerBatch(["d1"])
+        self.assertTrue(removed[0].error is None)
+        self.assertFalse(self.net.DCNetwork_graph.has_node("d1"))
+        # stop Mininet network
+        self.stopNet()
+
+    def testContainerPoolSingleDC(self):
+        """
+        Start compute instances from a pool of warm containers.
+        """
+        # create network
+        self.createNet(nswitches=0, ndatacenter=1, nhosts=1, ndockers=0)
+        # setup links
+        self.net.addLink(self.dc[0], self.h[0])
+        # start Mininet network
+        self.startNet()
+        # keep two warm containers and wait until they are created
+        self.dc[0].enableContainerPool("ubuntu:trusty", size=2)
+        for _ in range(60):
+            status = self.dc[0].container_pool.get_status()
+            if status["pools"][0]["available"] == 2:
+                break
+            time.sleep(1)
+        self.assertEqual(status["pools"][0]["available"], 2)
+        # add compute resources
+        vnf1 = self.dc[0].startCompute("vnf1", properties={"FOO": "bar"})
+        self.assertEqual(self.dc[0].container_pool.hits, 1)
+        self.assertEqual(vnf1.name, "vnf1")
+        self.assertTrue("bar" in vnf1.cmd("echo $FOO"))
+        # a custom command cannot be served by the pool
+        self.dc[0].startCompute("vnf2", command="/bin/bash")
+        self.assertEqual(self.dc[0].container_pool.hits, 1)
+        # check number of running nodes (warm containers are not part
+        # of the network) and connectivity
+        self.assertTrue(len(self.net.getAllContainers()) == 2)
+        self.assertTrue(len(self.dc[0].listCompute()) == 2)
+        self.assertTrue(self.net.ping([self.h[0], vnf1]) <= 0.0)
+        # remove compute resources
+        self.dc[0].stopCompute("vnf1")
+        self.dc[0].stopCompute("vnf2")
+        self.assertTrue(len(self.dc[0].listCompute()) == 0)
+        # stop Mininet network
+        self.stopNet()
+
     def testInterleavedAddRemoveMultiDC(self):
         """
         Test multiple, interleaved add and remove operations and ensure
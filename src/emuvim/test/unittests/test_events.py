@@ -0,0 +1,59 @@
+# Copyright (c) 2015 SONATA-NFV and Paderborn University
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, Paderborn University
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+import unittest
+from emuvim.dcemulator.events import EventBus, CONTAINER_START, LINK_ADD
+
+
+class testEventBus(unittest.TestCase):
+
+    def testPublishSubscribe(self):
+        bus = EventBus()
+        s_all = bus.subscribe()
+        s_links = bus.subscribe(types=[LINK_ADD])
+        bus.publish(CONTAINER_START, name="vnf1", datacenter="dc1")
+        bus.publish(LINK_ADD, src="vnf1", dst="dc1.s1")
+        self.assertEqual([e["type"] for e in s_all.poll()],
+                         [CONTAINER_START, LINK_ADD])
+        events = s_links.poll()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["data"]["src"], "vnf1")
+        # queues are empty after polling
+        self.assertEqual(s_all.wait(0.01), [])
+        s_all.close()
+        self.assertEqual(bus.n_subscribers, 1)
+
+    def testReplay(self):
+        bus = EventBus(backlog=2)
+        for i in range(3):
+            bus.publish(CONTAINER_START, name="vnf%d" % i)
+        # only the buffered events newer than the given id are replayed
+        s = bus.subscribe(last_event_id=1)
+        self.assertEqual([e["data"]["name"] for e in s.poll()],
+                         ["vnf1", "vnf2"])
+
+
+if __name__ == '__main__':
+    unittest.main()
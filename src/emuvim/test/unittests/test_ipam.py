@@ -0,0 +1,93 @@
+# Copyright (c) 2015 SONATA-NFV and Paderborn University
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, Paderborn University
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+import unittest
+from emuvim.api.openstack.ipam import AddressPool, CidrAllocator
+from emuvim.api.openstack.resources.net import Net
+
+
+class testAddressPool(unittest.TestCase):
+
+    def testAllocateLowestFree(self):
+        pool = AddressPool(1, 6, dynamic_first=2)
+        self.assertEqual([pool.allocate("p%d" % i) for i in range(3)],
+                         [2, 3, 4])
+        self.assertTrue(pool.assign(6, "p6"))
+        self.assertFalse(pool.assign(6, "p7"))
+        self.assertTrue(pool.release(3))
+        self.assertEqual(pool.allocate("p8"), 3)
+        # explicitly assigned addresses are skipped
+        self.assertEqual(pool.allocate("p9"), 5)
+        self.assertIsNone(pool.allocate("p10"))
+        # the gateway address is only issued on request
+        self.assertTrue(pool.assign(1, "gw"))
+        self.assertEqual(pool.get_status()["allocated"], 6)
+
+    def testAllocateMany(self):
+        pool = AddressPool(0, 3)
+        self.assertEqual(pool.allocate_many(["a", "b"]), [0, 1])
+        # all or nothing
+        self.assertIsNone(pool.allocate_many(["c", "d", "e"]))
+        self.assertEqual(len(pool), 2)
+        self.assertTrue(pool.is_owner(1, "b"))
+
+
+class testCidrAllocator(unittest.TestCase):
+
+    def testAllocateFree(self):
+        first = Net.ip_2_int("10.0.0.0")
+        alloc = CidrAllocator(first, Net.ip_2_int("10.0.2.255"), 24)
+        a = alloc.allocate("s1")
+        b = alloc.allocate("s2")
+        self.assertEqual(Net.int_2_ip(b), "10.0.1.0")
+        self.assertTrue(alloc.assign(Net.ip_2_int("10.0.2.0"), "s3"))
+        # exhausted
+        self.assertIsNone(alloc.allocate("s4"))
+        self.assertFalse(alloc.release(a, "s2"))
+        self.assertTrue(alloc.release(a, "s1"))
+        self.assertEqual(alloc.allocate("s4"), a)
+        # subnets outside of the range can be assigned explicitly
+        self.assertTrue(alloc.assign(Net.ip_2_int("192.168.0.0"), "s5"))
+        self.assertTrue(alloc.is_owner(Net.ip_2_int("192.168.0.0"), "s5"))
+
+
+class testNetAddresses(unittest.TestCase):
+
+    def testNetIpAddresses(self):
+        net = Net("net1")
+        net.set_cidr("10.0.0.0/29")
+        self.assertEqual(net.get_new_ip_address("p1"), "10.0.0.2/29")
+        self.assertTrue(net.assign_ip_address("10.0.0.1/29", "gw"))
+        self.assertFalse(net.assign_ip_address("10.0.0.7/29", "p2"))
+        self.assertEqual(net.get_new_ip_addresses(["p3", "p4"]),
+                         ["10.0.0.3/29", "10.0.0.4/29"])
+        net.withdraw_ip_address("10.0.0.3/29")
+        self.assertTrue(net.is_my_ip("10.0.0.4/29", "p4"))
+        self.assertEqual(net.get_new_ip_address("p5"), "10.0.0.3/29")
+        self.assertEqual(net.get_ip_address_status()["allocated"], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+# Copyright (c) 2015 SONATA-NFV and Paderborn University
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, Paderborn University
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+import unittest
+from emuvim.dcemulator.metric_history import MetricHistory
+
+
+class testMetricHistory(unittest.TestCase):
+
+    def testRingBuffer(self):
+        h = MetricHistory(size=4)
+        for t in range(6):
+            h.append(t, t * 100)
+        # only the newest 4 samples are kept
+        self.assertEqual(len(h), 4)
+        self.assertEqual(h.samples(), [(2, 200), (3, 300), (4, 400), (5, 500)])
+        self.assertEqual(h.samples(2), [(4, 400), (5, 500)])
+
+    def testRates(self):
+        h = MetricHistory()
+        for t, v in [(0, 0), (1, 100), (2, 300), (3, 0), (4, 50)]:
+            h.append(t, v)
+        # counter reset between t=2 and t=3 is skipped
+        self.assertEqual(h.rates(), [(1, 100), (2, 200), (4, 50)])
+        self.assertEqual(h.rate(), 50)
+        self.assertAlmostEqual(h.ewma(alpha=0.5), 100)
+        self.assertEqual(h.percentiles([50, 100]), {50: 100, 100: 200})
+
+    def testPercentilesNearestRank(self):
+        h = MetricHistory()
+        h.append(0, 0)
+        h.append(1, 10)
+        h.append(2, 30)
+        # rates [10, 20]: p * N / 100 = 1 is the first rate
+        self.assertEqual(h.percentiles([50]), {50: 10})
+        h = MetricHistory()
+        for t in range(11):
+            h.append(t, t * t)
+        # rates [1, 3, ..., 19]: p * N / 100 = 9 is the 9th rate
+        self.assertEqual(h.percentiles([10, 90, 91, 100]),
+                         {10: 1, 90: 17, 91: 19, 100: 19})
+
+    def testEmpty(self):
+        s = MetricHistory().summary()
+        self.assertEqual(s['n_samples'], 0)
+        self.assertIsNone(s['rate'])
+        self.assertIsNone(s['ewma'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+# Copyright (c) 2015 SONATA-NFV and Paderborn University
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, Paderborn University
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+import unittest
+from emuvim.api.openstack.resources.name_index import NameIndexedDict
+from emuvim.api.openstack.resources.port import Port
+from emuvim.api.openstack.resources.server import Server
+
+
+class testNameIndexedDict(unittest.TestCase):
+
+    def testFindByName(self):
+        servers = NameIndexedDict(("name", "template_name", "full_name"))
+        s1 = Server("s1", id="id1")
+        s1.template_name = "vnf1"
+        servers[s1.id] = s1
+        self.assertEqual(servers.find_by_name("s1"), [s1])
+        self.assertEqual(servers.find_by_name("vnf1"), [s1])
+        # renames are reflected by the index
+        s1.full_name = "dc1_s1"
+        s1.name = "s2"
+        self.assertEqual(servers.find_by_name("dc1_s1"), [s1])
+        self.assertEqual(servers.find_by_name("s2"), [s1])
+        self.assertEqual(servers.find_by_name("s1"), [])
+        servers.pop(s1.id)
+        self.assertEqual(servers.find_by_name("s2"), [])
+        # removed resources are not tracked anymore
+        s1.name = "s3"
+        self.assertEqual(servers.find_by_name("s3"), [])
+
+    def testSharedNames(self):
+        ports = NameIndexedDict(("name", "template_name"))
+        p1 = Port("p1")
+        p2 = Port("p2")
+        ports[p1.id] = p1
+        ports[p2.id] = p2
+        # the template name still matches after a rename
+        p1.name = "p2"
+        self.assertEqual(ports.find_by_name("p1"), [p1])
+        self.assertEqual(len(ports.find_by_name("p2")), 2)
+        del ports[p2.id]
+        self.assertEqual(ports.find_by_name("p2"), [p1])
+
+
+if __name__ == '__main__':
+    unittest.main()
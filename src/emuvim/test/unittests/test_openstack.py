@@ -24,12 +24,14 @@
 # acknowledge the contributions of their colleagues of the SONATA
 # partner consortium (www.sonata-nfv.eu).
 import os
+import time
 import unittest
 import requests
 import simplejson as json
 import yaml
 
 from emuvim.test.api_base_openstack import ApiBaseOpenStack
+import emuvim.api.openstack.compute as compute
 
 
 class testRestApi(ApiBaseOpenStack):
@@ -53,6 +55,23 @@ class testRestApi(ApiBaseOpenStack):
         # start Mininet network
         self.startNet()
 
+    def waitForStack(self, stack_id, headers, timeout=60):
+        """
+        Stack operations of the Heat API run in the background,
+        wait until the stack is no longer in an *_IN_PROGRESS status.
+        """
+        url = "http://0.0.0.0:18004/v1/tenantabc123/stacks/%s" % stack_id
+        status = None
+        for i in range(0, timeout * 10):
+            response = requests.get(url, headers=headers)
+            if response.status_code != 200:
+                return None
+            status = json.loads(response.content)["stack"]["stack_status"]
+            if not status.endswith("_IN_PROGRESS"):
+                break
+            time.sleep(0.1)
+        return status
+
     def testNovaDummy(self):
         print('->>>>>>> test Nova Dummy Class->>>>>>>>>>>>>>>')
         print('->>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>')
@@ -62,8 +81,10 @@ class testRestApi(ApiBaseOpenStack):
         test_heatapi_template_create_stack = open(os.path.join(os.path.dirname(
             __file__), "templates/test_heatapi_template_create_stack.yml")).read()
         url = "http://0.0.0.0:18004/v1/tenantabc123/stacks"
-        requests.post(url, data=json.dumps(yaml.load(test_heatapi_template_create_stack)),
-                      headers=headers)
+        createstackresponse = requests.post(url, data=json.dumps(yaml.load(test_heatapi_template_create_stack)),
+                                            headers=headers)
+        self.waitForStack(json.loads(createstackresponse.content)[
+                          "stack"]["id"], headers)
 
         print('->>>>>>> test Nova List Versions ->>>>>>>>>>>>>>>')
         print('->>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>')
@@ -290,8 +311,10 @@ class testRestApi(ApiBaseOpenStack):
         test_heatapi_template_create_stack = open(os.path.join(os.path.dirname(
             __file__), "templates/test_heatapi_template_create_stack.yml")).read()
         url = "http://0.0.0.0:18004/v1/tenantabc123/stacks"
-        requests.post(url, data=json.dumps(
+        createstackresponse = requests.post(url, data=json.dumps(
             yaml.load(test_heatapi_template_create_stack)), headers=headers)
+        self.waitForStack(json.loads(createstackresponse.content)[
+                          "stack"]["id"], headers)
         # test_heatapi_keystone_get_token = open("test_heatapi_keystone_get_token.json").read()
 
         print('->>>>>>> test Neutron List Versions ->>>>>>>>>>>>>>>')
@@ -496,6 +519,23 @@ class testRestApi(ApiBaseOpenStack):
                          "subnet"]["name"], "new_subnet")
         print(" ")
 
+        print('->>>>>>> test Neutron Show Network IP Availability ->>>>>>>>>>>>>>>')
+        print('->>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>')
+        url = "http://0.0.0.0:19696/v2.0/network-ip-availabilities/%s" % (
+            json.loads(createnetworkresponse.content)["network"]["id"])
+        showipavailabilityresponse = requests.get(url, headers=headers)
+        self.assertEqual(showipavailabilityresponse.status_code, 200)
+        ip_availability = json.loads(showipavailabilityresponse.content)[
+            "network_ip_availability"]
+        self.assertEqual(len(ip_availability["subnet_ip_availability"]), 1)
+        self.assertGreater(ip_availability["total_ips"], 0)
+        url = "http://0.0.0.0:19696/v2.0/network-ip-availabilities"
+        listipavailabilitiesresponse = requests.get(url, headers=headers)
+        self.assertEqual(listipavailabilitiesresponse.status_code, 200)
+        self.assertIn("subnet_pool", json.loads(
+            listipavailabilitiesresponse.content))
+        print(" ")
+
         print('->>>>>>> test Neutron Create Second Subnet ->>>>>>>>>>>>>>>')
         print('->>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>')
         url = "http://0.0.0.0:19696/v2.0/subnets"
@@ -788,6 +828,8 @@ class testRestApi(ApiBaseOpenStack):
         self.assertEqual(createstackresponse.status_code, 201)
         self.assertNotEqual(json.loads(
             createstackresponse.content)["stack"]["id"], "")
+        self.assertEqual(self.waitForStack(json.loads(
+            createstackresponse.content)["stack"]["id"], headers), "CREATE_COMPLETE")
         print(" ")
 
         print('->>>>>>> test Create Stack With Existing Name ->>>>>>>>>>>>>>>')
@@ -841,9 +883,11 @@ class testRestApi(ApiBaseOpenStack):
         updatestackresponse = requests.put(url, data=json.dumps(yaml.load(test_heatapi_template_update_stack)),
                                            headers=headers)
         self.assertEqual(updatestackresponse.status_code, 202)
+        self.assertEqual(self.waitForStack(json.loads(
+            createstackresponse.content)["stack"]["id"], headers), "UPDATE_COMPLETE")
         liststackdetailsresponse = requests.get(url, headers=headers)
         self.assertEqual(json.loads(liststackdetailsresponse.content)[
-                         "stack"]["stack_status"], "UPDATE_COMPLETE")
+                         "stack"]["progress"], 100)
         print(" ")
 
         print('->>>>>>> test Update Non-Existing Stack ->>>>>>>>>>>>>>>')
@@ -860,6 +904,9 @@ class testRestApi(ApiBaseOpenStack):
               json.loads(createstackresponse.content)['stack']['id']
         deletestackdetailsresponse = requests.delete(url, headers=headers)
         self.assertEqual(deletestackdetailsresponse.status_code, 204)
+        # the stack is deleted in the background, wait until it is gone
+        self.assertIsNone(self.waitForStack(json.loads(
+            createstackresponse.content)["stack"]["id"], headers))
         print(" ")
 
     def testNeutronSFC(self):
@@ -1127,5 +1174,60 @@ class testRestApi(ApiBaseOpenStack):
                          ["port_chain"]["name"], "pc1")
 
 
+class FakeDockerImages(object):
+    """
+    Image API of a Docker client that counts the list requests.
+    """
+
+    def __init__(self, tags):
+        self.tags = tags
+        self.requests = 0
+
+    def list(self):
+        self.requests += 1
+        image = type("FakeDockerImage", (object,), {})()
+        image.tags = list(self.tags)
+        return [image]
+
+
+class testImageCatalog(unittest.TestCase):
+    """
+    Tests of the cached image catalog of OpenstackCompute.
+    """
+
+    def setUp(self):
+        self.compute = compute.OpenstackCompute()
+        self.docker_images = FakeDockerImages(["ubuntu:trusty"])
+        self.compute.dcli = type("FakeDockerClient", (object,), {})()
+        self.compute.dcli.images = self.docker_images
+
+    def testCatalogIsCached(self):
+        self.assertIn("ubuntu:trusty", self.compute.images)
+        self.assertIn("ubuntu:trusty", self.compute.images)
+        self.assertEqual(self.docker_images.requests, 1)
+        # the catalog is requested again once it is older than the TTL
+        self.compute._images_updated -= compute.IMAGE_CACHE_TTL
+        self.compute.images
+        self.assertEqual(self.docker_images.requests, 2)
+
+    def testFindImageByNameOrId(self):
+        image = self.compute.find_image_by_name_or_id("ubuntu:trusty")
+        self.assertEqual(image.name, "ubuntu:trusty")
+        self.assertIs(self.compute.find_image_by_name_or_id(image.id), image)
+        self.assertEqual(self.docker_images.requests, 1)
+
+    def testFindNewImageRefreshesCatalog(self):
+        self.compute.images
+        # image pulled after the last update of the catalog
+        self.docker_images.tags.append("new:latest")
+        self.assertNotIn("new:latest", self.compute.images)
+        image = self.compute.find_image_by_name_or_id("new:latest")
+        self.assertEqual(image.name, "new:latest")
+        self.assertEqual(self.docker_images.requests, 2)
+        # unknown images are not found after a refresh either
+        self.assertIsNone(self.compute.find_image_by_name_or_id("unknown"))
+        self.assertEqual(self.docker_images.requests, 3)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -261,6 +261,29 @@ class testUpbSimpleCloudDcRM(SimpleTestTopology):
         rm.free(c1)
         self.assertTrue(rm.dc_alloc_cu == 0)
 
+    def testApplyOnlyChangedLimits(self):
+        """
+        Test that unchanged limits are not applied again.
+        :return:
+        """
+        # create dummy resource model environment
+        reg = ResourceModelRegistrar(
+            dc_emulation_max_cpu=1.0, dc_emulation_max_mem=512)
+        rm = UpbSimpleCloudDcRM(max_cu=100, max_mu=100)
+        reg.register("test_dc", rm)
+        self.assertEqual(reg.total_max_cu, 100)
+        self.assertEqual(reg.total_max_mu, 100)
+        c1 = createDummyContainerObject("c1", flavor="tiny")
+        c2 = createDummyContainerObject("c2", flavor="tiny")
+        rm.allocate(c1)  # calculate allocation
+        updates = list()
+        c1.updateCpuLimit = lambda **kwargs: updates.append(kwargs)
+        c1.updateMemoryLimit = lambda **kwargs: updates.append(kwargs)
+        rm.allocate(c2)  # limits of c1 do not change
+        rm.free(c2)
+        self.assertEqual(len(updates), 0)
+        self.assertEqual(c1.resources, c2.resources)
+
     @unittest.skipIf(os.environ.get("SON_EMU_IN_DOCKER") is not None,
                      "skipping test when running inside Docker container")
     def testInRealTopo(self):
@@ -26,6 +26,7 @@
 import unittest
 from emuvim.test.api_base import SimpleTestTopology
 import subprocess
+import requests
 from emuvim.dcemulator.node import EmulatorCompute
 import ast
 
@@ -154,6 +155,57 @@ class testRestApi(SimpleTestTopology):
         self.stopApi()
         self.stopNet()
 
+    def testD3jsGraph(self):
+        # create network
+        self.createNet(nswitches=0, ndatacenter=2, nhosts=0, ndockers=0)
+        self.net.addLink(self.dc[0], self.dc[1])
+        # start api
+        self.startApi()
+        # start Mininet network
+        self.startNet()
+        url = "http://127.0.0.1:5001/restapi/network/d3jsgraph"
+
+        # links refer to the nodes by their index
+        r = requests.get(url)
+        self.assertEqual(r.status_code, 200)
+        graph = r.json()
+        names = [n["name"] for n in graph["nodes"]]
+        self.assertEqual(len(names), 2)
+        self.assertEqual(len(graph["links"]), 2)
+        for link in graph["links"]:
+            self.assertNotEqual(names[link["source"]], names[link["target"]])
+            self.assertIn("src_port_name", link)
+        etag = r.headers["ETag"]
+
+        # unchanged topology
+        r = requests.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(r.status_code, 304)
+        self.assertEqual(r.headers["ETag"], etag)
+        r = requests.get(url, headers={"If-None-Match": "W/" + etag})
+        self.assertEqual(r.status_code, 304)
+
+        # a new container changes the topology and the ETag
+        self.dc[0].startCompute("vnf1")
+        r = requests.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(r.status_code, 200)
+        self.assertNotEqual(r.headers["ETag"], etag)
+        graph = r.json()
+        names = [n["name"] for n in graph["nodes"]]
+        self.assertIn("vnf1", names)
+        self.assertEqual(graph["nodes"][names.index("vnf1")]["group"], "docker")
+        self.assertTrue(any(
+            names[link["source"]] == "vnf1" for link in graph["links"]))
+        r = requests.get(url, headers={"If-None-Match": r.headers["ETag"]})
+        self.assertEqual(r.status_code, 304)
+
+        # usage of the vlan tag pool
+        r = requests.get("http://127.0.0.1:5001/restapi/network/status")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.json()["vlans"]["allocated"], 0)
+        self.assertEqual(r.json()["n_chains"], 0)
+        self.stopApi()
+        self.stopNet()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,162 @@
+# Copyright (c) 2015 SONATA-NFV and Paderborn University
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, Paderborn University
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+import json
+import threading
+import time
+import unittest
+try:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+    from SocketServer import ThreadingMixIn
+from emuvim.dcemulator.ryu_client import RyuRestClient
+
+
+class OfctlRestStub(ThreadingMixIn, HTTPServer):
+    """
+    Local stand-in for Ryu's ofctl_rest API that records all requests.
+    """
+    daemon_threads = True
+
+    def __init__(self, delay=0.0):
+        HTTPServer.__init__(
+            self, ('127.0.0.1', 0), OfctlRestHandler)
+        self.delay = delay
+        self.received = []
+        self.lock = threading.Lock()
+
+
+class OfctlRestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, body, content_type='application/json'):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        # e.g. /stats/port/1
+        dpid = self.path.rstrip('/').split('/')[-1]
+        self._reply(json.dumps({dpid: []}).encode('utf-8'))
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        data = json.loads(self.rfile.read(length).decode('utf-8'))
+        time.sleep(self.server.delay)
+        if data.get('dpid') == 0:
+            # unknown switch
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        with self.server.lock:
+            self.server.received.append((self.path, data))
+        self._reply(b'', content_type='text/html')
+
+
+class testRyuRestClient(unittest.TestCase):
+
+    def setUp(self):
+        self.server = OfctlRestStub(delay=0.05)
+        self.server_thread = threading.Thread(
+            target=self.server.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+        self.client = RyuRestClient(
+            'http://127.0.0.1:%d' % self.server.server_address[1],
+            pool_size=4)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def testRequest(self):
+        self.assertEqual(self.client.request('stats/port', dpid=1), {'1': []})
+
+    def testSubmitAndFlush(self):
+        t_start = time.time()
+        for dpid in range(1, 5):
+            for i in range(5):
+                self.client.submit('stats/flowentry/add',
+                                   data={'dpid': dpid, 'priority': i})
+        self.assertEqual(self.client.flush(), [])
+        t_total = time.time() - t_start
+        self.assertEqual(len(self.server.received), 20)
+        # switches are handled concurrently (serialized: 20 * 0.05 s)
+        self.assertTrue(t_total < 0.75)
+        # flow mods of each switch keep their order
+        for dpid in range(1, 5):
+            prios = [d['priority'] for p, d in self.server.received
+                     if d['dpid'] == dpid]
+            self.assertEqual(prios, list(range(5)))
+
+    def testFlushReportsErrorsPerBatch(self):
+        client = RyuRestClient('http://127.0.0.1:1', pool_size=1)
+        try:
+            failing = client.new_batch()
+            other = client.new_batch()
+            client.submit('stats/flowentry/add', data={'dpid': 1},
+                          batch=failing)
+            self.assertEqual(len(client.flush(failing)), 1)
+            # errors are only reported to the batch of the request
+            self.assertEqual(client.flush(other), [])
+            self.assertEqual(client.flush(failing), [])
+        finally:
+            client.close()
+
+    def testFlushReportsRejectedRequests(self):
+        batch = self.client.new_batch()
+        self.client.submit('stats/flowentry/add',
+                           data={'dpid': 0, 'priority': 0}, batch=batch)
+        self.client.submit('stats/flowentry/add',
+                           data={'dpid': 1, 'priority': 0}, batch=batch)
+        errors = self.client.flush(batch)
+        self.assertEqual(len(errors), 1)
+        self.assertIn('404', str(errors[0]))
+
+    def testFlushWaitsOnlyForItsBatch(self):
+        slow = self.client.new_batch()
+        fast = self.client.new_batch()
+        for i in range(10):
+            self.client.submit('stats/flowentry/add',
+                               data={'dpid': 1, 'priority': i}, batch=slow)
+        self.client.submit('stats/flowentry/add',
+                           data={'dpid': 2, 'priority': 0}, batch=fast)
+        self.assertEqual(self.client.flush(fast), [])
+        self.assertTrue(slow.pending > 0)
+        self.assertEqual(self.client.flush(slow), [])
+        self.assertEqual(slow.pending, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
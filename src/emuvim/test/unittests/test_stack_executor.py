@@ -0,0 +1,81 @@
+# Copyright (c) 2015 SONATA-NFV and Paderborn University
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, Paderborn University
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+import threading
+import time
+import unittest
+from emuvim.api.openstack.stack_executor import StackOperationExecutor
+
+
+class testStackOperationExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = StackOperationExecutor(max_workers=4)
+
+    def tearDown(self):
+        self.executor.stop()
+
+    def testOperationsOfOneStackRunInOrder(self):
+        order = list()
+        done = threading.Event()
+
+        def op(i):
+            time.sleep(0.01 * (3 - i))
+            order.append(i)
+            if i == 2:
+                done.set()
+
+        for i in range(3):
+            self.executor.submit("s1", op, i)
+        self.assertTrue(done.wait(5))
+        self.assertEqual(order, [0, 1, 2])
+
+    def testStacksRunConcurrently(self):
+        blocked = threading.Event()
+        done = threading.Event()
+        self.executor.submit("s1", blocked.wait, 5)
+        self.executor.submit("s2", done.set)
+        self.assertTrue(done.wait(5))
+        self.assertTrue(self.executor.is_busy("s1"))
+        blocked.set()
+        for i in range(50):
+            if not self.executor.is_busy("s1"):
+                break
+            time.sleep(0.1)
+        self.assertFalse(self.executor.is_busy("s1"))
+
+    def testFailedOperationDoesNotBlockStack(self):
+        done = threading.Event()
+
+        def fail():
+            raise Exception("failed")
+
+        self.executor.submit("s1", fail)
+        self.executor.submit("s1", done.set)
+        self.assertTrue(done.wait(5))
+
+
+if __name__ == '__main__':
+    unittest.main()